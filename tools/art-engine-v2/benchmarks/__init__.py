@@ -0,0 +1 @@
+"""Micro-benchmarks for art-engine-v2 hot paths."""
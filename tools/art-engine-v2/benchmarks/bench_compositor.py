@@ -0,0 +1,42 @@
+"""Micro-benchmark: float64 vs fixed-point alpha compositing.
+
+Run from the art-engine-v2 directory:
+    python -m benchmarks.bench_compositor
+"""
+from __future__ import annotations
+
+import timeit
+
+import numpy as np
+
+from src.core.compositor import alpha_composite, alpha_composite_fixed
+from src.generators.sprites import SPRITE_HEIGHT, SPRITE_WIDTH
+
+
+def _make_layers(seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Random RGBA background and a mostly transparent overlay at sprite size."""
+    rng = np.random.default_rng(seed)
+    shape = (SPRITE_HEIGHT, SPRITE_WIDTH, 4)
+    bg = rng.integers(0, 256, shape, dtype=np.uint8)
+    fg = rng.integers(0, 256, shape, dtype=np.uint8)
+    fg[rng.random(shape[:2]) < 0.8, 3] = 0
+    return bg, fg
+
+
+def main(repeat: int = 5, number: int = 50) -> None:
+    bg, fg = _make_layers()
+    out = np.empty_like(bg)
+
+    float_s = min(timeit.repeat(lambda: alpha_composite(bg, fg), repeat=repeat, number=number))
+    fixed_s = min(timeit.repeat(lambda: alpha_composite_fixed(bg, fg, out=out), repeat=repeat, number=number))
+
+    diff = np.abs(alpha_composite(bg, fg).astype(np.int16) - out.astype(np.int16))
+    per_call = 1000.0 / number
+    print(f"canvas {SPRITE_WIDTH}x{SPRITE_HEIGHT}, best of {repeat} x {number} calls")
+    print(f"  float64     {float_s * per_call:8.3f} ms/call")
+    print(f"  fixed-point {fixed_s * per_call:8.3f} ms/call  ({float_s / fixed_s:.1f}x)")
+    print(f"  max channel difference: {int(diff.max())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,13 @@ from pathlib import Path
 from PIL import Image
 import numpy as np
 
-from src.generators.backgrounds import generate_background
+from src.core.noise_cache import NoiseCache
+from src.generators.backgrounds import (
+    generate_background,
+    save_background_npy,
+    save_background_png,
+    save_background_pyramid,
+)
 from src.generators.tooltips import render_tooltip_from_file
 from src.layout.engine import LayoutEngine
 
@@ -21,15 +27,67 @@ def compose():
 @click.option("--height", required=True, type=int, help="Height in pixels")
 @click.option("--seed", default=42, type=int, help="RNG seed")
 @click.option("--output", required=True, type=click.Path(), help="Output PNG path")
-def compose_background(zone, width, height, seed, output):
+@click.option("--noise-cache", "noise_cache_dir", default=None, type=click.Path(file_okay=False), help="Directory for cached noise fields")
+@click.option("--noise-cache-mb", default=256, type=int, help="Noise cache size cap in MiB")
+@click.option("--tile-size", default=None, type=click.IntRange(min=8), help="Render in tiles of this size with bounded memory (.npy output is memory-mapped, PNG is streamed)")
+def compose_background(zone, width, height, seed, output, noise_cache_dir, noise_cache_mb, tile_size):
     """Generate a zone background."""
-    bg = generate_background(zone, width, height, seed)
     output_path = Path(output)
+    if tile_size:
+        if noise_cache_dir:
+            # Tiles synthesize their own windows of noise; the cache holds whole fields
+            raise click.UsageError("--noise-cache cannot be combined with --tile-size")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.suffix == ".npy":
+            save_background_npy(output_path, zone, width, height, seed, tile_size)
+        else:
+            save_background_png(output_path, zone, width, height, seed, tile_size)
+        click.echo(f"Background saved to {output}")
+        return
+
+    cache = None
+    if noise_cache_dir:
+        cache = NoiseCache(noise_cache_dir, max_bytes=noise_cache_mb * 1024 * 1024)
+    bg = generate_background(zone, width, height, seed, noise_cache=cache)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     Image.fromarray(bg).save(output_path)
     click.echo(f"Background saved to {output}")
 
 
+def _parse_sizes(ctx, param, values):
+    """Parse repeated WIDTHxHEIGHT options into (width, height) tuples."""
+    sizes = []
+    for value in values:
+        try:
+            width, height = (int(part) for part in value.lower().split("x"))
+        except ValueError:
+            raise click.BadParameter(f"{value!r} is not WIDTHxHEIGHT")
+        if width < 1 or height < 1:
+            raise click.BadParameter(f"{value!r} must have positive dimensions")
+        sizes.append((width, height))
+    return sizes
+
+
+@compose.command("background-pyramid")
+@click.option("--zone", required=True, help="Zone name")
+@click.option("--size", "sizes", required=True, multiple=True, callback=_parse_sizes, help="Level size as WIDTHxHEIGHT (repeatable)")
+@click.option("--seed", default=42, type=int, help="RNG seed")
+@click.option("--output-dir", required=True, type=click.Path(file_okay=False), help="Directory for the level PNGs")
+@click.option("--noise-cache", "noise_cache_dir", default=None, type=click.Path(file_okay=False), help="Directory for cached noise fields")
+@click.option("--noise-cache-mb", default=256, type=int, help="Noise cache size cap in MiB")
+def compose_background_pyramid(zone, sizes, seed, output_dir, noise_cache_dir, noise_cache_mb):
+    """Generate a zone background at several sizes from one noise synthesis."""
+    cache = None
+    if noise_cache_dir:
+        cache = NoiseCache(noise_cache_dir, max_bytes=noise_cache_mb * 1024 * 1024)
+    try:
+        paths = save_background_pyramid(Path(output_dir), zone, sizes, seed, noise_cache=cache)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    for path in paths:
+        click.echo(f"Background saved to {path}")
+
+
 @compose.command("tooltip")
 @click.option("--item-data", required=True, type=click.Path(exists=True), help="Item JSON file")
 @click.option("--output", required=True, type=click.Path(), help="Output PNG path")
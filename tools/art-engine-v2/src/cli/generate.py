@@ -2,6 +2,7 @@
 import json
 import click
 from pathlib import Path
+from src.core.materials import default_registry
 from src.generators.icons import generate_icon, generate_icon_batch
 
 
@@ -18,6 +19,16 @@ def _parse_seeds(seeds_str: str) -> list[int]:
     return results
 
 
+def _check_materials(materials: list[str]) -> None:
+    """Abort before rendering if any material is missing from the registry."""
+    registry = default_registry()
+    unknown = registry.unknown(materials)
+    if unknown:
+        click.echo(f"Unknown materials: {', '.join(unknown)}", err=True)
+        click.echo(f"Known materials: {', '.join(registry.names)}", err=True)
+        raise click.Abort()
+
+
 @click.group()
 def generate():
     """Generate asset variants from templates."""
@@ -31,11 +42,13 @@ def generate():
 @click.option("--qualities", required=True, help="Comma-separated quality tiers")
 @click.option("--seeds", required=True, help="Seed(s): single number, range (100-109), or comma-separated")
 @click.option("--output", "output_dir", default="output/icons", help="Output directory")
-def generate_icons(template_dir, template, materials, qualities, seeds, output_dir):
+@click.option("--workers", default=1, type=click.IntRange(min=1), help="Worker processes to render with")
+def generate_icons(template_dir, template, materials, qualities, seeds, output_dir, workers):
     """Generate icon variants from a template."""
     mat_list = [m.strip() for m in materials.split(",")]
     qual_list = [q.strip() for q in qualities.split(",")]
     seed_list = _parse_seeds(seeds)
+    _check_materials(mat_list)
 
     total = len(mat_list) * len(qual_list) * len(seed_list)
     click.echo(f"Generating {total} icons...")
@@ -47,6 +60,7 @@ def generate_icons(template_dir, template, materials, qualities, seeds, output_d
         qualities=qual_list,
         seeds=seed_list,
         output_dir=Path(output_dir),
+        workers=workers,
     )
 
     click.echo(f"Generated {len(results)} icons in {output_dir}/")
@@ -55,7 +69,8 @@ def generate_icons(template_dir, template, materials, qualities, seeds, output_d
 @generate.command("manifest")
 @click.option("--manifest", "manifest_path", required=True, type=click.Path(exists=True), help="JSON manifest file")
 @click.option("--template-dir", required=True, type=click.Path(exists=True), help="Directory with templates")
-def generate_from_manifest(manifest_path, template_dir):
+@click.option("--workers", default=1, type=click.IntRange(min=1), help="Worker processes to render with")
+def generate_from_manifest(manifest_path, template_dir, workers):
     """Generate assets from a JSON manifest file."""
     manifest = json.loads(Path(manifest_path).read_text())
 
@@ -67,6 +82,7 @@ def generate_from_manifest(manifest_path, template_dir):
         qualities = manifest["qualities"]
         seeds = manifest["seeds"]
         output_dir = manifest.get("output_dir", "output/icons")
+        _check_materials(materials)
 
         total = len(materials) * len(qualities) * len(seeds)
         click.echo(f"Manifest: generating {total} {gen_type}...")
@@ -78,6 +94,7 @@ def generate_from_manifest(manifest_path, template_dir):
             qualities=qualities,
             seeds=seeds,
             output_dir=Path(output_dir),
+            workers=workers,
         )
         click.echo(f"Generated {len(results)} icons from manifest.")
     else:
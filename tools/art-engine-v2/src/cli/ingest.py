@@ -12,7 +12,8 @@ from src.ingest.template_processor import process_template
 @click.option("--regions", "num_regions", default=1, type=int, help="Number of material regions to detect")
 @click.option("--max-colors", default=128, type=int, help="Maximum palette colors")
 @click.option("--threshold", "bg_threshold", default=30, type=int, help="Background removal threshold")
-def ingest(input_path, asset_type, name, output_dir, num_regions, max_colors, bg_threshold):
+@click.option("--connected-bg", "bg_connected", is_flag=True, help="Only remove background connected to the image border")
+def ingest(input_path, asset_type, name, output_dir, num_regions, max_colors, bg_threshold, bg_connected):
     """Process an AI draft image into a cleaned template."""
     result = process_template(
         input_path=Path(input_path),
@@ -22,6 +23,7 @@ def ingest(input_path, asset_type, name, output_dir, num_regions, max_colors, bg
         num_regions=num_regions,
         max_colors=max_colors,
         bg_threshold=bg_threshold,
+        bg_connected=bg_connected,
     )
     click.echo(f"Template '{name}' processed successfully.")
     click.echo(f"  Type: {result['type']}")
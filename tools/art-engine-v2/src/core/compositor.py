@@ -2,6 +2,8 @@
 from __future__ import annotations
 import numpy as np
 
+from src.core.layer import Layer
+
 
 def alpha_composite(bg: np.ndarray, fg: np.ndarray) -> np.ndarray:
     """Porter-Duff 'over' compositing of fg onto bg.
@@ -30,18 +32,60 @@ def alpha_composite(bg: np.ndarray, fg: np.ndarray) -> np.ndarray:
     return result
 
 
-def alpha_composite_at(
-    bg: np.ndarray, fg: np.ndarray, x: int, y: int
+def alpha_composite_fixed(
+    bg: np.ndarray, fg: np.ndarray, out: np.ndarray | None = None
 ) -> np.ndarray:
-    """Composite fg onto bg at offset (x, y) with bounds clipping.
+    """Porter-Duff 'over' compositing in integer fixed-point arithmetic.
+
+    Alpha weights are kept premultiplied in uint16 with a scale of 255
+    (fg_a * 255 and bg_a * (255 - fg_a) both fit in 16 bits), and only the
+    colour sums are widened to uint32 before the final un-premultiply. The
+    result truncates like alpha_composite and matches it to within one level.
 
-    If fg extends beyond bg edges, it is clipped. Does not modify bg in place.
+    Args:
+        bg: RGBA uint8 background
+        fg: RGBA uint8 foreground, same shape as bg
+        out: Optional RGBA uint8 buffer to write into. May alias bg or fg,
+            which composites in place.
+
+    Returns:
+        The output buffer (allocated if out is None)
     """
-    result = bg.copy()
-    bg_h, bg_w = bg.shape[:2]
-    fg_h, fg_w = fg.shape[:2]
+    assert bg.shape == fg.shape, f"Shape mismatch: {bg.shape} vs {fg.shape}"
+    if out is None:
+        out = np.empty_like(bg)
+    assert out.shape == bg.shape, f"Shape mismatch: {out.shape} vs {bg.shape}"
+
+    # Premultiplied alpha weights, scaled by 255
+    fg_w = fg[:, :, 3:4].astype(np.uint16)
+    bg_w = np.subtract(255, fg_w, dtype=np.uint16)
+    bg_w *= bg[:, :, 3:4]
+    fg_w *= 255
+    out_w = fg_w + bg_w  # == out_a * 255, at most 255 * 255
+
+    # Premultiplied colour sum: fg_c * fg_a * 255 + bg_c * bg_a * (255 - fg_a)
+    num = np.multiply(fg[:, :, :3], fg_w, dtype=np.uint32)
+    num += np.multiply(bg[:, :, :3], bg_w, dtype=np.uint32)
+
+    # Un-premultiply; fully transparent pixels have num == 0 and stay black
+    num //= np.maximum(out_w, 1)
+    out[:, :, :3] = num
+    out[:, :, 3] = out_w[:, :, 0] // 255
+
+    return out
+
+
+def _clip_window(
+    bg_shape: tuple[int, ...], fg_shape: tuple[int, ...], x: int, y: int
+) -> tuple[tuple[slice, slice], tuple[slice, slice]] | None:
+    """Clip fg placed at (x, y) against bg.
+
+    Returns:
+        (dst, src) slice pairs for bg and fg, or None if nothing overlaps
+    """
+    bg_h, bg_w = bg_shape[:2]
+    fg_h, fg_w = fg_shape[:2]
 
-    # Calculate source and destination regions with clipping
     src_x = max(0, -x)
     src_y = max(0, -y)
     dst_x = max(0, x)
@@ -51,13 +95,100 @@ def alpha_composite_at(
     copy_h = min(fg_h - src_y, bg_h - dst_y)
 
     if copy_w <= 0 or copy_h <= 0:
-        return result
+        return None
+
+    dst = (slice(dst_y, dst_y + copy_h), slice(dst_x, dst_x + copy_w))
+    src = (slice(src_y, src_y + copy_h), slice(src_x, src_x + copy_w))
+    return dst, src
+
+
+def composite_into(canvas: np.ndarray, fg: np.ndarray, x: int, y: int) -> None:
+    """Composite fg onto canvas at offset (x, y), modifying canvas in place.
 
-    # Extract regions
-    bg_region = result[dst_y:dst_y + copy_h, dst_x:dst_x + copy_w]
-    fg_region = fg[src_y:src_y + copy_h, src_x:src_x + copy_w]
+    Only the clipped destination window is read and written, so the cost is
+    proportional to the overlap area rather than the canvas size.
+    """
+    window = _clip_window(canvas.shape, fg.shape, x, y)
+    if window is None:
+        return
+    dst, src = window
+    region = canvas[dst]
+    alpha_composite_fixed(region, fg[src], out=region)
+
+
+def alpha_composite_at(
+    bg: np.ndarray, fg: np.ndarray, x: int, y: int
+) -> np.ndarray:
+    """Composite fg onto bg at offset (x, y) with bounds clipping.
 
-    # Composite the overlapping region
-    result[dst_y:dst_y + copy_h, dst_x:dst_x + copy_w] = alpha_composite(bg_region, fg_region)
+    If fg extends beyond bg edges, it is clipped. Does not modify bg in place;
+    use composite_into to avoid the full-canvas copy.
+    """
+    result = bg.copy()
+    composite_into(result, fg, x, y)
+    return result
+
+
+def composite_layer(canvas: np.ndarray, layer: Layer) -> None:
+    """Composite a layer onto canvas in place, blending only its opaque bounding box."""
+    if layer.bbox is None:
+        return
+    x0, y0 = layer.bbox[:2]
+    composite_into(canvas, layer.cropped(), x0, y0)
+
+
+def flatten_layers(
+    layers: dict[str, Layer],
+    order: list[str],
+    size: tuple[int, int] | None = None,
+) -> np.ndarray:
+    """Flatten a stack of layers bottom-to-top in a single pass.
+
+    Colour and alpha are accumulated premultiplied in float32 and converted
+    to uint8 once at the end, instead of round-tripping through uint8 after
+    every layer. Each layer only touches its opaque bounding box.
+
+    Args:
+        layers: Layer name to Layer; all layers share one shape
+        order: Layer names bottom-to-top; names missing from layers are skipped
+        size: (width, height) of the output, required if no layer is present
+
+    Returns:
+        RGBA uint8 array, rounded to nearest
+    """
+    stack = [layers[name] for name in order if name in layers]
+    if stack:
+        height, width = stack[0].pixels.shape[:2]
+    elif size is not None:
+        width, height = size
+    else:
+        raise ValueError("flatten_layers needs at least one layer or an explicit size")
+
+    acc_rgb = np.zeros((height, width, 3), dtype=np.float32)  # Premultiplied, 0-255
+    acc_a = np.zeros((height, width, 1), dtype=np.float32)    # Coverage, 0-1
+
+    for layer in stack:
+        assert layer.pixels.shape[:2] == (height, width), (
+            f"Shape mismatch: {layer.pixels.shape[:2]} vs {(height, width)}"
+        )
+        if layer.bbox is None:
+            continue
+        x0, y0, x1, y1 = layer.bbox
+        fg = layer.cropped()
+        fg_a = fg[:, :, 3:4].astype(np.float32) / 255.0
+        keep = 1.0 - fg_a
+
+        rgb = acc_rgb[y0:y1, x0:x1]
+        rgb *= keep
+        rgb += fg[:, :, :3] * fg_a
+        alpha = acc_a[y0:y1, x0:x1]
+        alpha *= keep
+        alpha += fg_a
+
+    result = np.zeros((height, width, 4), dtype=np.uint8)
+    covered = acc_a[:, :, 0] > 0
+    rgb = acc_rgb[covered] / acc_a[covered]
+    result[covered, :3] = np.clip(np.rint(rgb), 0, 255)
+    result[:, :, 3] = np.clip(np.rint(acc_a[:, :, 0] * 255.0), 0, 255)
 
     return result
@@ -0,0 +1,173 @@
+"""Display lists: record drawing commands, compile once, render many times.
+
+Drawing straight to a canvas writes one RGBA pixel run per primitive call.
+A DisplayList records the calls instead. Compiling rasterizes each run of
+opaque commands (rects, lines, ellipses, masks) into a label map of color
+indices with the ordinary primitives, so overlapping commands resolve in
+painter's order and commands sharing a color share one label. Rendering
+then gathers every segment's colors in one vectorized assignment.
+
+Commands that read the canvas (blit composites, flood fills) are barriers:
+the labels painted so far are flushed before them. The compiled form is
+kept until another command is recorded, so widgets drawn repeatedly pay
+only for the gathers.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.core.compositor import composite_into
+from src.core.pixels import pack_color, packed_view
+from src.core.primitives import (
+    Color,
+    draw_ellipse,
+    draw_filled_rect,
+    draw_line,
+    draw_rect,
+    flood_fill,
+)
+from src.core.shapes import ellipse_mask, paint_mask
+
+# Label 0 marks undrawn pixels, so a uint16 segment holds this many colors
+_MAX_LABELS = 65535
+
+
+@dataclass
+class _Segment:
+    """Labels of a run of opaque commands, cropped to the pixels they touch."""
+
+    y0: int
+    x0: int
+    labels: np.ndarray  # uint16, 0 where no command drew
+    colors: np.ndarray  # packed uint32 per label; index 0 unused
+    covered: bool  # Every pixel of the crop is drawn
+
+
+class DisplayList:
+    """Recorded drawing commands for a width x height RGBA canvas.
+
+    Coordinates and clipping follow src.core.primitives. Blitted images are
+    kept by reference and must not be modified while the list is in use.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._commands: list[tuple] = []
+        self._compiled: list | None = None
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def _record(self, *command) -> DisplayList:
+        self._commands.append(command)
+        self._compiled = None
+        return self
+
+    def rect(self, x0: int, y0: int, x1: int, y1: int, color: Color) -> DisplayList:
+        """Filled rectangle, corners inclusive."""
+        return self._record("paint", draw_filled_rect, (x0, y0, x1, y1), color)
+
+    def rect_outline(self, x0: int, y0: int, x1: int, y1: int, color: Color) -> DisplayList:
+        """One-pixel rectangle outline."""
+        return self._record("paint", draw_rect, (x0, y0, x1, y1), color)
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: Color) -> DisplayList:
+        """Line between two points, endpoints inclusive."""
+        return self._record("paint", draw_line, (x0, y0, x1, y1), color)
+
+    def ellipse(self, cx: int, cy: int, rx: int, ry: int, color: Color, filled: bool = False) -> DisplayList:
+        """Midpoint ellipse outline, or the filled ellipse spanning the same 2r + 1 pixels."""
+        if filled:
+            return self.mask(ellipse_mask(rx + 0.5, ry + 0.5), cx - rx, cy - ry, color)
+        return self._record("paint", draw_ellipse, (cx, cy, rx, ry), color)
+
+    def mask(self, mask: np.ndarray, x: int, y: int, color: Color) -> DisplayList:
+        """Set the True pixels of a boolean mask placed with its top-left at (x, y)."""
+        return self._record("paint", paint_mask, (mask, x, y), color)
+
+    def fill(self, x: int, y: int, color: Color, tolerance: int = 0) -> DisplayList:
+        """Flood fill from (x, y); reads the canvas, so it is a barrier."""
+        return self._record("fill", x, y, color, tolerance)
+
+    def blit(self, image: np.ndarray, x: int, y: int) -> DisplayList:
+        """Composite an RGBA image with its top-left at (x, y); a barrier."""
+        return self._record("blit", image, x, y)
+
+    def compile(self) -> list:
+        """Rasterize the opaque commands into label segments (cached until the next command)."""
+        if self._compiled is not None:
+            return self._compiled
+
+        steps: list = []
+        labels: np.ndarray | None = None
+        colors: dict[tuple, int] = {}
+
+        def flush() -> None:
+            nonlocal labels
+            if labels is not None:
+                steps.append(_make_segment(labels, colors))
+            labels = None
+            colors.clear()
+
+        for command in self._commands:
+            if command[0] != "paint":
+                flush()
+                steps.append(command)
+                continue
+            _, draw, args, color = command
+            if tuple(color) not in colors and len(colors) == _MAX_LABELS:
+                flush()
+            if labels is None:
+                labels = np.zeros((self.height, self.width), dtype=np.uint16)
+            label = colors.setdefault(tuple(color), len(colors) + 1)
+            draw(labels, *args, label)
+        flush()
+
+        self._compiled = steps
+        return steps
+
+    def render(self, canvas: np.ndarray | None = None) -> np.ndarray:
+        """Draw the list onto canvas (a new transparent one by default) and return it."""
+        if canvas is None:
+            canvas = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        elif canvas.shape[:2] != (self.height, self.width):
+            raise ValueError(
+                f"Canvas is {canvas.shape[1]}x{canvas.shape[0]}, list is {self.width}x{self.height}"
+            )
+
+        words = packed_view(canvas)
+        for step in self.compile():
+            if isinstance(step, _Segment):
+                h, w = step.labels.shape
+                window = words[step.y0:step.y0 + h, step.x0:step.x0 + w]
+                if step.covered:
+                    np.take(step.colors, step.labels, out=window)
+                else:
+                    drawn = step.labels != 0
+                    window[drawn] = step.colors[step.labels[drawn]]
+            elif step[0] == "blit":
+                _, image, x, y = step
+                composite_into(canvas, image, x, y)
+            else:
+                _, x, y, color, tolerance = step
+                flood_fill(canvas, x, y, color, tolerance)
+        return canvas
+
+
+def _make_segment(labels: np.ndarray, colors: dict[tuple, int]) -> _Segment:
+    """Crop a label map to its drawn pixels and pack its color table."""
+    rows = np.flatnonzero(labels.any(axis=1))
+    cols = np.flatnonzero(labels.any(axis=0))
+    if len(rows) == 0:
+        y0 = x0 = 0
+        labels = labels[:0, :0]
+    else:
+        y0, x0 = int(rows[0]), int(cols[0])
+        labels = labels[y0:rows[-1] + 1, x0:cols[-1] + 1].copy()
+    table = np.zeros(len(colors) + 1, dtype=np.uint32)
+    for color, label in colors.items():
+        table[label] = pack_color(color)
+    return _Segment(y0, x0, labels, table, bool(labels.all()))
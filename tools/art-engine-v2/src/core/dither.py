@@ -2,6 +2,16 @@
 from __future__ import annotations
 import numpy as np
 
+from src.core.lru import ByteLRU
+from src.core.palette import quantize_indices
+
+# Integer offset tiles keyed by (matrix_size, spread), filled on first use
+_OFFSET_TILES: dict[tuple[int, int], np.ndarray] = {}
+
+# Offset tiles expanded to a canvas size, keyed by (matrix_size, spread, height, width),
+# capped by total size; a canvas larger than the cap is tiled but not kept
+_TILED_OFFSETS = ByteLRU(64 * 1024 * 1024)
+
 
 def bayer_matrix(size: int) -> np.ndarray:
     """Generate a normalized Bayer matrix of given size (2, 4, or 8).
@@ -27,8 +37,51 @@ def bayer_matrix(size: int) -> np.ndarray:
     return full / (size * size) - 0.5
 
 
+def bayer_offsets(matrix_size: int, spread: int) -> np.ndarray:
+    """Integer per-cell dither offsets for a Bayer matrix at a given spread.
+
+    Values are threshold * spread truncated toward zero. Tiles are built once
+    per (matrix_size, spread) and shared; the returned array is read-only.
+
+    Returns:
+        int16 array (matrix_size, matrix_size)
+    """
+    key = (matrix_size, spread)
+    tile = _OFFSET_TILES.get(key)
+    if tile is None:
+        tile = (bayer_matrix(matrix_size) * spread).astype(np.int16)
+        tile.flags.writeable = False
+        _OFFSET_TILES[key] = tile
+    return tile
+
+
+def tiled_bayer_offsets(matrix_size: int, spread: int, height: int, width: int) -> np.ndarray:
+    """Dither offsets repeated over a whole canvas, ready to add to RGB.
+
+    The most recently used canvas sizes are kept, up to a total byte cap, so
+    repeated icon, background and ingest runs at the same size skip the
+    tiling step.
+
+    Returns:
+        Read-only int16 array (height, width, 1)
+    """
+
+    def build() -> np.ndarray:
+        reps_y = -(-height // matrix_size)
+        reps_x = -(-width // matrix_size)
+        tile = bayer_offsets(matrix_size, spread)
+        tiled = np.tile(tile, (reps_y, reps_x))[:height, :width, np.newaxis].copy()
+        tiled.flags.writeable = False
+        return tiled
+
+    return _TILED_OFFSETS.get_or_create((matrix_size, spread, height, width), build)
+
+
 def apply_ordered_dither(
-    img: np.ndarray, matrix_size: int = 4, spread: int = 16
+    img: np.ndarray,
+    matrix_size: int = 4,
+    spread: int = 16,
+    origin: tuple[int, int] = (0, 0),
 ) -> np.ndarray:
     """Apply ordered dithering to an RGBA image.
 
@@ -36,21 +89,65 @@ def apply_ordered_dither(
         img: RGBA uint8 numpy array (H, W, 4)
         matrix_size: Bayer matrix size (2, 4, or 8)
         spread: Dither intensity (how much to offset pixel values)
+        origin: (x, y) canvas position of img's top-left pixel, so tiles of a
+            larger image keep the same Bayer phase as a single-shot render
 
     Returns:
         Dithered RGBA uint8 array (alpha preserved unchanged)
     """
-    result = img.copy()
-    matrix = bayer_matrix(matrix_size)
     h, w = img.shape[:2]
+    phase_x = origin[0] % matrix_size
+    phase_y = origin[1] % matrix_size
+    offsets = tiled_bayer_offsets(matrix_size, spread, h + phase_y, w + phase_x)
+    offsets = offsets[phase_y:, phase_x:]
+
+    dithered = img[:, :, :3] + offsets  # int16, no wraparound
+    np.clip(dithered, 0, 255, out=dithered)
 
-    for y in range(h):
-        for x in range(w):
-            if img[y, x, 3] == 0:
-                continue
-            threshold = matrix[y % matrix_size, x % matrix_size]
-            for c in range(3):  # RGB only, not alpha
-                val = int(img[y, x, c]) + int(threshold * spread)
-                result[y, x, c] = max(0, min(255, val))
+    # Only non-transparent pixels are dithered
+    result = img.copy()
+    opaque = (img[:, :, 3] != 0)[:, :, np.newaxis]
+    np.copyto(result[:, :, :3], dithered, casting="unsafe", where=opaque)
 
     return result
+
+
+def dither_to_indices(
+    img: np.ndarray,
+    palette: list[tuple[int, int, int]],
+    matrix_size: int = 4,
+    spread: int = 0,
+) -> np.ndarray:
+    """Ordered-dither and quantize an RGBA image straight to palette indices.
+
+    Fuses apply_ordered_dither and quantize_image: each non-transparent pixel
+    gets its Bayer offset and is mapped to the nearest palette color in one
+    traversal, with no intermediate RGBA copies. A spread of 0 quantizes
+    without dithering.
+
+    Args:
+        img: RGBA uint8 array (H, W, 4)
+        palette: RGB palette to quantize to
+        matrix_size: Bayer matrix size (2, 4, or 8)
+        spread: Dither intensity
+
+    Returns:
+        (H, W) index image (uint8 when the palette fits, else uint16);
+        transparent pixels get index len(palette)
+    """
+    h, w = img.shape[:2]
+    dtype = np.uint8 if len(palette) < 256 else np.uint16
+    indices = np.full((h, w), len(palette), dtype=dtype)
+
+    opaque = img[:, :, 3] != 0
+    if not np.any(opaque):
+        return indices
+
+    rgb = img[opaque][:, :3]
+    if spread:
+        offsets = tiled_bayer_offsets(matrix_size, spread, h, w)
+        rgb = rgb + offsets[opaque]
+        np.clip(rgb, 0, 255, out=rgb)
+
+    indices[opaque] = quantize_indices(rgb, palette)
+    return indices
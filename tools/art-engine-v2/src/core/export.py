@@ -0,0 +1,95 @@
+"""PNG export helpers."""
+from __future__ import annotations
+
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+
+def save_indexed_png(
+    path: Path, indices: np.ndarray, palette: list[tuple[int, int, int]]
+) -> None:
+    """Save a palette-indexed image as an 8-bit paletted PNG.
+
+    Index len(palette) is written as the fully transparent entry, matching
+    dither_to_indices. Loading with .convert("RGBA") restores the colors.
+
+    Args:
+        path: Output PNG path
+        indices: (H, W) index image
+        palette: Up to 255 RGB colors
+    """
+    if len(palette) > 255:
+        raise ValueError(f"Indexed PNG holds at most 255 colors plus transparency, got {len(palette)}")
+    img = Image.fromarray(indices.astype(np.uint8))
+    flat = [channel for color in palette for channel in color] + [0, 0, 0]
+    img.putpalette(flat)
+    img.save(path, transparency=len(palette))
+
+
+class PngStreamWriter:
+    """Write an 8-bit RGBA PNG incrementally, a band of rows at a time.
+
+    Rows are deflated as they arrive, so memory use is bounded by the band
+    size rather than the image size. Use as a context manager; rows must be
+    written top to bottom and total exactly ``height``.
+    """
+
+    _CHUNK_LIMIT = 1 << 20
+
+    def __init__(self, path: Path, width: int, height: int, compress_level: int = 6):
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._file = open(path, "wb")
+        self._deflate = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # Bit depth 8, color type 6 (RGBA), default compression/filter, no interlace
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append a band of RGBA uint8 rows (N, width, 4)."""
+        if rows.shape[1:] != (self.width, 4):
+            raise ValueError(f"Expected rows of shape (N, {self.width}, 4), got {rows.shape}")
+        if self._rows_written + rows.shape[0] > self.height:
+            raise ValueError("More rows written than the image height")
+        # Filter type 0 (None) byte before each scanline
+        scanlines = np.zeros((rows.shape[0], self.width * 4 + 1), dtype=np.uint8)
+        scanlines[:, 1:] = rows.reshape(rows.shape[0], -1)
+        self._pending += self._deflate.compress(scanlines.tobytes())
+        self._rows_written += rows.shape[0]
+        if len(self._pending) >= self._CHUNK_LIMIT:
+            self._write_chunk(b"IDAT", bytes(self._pending))
+            self._pending.clear()
+
+    def close(self) -> None:
+        """Flush compressed data and finish the file."""
+        if self._file.closed:
+            return
+        try:
+            if self._rows_written != self.height:
+                raise ValueError(f"Wrote {self._rows_written} of {self.height} rows")
+            self._pending += self._deflate.flush()
+            self._write_chunk(b"IDAT", bytes(self._pending))
+            self._write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> PngStreamWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
@@ -0,0 +1,60 @@
+"""Image layers that track the bounding box of their non-transparent pixels."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+BBox = tuple[int, int, int, int]  # (x0, y0, x1, y1), end-exclusive
+
+
+def opaque_bbox(img: np.ndarray) -> BBox | None:
+    """Find the bounding box of pixels with alpha > 0.
+
+    Args:
+        img: RGBA uint8 array (H, W, 4)
+
+    Returns:
+        (x0, y0, x1, y1) with exclusive end, or None if fully transparent
+    """
+    alpha = img[:, :, 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+@dataclass
+class Layer:
+    """RGBA pixels plus the box outside of which every pixel is transparent."""
+
+    pixels: np.ndarray
+    bbox: BBox | None
+
+    @classmethod
+    def from_array(cls, pixels: np.ndarray) -> Layer:
+        """Wrap an RGBA array, measuring its opaque bounding box."""
+        return cls(pixels, opaque_bbox(pixels))
+
+    @classmethod
+    def load(cls, path: Path, size: tuple[int, int] | None = None) -> Layer:
+        """Load a PNG as RGBA, optionally nearest-resized to (width, height)."""
+        img = Image.open(path).convert("RGBA")
+        if size is not None and img.size != size:
+            img = img.resize(size, Image.Resampling.NEAREST)
+        return cls.from_array(np.array(img))
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the layer has no visible pixels."""
+        return self.bbox is None
+
+    def cropped(self) -> np.ndarray:
+        """View of the pixels inside the bounding box (empty if transparent)."""
+        if self.bbox is None:
+            return self.pixels[:0, :0]
+        x0, y0, x1, y1 = self.bbox
+        return self.pixels[y0:y1, x0:x1]
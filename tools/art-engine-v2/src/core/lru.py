@@ -0,0 +1,51 @@
+"""In-memory least-recently-used cache bounded by total size in bytes.
+
+Masks, dither offsets and vignettes can be as large as the canvas they are
+built for, so a cap on the number of entries does not bound their memory.
+ByteLRU caps the sum of the values' nbytes instead.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class ByteLRU:
+    """LRU cache of arrays (or objects with an nbytes size) within max_bytes in total.
+
+    A value larger than the whole cap is returned to the caller but never
+    kept, so one huge canvas cannot flush every other entry.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be non-negative, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_create(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Return the value for key, building and storing it on a miss."""
+        value = self._entries.pop(key, None)
+        if value is None:
+            value = build()
+            if value.nbytes > self.max_bytes:
+                return value
+            # Dicts keep insertion order, so the first entry is the least recently used
+            while self._entries and self.nbytes + value.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.pop(next(iter(self._entries))).nbytes
+            self.nbytes += value.nbytes
+        self._entries[key] = value
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,83 @@
+"""Material registry: data-driven material ramps and swap lookup tables."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from src.core.palette import generate_ramp, hex_to_rgb
+from src.data import MATERIALS_PATH, load_materials
+
+RAMP_STEPS = 7
+
+
+class MaterialRegistry:
+    """Materials by id, with ramps and swap LUTs built on first use and cached."""
+
+    def __init__(self, materials: list[dict]):
+        self._materials = {entry["id"]: entry for entry in materials}
+        self._ramps: dict[str, list[tuple[int, int, int]]] = {}
+        self._luts: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> MaterialRegistry:
+        """Build a registry from a materials JSON file."""
+        return cls(load_materials(path))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._materials
+
+    @property
+    def names(self) -> list[str]:
+        """All material ids, in file order."""
+        return list(self._materials)
+
+    def _entry(self, name: str) -> dict:
+        entry = self._materials.get(name)
+        if entry is None:
+            raise ValueError(f"Unknown material {name!r}")
+        return entry
+
+    def base(self, name: str) -> tuple[int, int, int]:
+        """Base RGB color of a material."""
+        return hex_to_rgb(self._entry(name)["base"])
+
+    def ramp(self, name: str) -> list[tuple[int, int, int]]:
+        """Light-to-dark ramp of a material."""
+        ramp = self._ramps.get(name)
+        if ramp is None:
+            ramp = generate_ramp(self.base(name), RAMP_STEPS)
+            self._ramps[name] = ramp
+        return ramp
+
+    def lut(self, name: str) -> np.ndarray:
+        """Swap LUT of a material: read-only (RAMP_STEPS, 3) uint8, indexed by ramp position."""
+        lut = self._luts.get(name)
+        if lut is None:
+            lut = np.asarray(self.ramp(name), dtype=np.uint8)
+            lut.flags.writeable = False
+            self._luts[name] = lut
+        return lut
+
+    def unknown(self, names: list[str]) -> list[str]:
+        """Names not in the registry, in first-seen order without repeats."""
+        return list(dict.fromkeys(name for name in names if name not in self._materials))
+
+    def validate(self, names: list[str]) -> None:
+        """Raise ValueError naming every unknown material."""
+        missing = self.unknown(names)
+        if missing:
+            raise ValueError(
+                f"Unknown materials: {', '.join(missing)} (known: {', '.join(self.names)})"
+            )
+
+
+_DEFAULT_REGISTRY: MaterialRegistry | None = None
+
+
+def default_registry() -> MaterialRegistry:
+    """The registry loaded from the bundled src/data/materials.json."""
+    global _DEFAULT_REGISTRY
+    if _DEFAULT_REGISTRY is None:
+        _DEFAULT_REGISTRY = MaterialRegistry.from_file(MATERIALS_PATH)
+    return _DEFAULT_REGISTRY
@@ -0,0 +1,106 @@
+"""Content-keyed on-disk cache for generated noise fields."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# Bump when noise output changes so stale fields are never served
+_FORMAT_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class NoiseCache:
+    """Directory of .npy noise fields with a size cap and LRU eviction.
+
+    Fields are keyed by a hash of their generation parameters and
+    memory-mapped read-only on a hit. A file's mtime records its last use;
+    when the directory grows past ``max_bytes`` the least recently used
+    fields are removed.
+    """
+
+    def __init__(self, root: Path | str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(kind: str, **params) -> str:
+        """Stable hex key for a noise kind and its generation parameters."""
+        payload = json.dumps(
+            {"kind": kind, "version": _FORMAT_VERSION, **params}, sort_keys=True
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the cached field as a read-only memory map, or None on a miss."""
+        path = self._path(key)
+        try:
+            field = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Read-only or shared cache: the entry is still valid, just not touched
+            pass
+        return field
+
+    def put(self, key: str, field: np.ndarray) -> None:
+        """Store a field atomically, then evict old entries over the size cap."""
+        fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(field))
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict(keep=self._path(key))
+
+    def get_or_create(
+        self, kind: str, params: dict, build: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """Return the cached field for (kind, params), building and storing it on a miss."""
+        key = self.key(kind, **params)
+        field = self.get(key)
+        if field is None:
+            field = build()
+            self.put(key, field)
+        return field
+
+    def size_bytes(self) -> int:
+        """Total size of cached fields on disk."""
+        return sum(entry.stat().st_size for entry in self.root.glob("*.npy"))
+
+    def clear(self) -> None:
+        """Remove every cached field."""
+        for entry in self.root.glob("*.npy"):
+            entry.unlink(missing_ok=True)
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for entry in self.root.glob("*.npy"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            entry.unlink(missing_ok=True)
+            total -= size
@@ -6,6 +6,10 @@ palette constants for materials, quality tiers, zones, and UI elements.
 
 import numpy as np
 
+from src.core.lru import ByteLRU
+from src.core.pixels import unique_rgb
+from src.data import load_materials
+
 
 def hex_to_rgb(hex_str: str) -> tuple[int, int, int]:
     """Convert hex color string to RGB tuple.
@@ -143,33 +147,237 @@ def quantize_image(img: np.ndarray, palette: list[tuple[int, int, int]]) -> np.n
         >>> result.shape
         (10, 10, 4)
     """
-    height, width = img.shape[:2]
     result = img.copy()
 
     # Process only non-transparent pixels
-    for y in range(height):
-        for x in range(width):
-            if img[y, x, 3] > 0:  # Non-transparent
-                color = tuple(img[y, x, :3])
-                nearest_idx = nearest_color(color, palette)
-                result[y, x, :3] = palette[nearest_idx]
+    opaque = img[:, :, 3] > 0
+    if np.any(opaque):
+        colors = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        result[opaque, :3] = colors[quantize_indices(img[opaque][:, :3], palette)]
+
+    return result
+
+
+def nearest_color_batch(
+    pixels: np.ndarray,
+    palette: list[tuple[int, int, int]] | np.ndarray,
+    chunk_elements: int = 1 << 20,
+) -> np.ndarray:
+    """Find the nearest palette color for every row of an (N, 3) color array.
+
+    Vectorized nearest_color: squared distances are summed per channel in
+    int32, which cannot overflow for 8-bit colors (at most 3 * 255^2), and
+    ties resolve to the lowest palette index. Pixels are processed in chunks
+    of about chunk_elements distances to bound temporary memory.
+
+    Args:
+        pixels: (N, 3) array of RGB colors with values 0-255
+        palette: (K, 3) palette colors
+        chunk_elements: Approximate number of pixel-palette distances per chunk
+
+    Returns:
+        (N,) array of palette indices
+
+    Examples:
+        >>> palette = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        >>> nearest_color_batch(np.array([[250, 10, 10], [10, 10, 250]]), palette).tolist()
+        [0, 2]
+    """
+    colors = np.asarray(palette, dtype=np.int32).reshape(-1, 3)
+    if len(colors) == 0:
+        raise ValueError("Palette must contain at least one color")
+    pixels = np.asarray(pixels).reshape(-1, 3)
+    rows = max(1, chunk_elements // len(colors))
+
+    result = np.empty(len(pixels), dtype=np.intp)
+    for start in range(0, len(pixels), rows):
+        block = pixels[start:start + rows].astype(np.int32)
+        dist = np.zeros((len(block), len(colors)), dtype=np.int32)
+        for channel in range(3):
+            diff = block[:, channel, np.newaxis] - colors[np.newaxis, :, channel]
+            dist += diff * diff
+        result[start:start + rows] = dist.argmin(axis=1)
+    return result
 
+
+class PaletteLUT:
+    """Bucketed RGB lookup table for exact nearest-palette search.
+
+    RGB space is split into 32x32x32 buckets of 8 values per channel. For
+    each bucket, a palette entry can only be nearest to some color inside it
+    if its minimum distance to the bucket is within the smallest maximum
+    distance of any entry. If one entry survives, or all eight bucket corners
+    share a nearest entry (palette cells are convex), the bucket maps
+    straight to it. Otherwise the bucket keeps its short candidate list, in
+    palette order, which is searched per pixel. Results equal nearest_color,
+    including ties.
+    """
+
+    _SHIFT = 3
+    _BUCKETS = 256 >> _SHIFT
+    # Padding color for candidate rows, farther than any real palette entry
+    _FAR = 4096
+
+    def __init__(self, palette: list[tuple[int, int, int]] | np.ndarray):
+        colors = np.asarray(palette, dtype=np.int32).reshape(-1, 3)
+        if len(colors) == 0:
+            raise ValueError("Palette must contain at least one color")
+        self.colors = colors
+        self._padded = np.vstack([colors, np.full((1, 3), self._FAR, dtype=np.int32)])
+
+        # Repeated colors never win over their first occurrence
+        _, first = unique_rgb(colors, return_index=True)
+        distinct = np.zeros(len(colors), dtype=bool)
+        distinct[first] = True
+
+        lo = np.arange(self._BUCKETS, dtype=np.int32) << self._SHIFT
+        hi = lo + (1 << self._SHIFT) - 1
+        # Per-channel squared distance bounds from each bucket span to each entry
+        p = colors.T[:, np.newaxis, :]
+        near = np.maximum(0, np.maximum(lo[:, np.newaxis] - p, p - hi[:, np.newaxis])) ** 2
+        far = np.maximum(p - lo[:, np.newaxis], hi[:, np.newaxis] - p) ** 2
+
+        n = self._BUCKETS
+        table = np.empty((n, n, n), dtype=np.int32)
+        rows = []
+        row_count = 0
+        for r in range(n):
+            # (G, B, K) bounds for this red slice
+            min_dist = near[0, r] + near[1][:, np.newaxis, :] + near[2][np.newaxis, :, :]
+            max_dist = far[0, r] + far[1][:, np.newaxis, :] + far[2][np.newaxis, :, :]
+            viable = (min_dist <= max_dist.min(axis=-1, keepdims=True)) & distinct
+            table[r] = viable.argmax(axis=-1)
+            multi = viable.sum(axis=-1) > 1
+            if not np.any(multi):
+                continue
+
+            gs, bs = np.nonzero(multi)
+            mask = viable[multi]
+            # Stable sort keeps candidates in palette order so ties pick the lowest index
+            order = np.argsort(~mask, axis=-1, kind="stable")[:, :mask.sum(axis=-1).max()]
+            order[np.take_along_axis(~mask, order, axis=-1)] = len(colors)
+
+            corners = np.stack(np.meshgrid(
+                [lo[r], hi[r]], [0, 1], [0, 1], indexing="ij"
+            ), axis=-1).reshape(-1, 3)
+            corner_rgb = np.empty((len(gs), 8, 3), dtype=np.int32)
+            corner_rgb[:, :, 0] = corners[:, 0]
+            corner_rgb[:, :, 1] = np.where(corners[:, 1], hi[gs, np.newaxis], lo[gs, np.newaxis])
+            corner_rgb[:, :, 2] = np.where(corners[:, 2], hi[bs, np.newaxis], lo[bs, np.newaxis])
+            corner_best = self._refine(order[:, np.newaxis, :], corner_rgb)
+            settled = np.all(corner_best == corner_best[:, :1], axis=1)
+            table[r, gs[settled], bs[settled]] = corner_best[settled, 0]
+
+            order = order[~settled]
+            # Negative entries point at candidate rows: -1 is row 0
+            table[r, gs[~settled], bs[~settled]] = -(row_count + np.arange(len(order)) + 1)
+            row_count += len(order)
+            rows.append(order)
+
+        width = max((order.shape[1] for order in rows), default=1)
+        self.table = table.reshape(-1)
+        self.candidates = np.full((row_count, width), len(colors), dtype=np.int32)
+        start = 0
+        for order in rows:
+            self.candidates[start:start + len(order), :order.shape[1]] = order
+            start += len(order)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the lookup arrays, for byte-capped caches."""
+        return self.colors.nbytes + self._padded.nbytes + self.table.nbytes + self.candidates.nbytes
+
+    def _refine(self, candidates: np.ndarray, rgb: np.ndarray) -> np.ndarray:
+        """Pick the nearest of each pixel's candidates (first one on ties)."""
+        diff = self._padded[candidates] - rgb[..., np.newaxis, :]
+        dist = (diff * diff).sum(axis=-1)
+        best = dist.argmin(axis=-1)
+        return np.take_along_axis(
+            np.broadcast_to(candidates, dist.shape), best[..., np.newaxis], axis=-1
+        )[..., 0]
+
+    def lookup(self, rgb: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        """Nearest palette index for each row of an (N, 3) array of 0-255 colors."""
+        rgb = np.asarray(rgb).reshape(-1, 3)
+        result = np.empty(len(rgb), dtype=np.intp)
+        for start in range(0, len(rgb), chunk):
+            block = rgb[start:start + chunk].astype(np.int32)
+            buckets = block >> self._SHIFT
+            entry = self.table[
+                (buckets[:, 0] * self._BUCKETS + buckets[:, 1]) * self._BUCKETS + buckets[:, 2]
+            ]
+            out = result[start:start + chunk]
+            out[:] = entry
+
+            refine = np.flatnonzero(entry < 0)
+            if refine.size:
+                out[refine] = self._refine(self.candidates[-entry[refine] - 1], block[refine])
+        return result
+
+
+# Lookup tables keyed by palette bytes, capped by their total size
+_PALETTE_LUTS = ByteLRU(8 * 1024 * 1024)
+
+# Below this many pixels a direct search is cheaper than building a table
+_LUT_MIN_PIXELS = 4096
+
+
+def palette_lut(palette: list[tuple[int, int, int]] | np.ndarray) -> PaletteLUT:
+    """Return the cached PaletteLUT for a palette, building it on first use."""
+    key = np.asarray(palette, dtype=np.int32).reshape(-1, 3).tobytes()
+    return _PALETTE_LUTS.get_or_create(key, lambda: PaletteLUT(palette))
+
+
+def quantize_indices(rgb: np.ndarray, palette: list[tuple[int, int, int]] | np.ndarray) -> np.ndarray:
+    """Nearest palette index for each row of an (N, 3) array of 0-255 colors.
+
+    Large batches go through the palette's cached PaletteLUT; small ones for
+    a palette without a table are searched directly.
+
+    Returns:
+        (N,) array of palette indices, identical to nearest_color per pixel
+    """
+    key = np.asarray(palette, dtype=np.int32).reshape(-1, 3).tobytes()
+    if len(rgb) < _LUT_MIN_PIXELS and key not in _PALETTE_LUTS:
+        return nearest_color_batch(rgb, palette)
+    return palette_lut(palette).lookup(rgb)
+
+
+def indices_to_rgba(
+    indices: np.ndarray, palette: list[tuple[int, int, int]], alpha: np.ndarray | None = None
+) -> np.ndarray:
+    """Expand a palette-indexed image back to RGBA.
+
+    Index len(palette) marks transparent pixels and expands to (0, 0, 0, 0).
+
+    Args:
+        indices: (H, W) integer index image
+        palette: RGB palette the indices refer to
+        alpha: Optional (H, W) alpha to restore; defaults to 255 for palette
+            pixels and 0 for the transparent index
+
+    Returns:
+        RGBA uint8 array (H, W, 4)
+    """
+    lut = np.zeros((len(palette) + 1, 4), dtype=np.uint8)
+    if len(palette):
+        lut[:-1, :3] = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        lut[:-1, 3] = 255
+    result = lut[indices]
+    if alpha is not None:
+        result[:, :, 3] = alpha
     return result
 
 
-# Material base colors for equipment rendering
+# Template source materials: drafts are matched against these ramps to find
+# each region's source material (the full registry is in src/core/materials.py)
 _MATERIAL_BASES = {
-    "iron": (140, 140, 150),
-    "gold": (212, 175, 55),
-    "leather": (139, 90, 43),
-    "cloth": (120, 80, 140),
-    "bone": (220, 210, 190),
-    "crystal": (100, 180, 220),
-    "wood": (110, 80, 50),
-    "stone": (130, 125, 120),
+    entry["id"]: hex_to_rgb(entry["base"])
+    for entry in load_materials()
+    if entry.get("template_source")
 }
 
-# Pre-generated 7-step ramps for each material
+# Pre-generated 7-step ramps for each template source material
 MATERIAL_RAMPS = {name: generate_ramp(base, 7) for name, base in _MATERIAL_BASES.items()}
 
 # Quality tier colors for item rendering and UI
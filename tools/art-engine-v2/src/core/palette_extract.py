@@ -0,0 +1,109 @@
+"""Palette extraction from images via packed-color histograms and median cut."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.pixels import pack_rgb, unpack_rgb
+
+
+# Histograms with more distinct colors than this are binned before median cut
+_COARSE_THRESHOLD = 32768
+
+
+def color_histogram(rgb: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct colors and their pixel counts.
+
+    Args:
+        rgb: (N, 3) uint8 colors
+
+    Returns:
+        (colors, counts): (M, 3) distinct colors in lexicographic order and
+        their (M,) occurrence counts
+    """
+    packed, counts = np.unique(pack_rgb(np.asarray(rgb).reshape(-1, 3)), return_counts=True)
+    return unpack_rgb(packed), counts
+
+
+def _coarse_histogram(colors: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Merge a histogram into 5-bit-per-channel bins, each at its weighted mean color."""
+    bins = ((colors[:, 0] >> 3) << 10) | ((colors[:, 1] >> 3) << 5) | (colors[:, 2] >> 3)
+    occupied, inverse = np.unique(bins, return_inverse=True)
+    weights = np.bincount(inverse, weights=counts, minlength=len(occupied))
+    sums = np.stack(
+        [np.bincount(inverse, weights=counts * colors[:, c], minlength=len(occupied)) for c in range(3)],
+        axis=1,
+    )
+    return sums / weights[:, np.newaxis], weights
+
+
+class _Box:
+    """A set of histogram colors and its weighted statistics."""
+
+    def __init__(self, colors: np.ndarray, weights: np.ndarray):
+        self.colors = colors
+        self.weights = weights
+        total = weights.sum()
+        self.mean = (colors * weights[:, np.newaxis]).sum(axis=0) / total
+        self.variance = (((colors - self.mean) ** 2) * weights[:, np.newaxis]).sum(axis=0) / total
+        # Total squared error of representing the box by its mean
+        self.error = self.variance.sum() * total
+
+    def split(self) -> tuple[_Box, _Box]:
+        """Cut at the weighted median of the channel with the largest variance."""
+        values = self.colors[:, int(self.variance.argmax())]
+        # Compare the channel values themselves: coarse-histogram colors are
+        # fractional bin means, and truncating them could put every color on
+        # one side of the cut
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(self.weights[order])
+        median = values[order[np.searchsorted(cumulative, cumulative[-1] / 2, side="right")]]
+        # Keep both halves non-empty: the channel spans at least two values
+        left = values < median
+        if not np.any(left):
+            left = values <= median
+        right = ~left
+        return (
+            _Box(self.colors[left], self.weights[left]),
+            _Box(self.colors[right], self.weights[right]),
+        )
+
+
+def extract_palette(rgb: np.ndarray, max_colors: int) -> list[tuple[int, int, int]]:
+    """Build a palette of at most max_colors for a set of pixel colors.
+
+    Colors are histogrammed on packed uint32 keys. If there are no more
+    distinct colors than max_colors they are returned as-is; otherwise
+    median cut repeatedly splits the box with the largest weighted squared
+    error, and each box contributes its weighted mean color. Very large
+    histograms are first merged into 5-bit-per-channel bins placed at their
+    mean color, which keeps extraction fast on full-size drafts.
+
+    Args:
+        rgb: (N, 3) uint8 pixel colors (e.g. the opaque pixels of an image)
+        max_colors: Maximum palette size
+
+    Returns:
+        List of RGB tuples in lexicographic order
+    """
+    if max_colors < 1:
+        raise ValueError(f"max_colors must be at least 1, got {max_colors}")
+    colors, counts = color_histogram(rgb)
+    if len(colors) == 0:
+        return []
+    if len(colors) <= max_colors:
+        return [tuple(int(v) for v in c) for c in colors]
+
+    weights = counts.astype(np.float64)
+    if len(colors) > _COARSE_THRESHOLD:
+        colors, weights = _coarse_histogram(colors, weights)
+    boxes = [_Box(colors.astype(np.float64), weights)]
+    while len(boxes) < max_colors:
+        splittable = [i for i, box in enumerate(boxes) if len(box.colors) > 1]
+        if not splittable:
+            break
+        worst = max(splittable, key=lambda i: boxes[i].error)
+        boxes.extend(boxes.pop(worst).split())
+
+    means = np.array([np.rint(box.mean) for box in boxes], dtype=np.int64)
+    packed = np.unique(pack_rgb(np.clip(means, 0, 255)))
+    return [tuple(int(v) for v in c) for c in unpack_rgb(packed)]
@@ -0,0 +1,77 @@
+"""Packed pixel representations: RGBA canvases as uint32 words.
+
+An (H, W, 4) uint8 canvas shares memory with an (H, W) uint32 view, so
+pixel equality, hashing and histograms become single-word operations.
+Word values follow the machine byte order; use pack_color to build
+comparable constants. pack_rgb gives endian-independent 0x00RRGGBB keys
+whose numeric order is lexicographic RGB order.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def packed_view(canvas: np.ndarray) -> np.ndarray:
+    """View an RGBA uint8 canvas as one uint32 word per pixel, without copying.
+
+    Writes through the view modify the canvas.
+
+    Args:
+        canvas: (H, W, 4) uint8 array whose pixels are contiguous 4-byte runs
+
+    Returns:
+        (H, W) uint32 view sharing the canvas memory
+    """
+    if canvas.dtype != np.uint8 or canvas.ndim != 3 or canvas.shape[2] != 4:
+        raise ValueError(f"Expected an (H, W, 4) uint8 canvas, got {canvas.dtype} {canvas.shape}")
+    if canvas.strides[2] != 1 or canvas.strides[1] % 4 or canvas.strides[0] % 4:
+        raise ValueError("Canvas pixels must be contiguous, 4-byte aligned RGBA runs")
+    return canvas.view(np.uint32)[:, :, 0]
+
+
+def unpacked_view(packed: np.ndarray) -> np.ndarray:
+    """View uint32 words as RGBA bytes: (...,) uint32 -> (..., 4) uint8, without copying.
+
+    Writes through the view modify the words. Strided arrays (e.g. windows
+    of a packed_view) are viewed in place as well.
+
+    Raises:
+        ValueError: If packed is not a uint32 array
+    """
+    if not isinstance(packed, np.ndarray) or packed.dtype != np.uint32:
+        raise ValueError(f"Expected a uint32 array, got {getattr(packed, 'dtype', type(packed))}")
+    return packed[..., np.newaxis].view(np.uint8)
+
+
+def pack_color(color: tuple[int, int, int, int]) -> np.uint32:
+    """The packed_view word for an RGBA color."""
+    return np.asarray(color, dtype=np.uint8).reshape(4).view(np.uint32)[0]
+
+
+def pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Pack (..., 3) RGB values into uint32 0x00RRGGBB keys (sorting is lexicographic)."""
+    rgb = np.asarray(rgb).astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_rgb(packed: np.ndarray) -> np.ndarray:
+    """Inverse of pack_rgb, returning (..., 3) int64 RGB values."""
+    packed = np.asarray(packed).astype(np.int64)
+    return np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1)
+
+
+def unique_rgb(rgb: np.ndarray, return_index: bool = False):
+    """Distinct rows of an (N, 3) RGB array in lexicographic order.
+
+    Equivalent to np.unique(rgb, axis=0) on packed keys, which avoids the
+    slow row-wise sort.
+
+    Returns:
+        (M, 3) int64 colors, plus the index of each color's first occurrence
+        when return_index is set
+    """
+    keys = pack_rgb(np.asarray(rgb).reshape(-1, 3))
+    if return_index:
+        unique, first = np.unique(keys, return_index=True)
+        return unpack_rgb(unique), first
+    return unpack_rgb(np.unique(keys))
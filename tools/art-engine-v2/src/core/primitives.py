@@ -1,8 +1,10 @@
 """Pixel-art drawing primitives: lines, rectangles, ellipses, flood fill."""
 from __future__ import annotations
-from collections import deque
+from bisect import bisect_left, bisect_right
 import numpy as np
 
+from src.core.pixels import pack_color, packed_view
+
 Color = tuple[int, int, int, int]  # RGBA
 
 
@@ -13,9 +15,23 @@ def _set_pixel(canvas: np.ndarray, x: int, y: int, color: Color) -> None:
         canvas[y, x] = color
 
 
+def _clip_span(a: int, b: int, size: int) -> tuple[int, int]:
+    """Clip the inclusive span between a and b to [0, size) as a half-open slice."""
+    return max(0, min(a, b)), min(size, max(a, b) + 1)
+
+
 def draw_line(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: Color) -> None:
-    """Bresenham's line algorithm."""
-    # implement full Bresenham with octant handling
+    """Draw a line, clipped to the canvas.
+
+    Horizontal and vertical lines are filled with one slice assignment;
+    other lines use Bresenham's algorithm. Both set the same pixels.
+    """
+    if y0 == y1 or x0 == x1:
+        # A one-pixel-wide rectangle
+        draw_filled_rect(canvas, x0, y0, x1, y1, color)
+        return
+
+    # Bresenham with octant handling
     dx = abs(x1 - x0)
     dy = -abs(y1 - y0)
     sx = 1 if x0 < x1 else -1
@@ -43,11 +59,12 @@ def draw_rect(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: Col
 
 
 def draw_filled_rect(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: Color) -> None:
-    """Draw filled rectangle."""
+    """Draw filled rectangle (corners inclusive, in any order), clipped to the canvas."""
     h, w = canvas.shape[:2]
-    for y in range(max(0, min(y0, y1)), min(h, max(y0, y1) + 1)):
-        for x in range(max(0, min(x0, x1)), min(w, max(x0, x1) + 1)):
-            canvas[y, x] = color
+    xa, xb = _clip_span(x0, x1, w)
+    ya, yb = _clip_span(y0, y1, h)
+    if xa < xb and ya < yb:
+        canvas[ya:yb, xa:xb] = color
 
 
 def draw_ellipse(canvas: np.ndarray, cx: int, cy: int, rx: int, ry: int, color: Color) -> None:
@@ -93,25 +110,105 @@ def draw_ellipse(canvas: np.ndarray, cx: int, cy: int, rx: int, ry: int, color:
             p2 += dx - dy + rx2
 
 
-def flood_fill(canvas: np.ndarray, x: int, y: int, color: Color) -> None:
-    """BFS flood fill from (x, y) with given color."""
+def _row_runs(matches: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Maximal horizontal runs of True in a boolean mask, in row-major order.
+
+    Returns:
+        (rows, starts, ends) of each run, with ends exclusive
+    """
+    h, w = matches.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = matches
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def connected_region(matches: np.ndarray, xs, ys) -> np.ndarray:
+    """4-connected component(s) of a boolean mask containing the seed pixels.
+
+    Scanline fill over horizontal runs: each run of matching pixels fills
+    as a whole, and spreads to the runs it overlaps in the rows above and
+    below. Work and memory are linear in the image and run count; no
+    per-pixel Python objects are created.
+
+    Args:
+        matches: (H, W) boolean mask of fillable pixels
+        xs, ys: Seed coordinates; seeds outside the mask or on False
+            pixels are ignored
+
+    Returns:
+        (H, W) boolean mask of the filled pixels
+    """
+    h, w = matches.shape
+    rows, starts, ends = _row_runs(matches)
+    # Run index range of each row
+    row_first = np.searchsorted(rows, np.arange(h + 1)).tolist()
+    rows, starts, ends = rows.tolist(), starts.tolist(), ends.tolist()
+
+    filled = np.zeros(len(starts), dtype=bool)
+    stack = []
+    for x, y in zip(np.atleast_1d(xs).tolist(), np.atleast_1d(ys).tolist()):
+        if not (0 <= x < w and 0 <= y < h):
+            continue
+        k = bisect_right(starts, x, row_first[y], row_first[y + 1]) - 1
+        if k >= row_first[y] and x < ends[k] and not filled[k]:
+            filled[k] = True
+            stack.append(k)
+
+    while stack:
+        k = stack.pop()
+        y, start, end = rows[k], starts[k], ends[k]
+        for ny in (y - 1, y + 1):
+            if not 0 <= ny < h:
+                continue
+            lo, hi = row_first[ny], row_first[ny + 1]
+            # Runs in row ny overlapping [start, end): runs are disjoint, so
+            # both their starts and ends are sorted
+            for j in range(bisect_right(ends, start, lo, hi), bisect_left(starts, end, lo, hi)):
+                if not filled[j]:
+                    filled[j] = True
+                    stack.append(j)
+
+    # Paint the filled runs: +1 at each start, -1 at each end, prefix sum
+    marks = np.zeros((h, w + 1), dtype=np.int8)
+    run_rows = np.asarray(rows, dtype=np.intp)[filled]
+    marks[run_rows, np.asarray(starts, dtype=np.intp)[filled]] = 1
+    marks[run_rows, np.asarray(ends, dtype=np.intp)[filled]] = -1
+    return np.cumsum(marks, axis=1, dtype=np.int8)[:, :w] > 0
+
+
+def flood_region(canvas: np.ndarray, x: int, y: int, tolerance: int = 0) -> np.ndarray:
+    """Mask of the 4-connected region a flood fill from (x, y) would cover.
+
+    Args:
+        canvas: RGBA uint8 canvas
+        x, y: Seed pixel
+        tolerance: Largest per-channel difference (alpha included) from the
+            seed color that still counts as the same color; 0 is exact
+
+    Returns:
+        (H, W) boolean mask, all False when the seed is off the canvas
+    """
     h, w = canvas.shape[:2]
     if not (0 <= x < w and 0 <= y < h):
-        return
-    target = tuple(canvas[y, x])
-    fill = tuple(color)
-    if target == fill:
-        return
-    queue = deque([(x, y)])
-    visited = set()
-    while queue:
-        cx, cy = queue.popleft()
-        if (cx, cy) in visited:
-            continue
-        if not (0 <= cx < w and 0 <= cy < h):
-            continue
-        if tuple(canvas[cy, cx]) != target:
-            continue
-        visited.add((cx, cy))
-        canvas[cy, cx] = color
-        queue.extend([(cx+1, cy), (cx-1, cy), (cx, cy+1), (cx, cy-1)])
+        return np.zeros((h, w), dtype=bool)
+    if tolerance <= 0:
+        # Compare whole pixels as single uint32 words
+        words = packed_view(canvas)
+        matches = words == words[y, x]
+    else:
+        diff = np.abs(canvas.astype(np.int16) - canvas[y, x].astype(np.int16))
+        matches = np.all(diff <= tolerance, axis=2)
+    return connected_region(matches, x, y)
+
+
+def flood_fill(canvas: np.ndarray, x: int, y: int, color: Color, tolerance: int = 0) -> None:
+    """Scanline flood fill from (x, y) with given color.
+
+    Args:
+        tolerance: Per-channel color tolerance, see flood_region
+    """
+    region = flood_region(canvas, x, y, tolerance)
+    packed_view(canvas)[region] = pack_color(color)
@@ -0,0 +1,117 @@
+"""Per-template ramp-index maps for fast material swaps.
+
+A ramp map records, for every template pixel, which region it belongs to
+and its position in that region's source material ramp. It depends only
+on the template, so ingest computes it once and icon generation swaps
+materials with a single gather into the target ramp.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from src.core.palette import MATERIAL_RAMPS, nearest_color_batch
+
+# Marks pixels outside every region (or transparent) in both map channels
+NO_RAMP = 255
+
+
+def source_ramps(dominant_colors: list[list[int]]) -> list[list[tuple[int, int, int]]]:
+    """Source material ramp for each region: the ramp whose mid color is nearest.
+
+    Args:
+        dominant_colors: One RGB dominant color per region
+
+    Returns:
+        One MATERIAL_RAMPS ramp per region
+    """
+    if not dominant_colors:
+        return []
+    ramps = list(MATERIAL_RAMPS.values())
+    mid_colors = [ramp[3] for ramp in ramps]
+    return [ramps[i] for i in nearest_color_batch(dominant_colors, mid_colors)]
+
+
+def pixels_digest(img: np.ndarray) -> str:
+    """Short hash identifying template pixels, to detect stale ramp maps."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(img.shape).encode())
+    digest.update(np.ascontiguousarray(img).tobytes())
+    return digest.hexdigest()
+
+
+def build_ramp_map(img: np.ndarray, regions: list[dict]) -> np.ndarray | None:
+    """Compute the ramp map of a template.
+
+    Args:
+        img: Template RGBA uint8 array
+        regions: Region dicts with "pixels" ([x, y] lists) and "dominant_color"
+
+    Returns:
+        (H, W, 2) uint8 array of [region index, source ramp index], NO_RAMP
+        where unassigned; None when regions overlap, since later swaps would
+        then read colors written by earlier ones
+    """
+    h, w = img.shape[:2]
+    if len(regions) >= NO_RAMP:
+        return None
+    ramp_map = np.full((h, w, 2), NO_RAMP, dtype=np.uint8)
+    ramps = source_ramps([region.get("dominant_color", [140, 140, 150])[:3] for region in regions])
+
+    for k, (region, ramp) in enumerate(zip(regions, ramps)):
+        coords = np.asarray(region["pixels"], dtype=np.intp).reshape(-1, 2)
+        xs, ys = coords[:, 0], coords[:, 1]
+        # Same selection as the swap itself: in range and not transparent
+        keep = (ys < h) & (xs < w)
+        xs, ys = xs[keep], ys[keep]
+        keep = img[ys, xs, 3] != 0
+        xs, ys = xs[keep], ys[keep]
+        claimed = ramp_map[ys, xs, 0]
+        if np.any((claimed != NO_RAMP) & (claimed != k)):
+            return None
+        ramp_map[ys, xs, 0] = k
+        ramp_map[ys, xs, 1] = nearest_color_batch(img[ys, xs, :3], ramp)
+
+    return ramp_map
+
+
+def swap_with_ramp_map(
+    img: np.ndarray, ramp_map: np.ndarray, target_ramp: list[tuple[int, int, int]]
+) -> np.ndarray:
+    """Recolor every region pixel of a template into target_ramp with one gather.
+
+    Each pixel that belongs to a region takes the target color at its source
+    ramp index (clamped to the target ramp's length); alpha and pixels outside
+    every region are untouched.
+
+    Args:
+        img: Template RGBA uint8 array the map was built from
+        ramp_map: (H, W, 2) map from build_ramp_map
+        target_ramp: RGB colors of the target material ramp
+
+    Returns:
+        Recolored copy of img
+    """
+    result = img.copy()
+    in_region = ramp_map[:, :, 0] != NO_RAMP
+    target_idx = np.minimum(ramp_map[:, :, 1][in_region], len(target_ramp) - 1)
+    result[in_region, :3] = np.asarray(target_ramp, dtype=np.uint8)[target_idx]
+    return result
+
+
+def ramp_map_path(template_dir: Path, template_name: str) -> Path:
+    """Where a template's ramp map is stored, next to its PNG."""
+    return Path(template_dir) / f"{template_name}.ramps.npy"
+
+
+def load_ramp_map(template_dir: Path, template_name: str, meta: dict, img: np.ndarray) -> np.ndarray | None:
+    """Load a template's ramp map if present and built from these exact pixels."""
+    path = ramp_map_path(template_dir, template_name)
+    if meta.get("ramp_map_digest") != pixels_digest(img) or not path.exists():
+        return None
+    ramp_map = np.load(path)
+    if ramp_map.shape != (*img.shape[:2], 2):
+        return None
+    return ramp_map
@@ -1,13 +1,36 @@
-"""Deterministic seeded RNG wrapper around Python's random module."""
+"""Deterministic seeded RNG wrapper around Python's random module.
+
+Scalar draws come from random.Random. Bulk draws (arrays of values in one
+call) come from a separate NumPy PCG64 bit generator seeded through
+SeedSequence, and are derived from its raw 64-bit outputs with fixed
+arithmetic rather than NumPy's distribution methods. Both PCG64's output
+and SeedSequence's seeding are specified, so bulk draws are reproducible
+across platforms and NumPy versions. The two streams are independent:
+bulk draws never shift the scalar sequence, or vice versa.
+
+stream_seed and stream_rng derive independent substreams from a key such
+as (template, material, quality, seed, stage). Each stage of each job gets
+its own generator, so output does not depend on the order jobs or stages
+run in.
+"""
 from __future__ import annotations
+import hashlib
+import json
 import random
 
+import numpy as np
+
+# Scale from the top 53 bits of a raw draw to a float in [0, 1)
+_FLOAT_SCALE = 1.0 / (1 << 53)
+
 
 class SeededRNG:
     """Seeded random number generator. Same seed = identical sequence."""
 
     def __init__(self, seed: int):
+        self._seed = seed
         self._rng = random.Random(seed)
+        self._bits: np.random.PCG64 | None = None
 
     def random(self) -> float:
         """Return float in [0.0, 1.0)."""
@@ -29,3 +52,71 @@ class SeededRNG:
         """Return base ± pct%. E.g., jitter(100, 0.1) returns 90-110."""
         offset = base * pct
         return base + self._rng.uniform(-offset, offset)
+
+    def _raw(self, n: int) -> np.ndarray:
+        """Next n raw 64-bit outputs of the bulk stream."""
+        if self._bits is None:
+            # random.Random seeds from abs(seed) as well
+            self._bits = np.random.PCG64(np.random.SeedSequence(abs(self._seed)))
+        return self._bits.random_raw(n)
+
+    def random_array(self, n: int) -> np.ndarray:
+        """Return n floats in [0.0, 1.0) from the bulk stream."""
+        return (self._raw(n) >> np.uint64(11)) * _FLOAT_SCALE
+
+    def jitter_array(self, n: int, pct: float, base: float = 1.0) -> np.ndarray:
+        """Return n values of base ± pct% from the bulk stream (see jitter).
+
+        The default base of 1.0 gives multiplicative factors, e.g.
+        jitter_array(n, 0.1) returns values in 0.9-1.1.
+        """
+        offset = base * pct
+        return base + (-offset + 2.0 * offset * self.random_array(n))
+
+    def integers(self, n: int, lo: int, hi: int) -> np.ndarray:
+        """Return n integers in [lo, hi] inclusive from the bulk stream, without bias.
+
+        The lowest 2**64 mod (hi - lo + 1) raw draws are rejected and redrawn,
+        leaving a whole number of copies of the range, so every value is
+        equally likely.
+
+        Raises:
+            ValueError: If lo > hi, or the bounds or range size exceed int64
+        """
+        span = hi - lo + 1
+        if span < 1 or span > 1 << 63 or lo < -(1 << 63) or hi >= 1 << 63:
+            raise ValueError(f"Invalid integer range [{lo}, {hi}]")
+        threshold = np.uint64((1 << 64) % span)
+        raw = self._raw(n)
+        rejected = np.flatnonzero(raw < threshold)
+        while len(rejected):
+            redraw = self._raw(len(rejected))
+            raw[rejected] = redraw
+            rejected = rejected[redraw < threshold]
+        return (raw % np.uint64(span)).astype(np.int64) + np.int64(lo)
+
+
+def stream_seed(*key: str | int) -> int:
+    """64-bit seed for the substream identified by key.
+
+    The key is hashed with BLAKE2b over its JSON encoding, so any change to
+    any part (including its position) gives an unrelated seed, and equal
+    keys give the same seed on every machine and Python version.
+
+    Args:
+        key: Strings and integers naming the substream, e.g.
+            (template, material, quality, seed, stage)
+
+    Returns:
+        Non-negative integer below 2**64
+    """
+    for part in key:
+        if not isinstance(part, (str, int)) or isinstance(part, bool):
+            raise ValueError(f"Stream key parts must be str or int, got {part!r}")
+    payload = json.dumps(list(key), separators=(",", ":"))
+    return int.from_bytes(hashlib.blake2b(payload.encode(), digest_size=8).digest(), "little")
+
+
+def stream_rng(*key: str | int) -> SeededRNG:
+    """Fresh SeededRNG for the substream identified by key (see stream_seed)."""
+    return SeededRNG(stream_seed(*key))
@@ -0,0 +1,148 @@
+"""Filled shape masks: ellipses, circles, rounded rectangles and polygons.
+
+Masks are boolean arrays built from coordinate grids, testing each pixel
+center against the exact shape. They are cached by shape parameters and
+returned read-only, so repeated shadows, glows and buttons cost one lookup.
+paint_mask writes a mask onto a canvas in a single clipped assignment or
+composite.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from src.core.compositor import composite_into
+from src.core.lru import ByteLRU
+
+Color = tuple[int, int, int, int]  # RGBA
+
+# Masks can be canvas-sized (polygons, rounded rects), so the cache is capped by bytes
+_MASKS = ByteLRU(32 * 1024 * 1024)
+
+
+def _cached(key: tuple, build) -> np.ndarray:
+    """Cached read-only mask, built on a miss."""
+
+    def build_read_only() -> np.ndarray:
+        mask = build()
+        mask.setflags(write=False)
+        return mask
+
+    return _MASKS.get_or_create(key, build_read_only)
+
+
+def ellipse_mask(rx: float, ry: float) -> np.ndarray:
+    """Filled axis-aligned ellipse centered on the middle pixel.
+
+    Pixel offsets (x, y) are inside when (x / rx)^2 + (y / ry)^2 <= 1.
+    Pixel-art ellipses that span 2r + 1 pixels with round ends use radii
+    r + 0.5.
+
+    Args:
+        rx, ry: Radii in pixels, non-negative
+
+    Returns:
+        (2 * floor(ry) + 1, 2 * floor(rx) + 1) read-only boolean mask
+    """
+    if rx < 0 or ry < 0:
+        raise ValueError(f"Radii must be non-negative, got {rx}, {ry}")
+
+    def build() -> np.ndarray:
+        hx, hy = math.floor(rx), math.floor(ry)
+        y, x = np.ogrid[-hy:hy + 1, -hx:hx + 1]
+        # Degenerate radii collapse to the center row or column
+        nx = (x / rx) ** 2 if rx > 0 else np.where(x == 0, 0.0, np.inf)
+        ny = (y / ry) ** 2 if ry > 0 else np.where(y == 0, 0.0, np.inf)
+        return nx + ny <= 1.0
+
+    return _cached(("ellipse", float(rx), float(ry)), build)
+
+
+def circle_mask(radius: float) -> np.ndarray:
+    """Filled circle: pixel offsets within radius of the center pixel."""
+    return ellipse_mask(radius, radius)
+
+
+def rounded_rect_mask(width: int, height: int, radius: float) -> np.ndarray:
+    """Filled rectangle whose corners are rounded with the given radius.
+
+    Args:
+        width, height: Size in pixels
+        radius: Corner radius, limited to half the shorter side; 0 gives a
+            plain rectangle
+
+    Returns:
+        (height, width) read-only boolean mask
+    """
+    if width < 0 or height < 0:
+        raise ValueError(f"Size must be non-negative, got {width}x{height}")
+    radius = max(0.0, min(float(radius), width / 2, height / 2))
+
+    def build() -> np.ndarray:
+        # Distance of each pixel center outside the rectangle inset by radius
+        y, x = np.ogrid[0:height, 0:width]
+        dx = np.maximum(np.abs(x + 0.5 - width / 2) - (width / 2 - radius), 0.0)
+        dy = np.maximum(np.abs(y + 0.5 - height / 2) - (height / 2 - radius), 0.0)
+        return dx * dx + dy * dy <= radius * radius
+
+    return _cached(("rounded_rect", width, height, radius), build)
+
+
+def polygon_mask(points: list[tuple[float, float]], width: int, height: int) -> np.ndarray:
+    """Filled polygon under the even-odd rule, sampled at pixel centers.
+
+    Args:
+        points: Vertices (x, y) in pixel coordinates, pixel (i, j) having its
+            center at (i + 0.5, j + 0.5); the polygon is closed implicitly
+        width, height: Size of the mask
+
+    Returns:
+        (height, width) read-only boolean mask
+    """
+    vertices = tuple((float(px), float(py)) for px, py in points)
+    if len(vertices) < 3:
+        raise ValueError(f"A polygon needs at least 3 points, got {len(vertices)}")
+
+    def build() -> np.ndarray:
+        cy = np.arange(height, dtype=np.float64)[:, np.newaxis] + 0.5
+        cx = np.arange(width, dtype=np.float64)[np.newaxis, :] + 0.5
+        inside = np.zeros((height, width), dtype=bool)
+        for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1]):
+            if y0 == y1:
+                continue
+            # Rows whose center line crosses this edge (half-open in y)
+            spans = (cy >= min(y0, y1)) & (cy < max(y0, y1))
+            x_cross = x0 + (cy - y0) * (x1 - x0) / (y1 - y0)
+            inside ^= spans & (cx < x_cross)
+        return inside
+
+    return _cached(("polygon", vertices, width, height), build)
+
+
+def paint_mask(
+    canvas: np.ndarray,
+    mask: np.ndarray,
+    x: int,
+    y: int,
+    color: Color,
+    blend: bool = False,
+) -> None:
+    """Paint a mask's True pixels onto canvas with its top-left at (x, y).
+
+    The mask is clipped to the canvas. By default covered pixels are set to
+    color; with blend, color is composited over them in one call instead.
+    """
+    h, w = canvas.shape[:2]
+    mh, mw = mask.shape
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(w, x + mw), min(h, y + mh)
+    if x0 >= x1 or y0 >= y1:
+        return
+    window = mask[y0 - y:y1 - y, x0 - x:x1 - x]
+    if blend:
+        fg = np.zeros((*window.shape, 4), dtype=np.uint8)
+        fg[window] = color
+        composite_into(canvas, fg, x0, y0)
+    else:
+        canvas[y0:y1, x0:x1][window] = color
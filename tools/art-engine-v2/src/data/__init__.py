@@ -1 +1,13 @@
 """Data package — manifests and configuration files."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent
+MATERIALS_PATH = DATA_DIR / "materials.json"
+
+
+def load_materials(path: Path = MATERIALS_PATH) -> list[dict]:
+    """Load material definitions: id, name, base hex color, tier and game item ids."""
+    return json.loads(Path(path).read_text())["materials"]
@@ -1,10 +1,31 @@
 """Zone-themed atmospheric backgrounds using layered noise."""
 from __future__ import annotations
 
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
 import numpy as np
+from PIL import Image, ImageOps
 from src.core.palette import hex_to_rgb, ZONE_PALETTES
-from src.core.noise import generate_noise
+from src.core.noise import fbm_noise, fbm_noise_bounds, generate_noise, normalize_noise
 from src.core.dither import apply_ordered_dither
+from src.core.export import PngStreamWriter
+from src.core.lru import ByteLRU
+
+if TYPE_CHECKING:
+    from src.core.noise_cache import NoiseCache
+
+# Noise layers: large-scale color blend and small-scale accent detail
+_LARGE_SCALE = 0.02
+_LARGE_OCTAVES = 2
+_DETAIL_SCALE = 0.08
+_DETAIL_OCTAVES = 1
+_DETAIL_SEED_OFFSET = 1000
+
+_DITHER_MATRIX = 8
+_DITHER_SPREAD = 12
+
+DEFAULT_TILE_SIZE = 256
 
 
 def generate_background(
@@ -12,6 +33,7 @@ def generate_background(
     width: int,
     height: int,
     seed: int = 42,
+    noise_cache: NoiseCache | None = None,
 ) -> np.ndarray:
     """Generate a zone-themed atmospheric background.
 
@@ -26,54 +48,307 @@ def generate_background(
         zone: Zone name key from ZONE_PALETTES
         width, height: Output dimensions
         seed: RNG seed
+        noise_cache: Optional on-disk cache for the noise layers
 
     Returns:
         RGBA uint8 array
     """
-    palette = ZONE_PALETTES.get(zone, ZONE_PALETTES["starting_regions"])
-    primary = hex_to_rgb(palette["primary"])
-    secondary = hex_to_rgb(palette["secondary"])
-    accent = hex_to_rgb(palette["accent"])
-
-    # Generate noise layers
-    noise_large = generate_noise(width, height, scale=0.02, seed=seed, octaves=2)
-    noise_detail = generate_noise(width, height, scale=0.08, seed=seed + 1000, octaves=1)
-
-    # Build RGBA image
-    result = np.zeros((height, width, 4), dtype=np.uint8)
-
-    for y in range(height):
-        for x in range(width):
-            # Blend primary and secondary by large noise
-            t_large = noise_large[y, x]
-            # Blend primary/secondary
-            r = int(primary[0] * (1 - t_large) + secondary[0] * t_large)
-            g = int(primary[1] * (1 - t_large) + secondary[1] * t_large)
-            b = int(primary[2] * (1 - t_large) + secondary[2] * t_large)
-
-            # Add accent highlights from detail noise
-            t_detail = noise_detail[y, x]
-            if t_detail > 0.7:
-                accent_strength = (t_detail - 0.7) / 0.3  # 0 to 1
-                accent_strength *= 0.3  # Max 30% accent blend
-                r = int(r * (1 - accent_strength) + accent[0] * accent_strength)
-                g = int(g * (1 - accent_strength) + accent[1] * accent_strength)
-                b = int(b * (1 - accent_strength) + accent[2] * accent_strength)
-
-            # Optional vignette
-            cx, cy = width / 2, height / 2
-            dist = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
-            max_dist = (cx ** 2 + cy ** 2) ** 0.5
-            vignette = max(0.0, 1.0 - (dist / max_dist) * 0.4)
-
-            result[y, x] = [
-                max(0, min(255, int(r * vignette))),
-                max(0, min(255, int(g * vignette))),
-                max(0, min(255, int(b * vignette))),
-                255,
-            ]
+    result = _synthesize(zone, width, height, seed, noise_cache)
 
     # Apply dithering
-    result = apply_ordered_dither(result, matrix_size=8, spread=12)
+    result = apply_ordered_dither(result, matrix_size=_DITHER_MATRIX, spread=_DITHER_SPREAD)
+
+    return result
+
+
+def generate_background_pyramid(
+    zone: str,
+    sizes: list[tuple[int, int]],
+    seed: int = 42,
+    noise_cache: NoiseCache | None = None,
+) -> list[np.ndarray]:
+    """Generate one zone background at several sizes from a single synthesis.
+
+    The undithered background is synthesized once, at the largest requested
+    size, so that level equals generate_background() for its size. Every
+    other level is a Lanczos downsample of it, center-cropped to the level's
+    aspect ratio first where the two differ. Each level is dithered after
+    resampling, so the Bayer pattern stays one pixel crisp at every size.
+
+    Levels are never upscaled, so every size must fit within the largest in
+    both dimensions. Mixed orientations (e.g. 1920x1080 and 1080x1920) need
+    one pyramid each.
+
+    Args:
+        zone: Zone name key from ZONE_PALETTES
+        sizes: (width, height) of each level
+        seed: RNG seed
+        noise_cache: Optional on-disk cache for the noise layers
+
+    Returns:
+        RGBA uint8 arrays, one per entry of sizes, in the same order
+
+    Raises:
+        ValueError: If sizes is empty, contains a non-positive dimension, or
+            contains a size that does not fit within the largest one
+    """
+    if not sizes:
+        raise ValueError("At least one background size is required")
+    for width, height in sizes:
+        if width < 1 or height < 1:
+            raise ValueError(f"Invalid background size {width}x{height}")
+
+    width, height = max(sizes, key=lambda size: size[0] * size[1])
+    for level_w, level_h in sizes:
+        if level_w > width or level_h > height:
+            raise ValueError(
+                f"Background size {level_w}x{level_h} does not fit within the largest "
+                f"size {width}x{height}; render different orientations separately"
+            )
+    base = _synthesize(zone, width, height, seed, noise_cache)
+    # Alpha is uniformly opaque, so only color is resampled
+    base_image = Image.fromarray(base[:, :, :3])
+
+    levels = []
+    for level_w, level_h in sizes:
+        if (level_w, level_h) == (width, height):
+            level = base
+        else:
+            resized = ImageOps.fit(base_image, (level_w, level_h), method=Image.Resampling.LANCZOS)
+            level = np.empty((level_h, level_w, 4), dtype=np.uint8)
+            level[:, :, :3] = np.asarray(resized)
+            level[:, :, 3] = 255
+        levels.append(apply_ordered_dither(level, matrix_size=_DITHER_MATRIX, spread=_DITHER_SPREAD))
+    return levels
+
+
+def _synthesize(
+    zone: str,
+    width: int,
+    height: int,
+    seed: int,
+    noise_cache: NoiseCache | None,
+) -> np.ndarray:
+    """Undithered RGBA background: noise layers, color blend and vignette."""
+    primary, secondary, accent = _zone_colors(zone)
+
+    noise_large = generate_noise(
+        width, height, scale=_LARGE_SCALE, seed=seed, octaves=_LARGE_OCTAVES, cache=noise_cache
+    )
+    noise_detail = generate_noise(
+        width, height, scale=_DETAIL_SCALE, seed=seed + _DETAIL_SEED_OFFSET,
+        octaves=_DETAIL_OCTAVES, cache=noise_cache,
+    )
+
+    return _shade(noise_large, noise_detail, primary, secondary, accent, width, height)
+
+
+def _zone_colors(zone: str) -> tuple[tuple[int, int, int], ...]:
+    """Primary, secondary and accent RGB for a zone (unknown zones use starting_regions)."""
+    palette = ZONE_PALETTES.get(zone, ZONE_PALETTES["starting_regions"])
+    return (
+        hex_to_rgb(palette["primary"]),
+        hex_to_rgb(palette["secondary"]),
+        hex_to_rgb(palette["accent"]),
+    )
+
+
+def _vignette_window(width: int, height: int, x0: int, y0: int, tile_w: int, tile_h: int) -> np.ndarray:
+    """Vignette factors for a window of a width x height canvas.
+
+    Darkens linearly with distance from the canvas center, to 60% in the
+    corners.
+    """
+    cx, cy = width / 2, height / 2
+    dx = np.arange(x0, x0 + tile_w) - cx
+    dy = np.arange(y0, y0 + tile_h) - cy
+    # float_power goes through the C library pow(), like the scalar ** 0.5
+    # this replaces; np.sqrt differs from it in the last bit for a few
+    # distances, which can flip the truncated channel values
+    dist = np.float_power(dx[np.newaxis, :] ** 2 + dy[:, np.newaxis] ** 2, 0.5)
+    max_dist = (cx ** 2 + cy ** 2) ** 0.5
+    return np.maximum(0.0, 1.0 - (dist / max_dist) * 0.4)
+
+
+# Whole-canvas vignettes by (width, height), capped by total size. The factor
+# is not separable per axis, and float32 would change truncated channels, so
+# entries are full float64 canvases; larger canvases are computed per call
+_VIGNETTES = ByteLRU(64 * 1024 * 1024)
+
+
+def _vignette(width: int, height: int) -> np.ndarray:
+    """Cached read-only vignette of a whole width x height canvas."""
+
+    def build() -> np.ndarray:
+        vignette = _vignette_window(width, height, 0, 0, width, height)
+        vignette.setflags(write=False)
+        return vignette
+
+    return _VIGNETTES.get_or_create((width, height), build)
+
+
+def _shade(
+    noise_large: np.ndarray,
+    noise_detail: np.ndarray,
+    primary: tuple[int, int, int],
+    secondary: tuple[int, int, int],
+    accent: tuple[int, int, int],
+    width: int,
+    height: int,
+    x0: int = 0,
+    y0: int = 0,
+) -> np.ndarray:
+    """Shade a window of the background from its normalized noise layers.
+
+    The window's top-left pixel sits at (x0, y0) of a width x height canvas;
+    the vignette is computed in canvas coordinates. Channels are truncated
+    to integers after each blend step, as in the original per-pixel shader.
+
+    Returns:
+        RGBA uint8 array shaped like the noise window
+    """
+    tile_h, tile_w = noise_large.shape
+    if (x0, y0, tile_w, tile_h) == (0, 0, width, height):
+        vignette = _vignette(width, height)
+    else:
+        # Tiles of a large canvas compute their window rather than caching it
+        vignette = _vignette_window(width, height, x0, y0, tile_w, tile_h)
+
+    # Accent highlights where detail noise exceeds 0.7, blending up to 30%
+    t_large = np.asarray(noise_large)
+    t_detail = np.asarray(noise_detail)
+    highlight = t_detail > 0.7
+    accent_strength = (t_detail - 0.7) / 0.3
+    accent_strength *= 0.3
+
+    result = np.empty((tile_h, tile_w, 4), dtype=np.uint8)
+    for c in range(3):
+        # Blend primary and secondary by large noise
+        channel = (primary[c] * (1 - t_large) + secondary[c] * t_large).astype(np.int64)
+        accented = (channel * (1 - accent_strength) + accent[c] * accent_strength).astype(np.int64)
+        channel = np.where(highlight, accented, channel)
+        result[:, :, c] = np.clip((channel * vignette).astype(np.int64), 0, 255)
+    result[:, :, 3] = 255
 
     return result
+
+
+def iter_background_tiles(
+    zone: str,
+    width: int,
+    height: int,
+    seed: int = 42,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> Iterator[tuple[int, int, np.ndarray]]:
+    """Generate a background tile by tile, in row-major order.
+
+    A first pass finds the global noise range so every tile is normalized
+    exactly as the single-shot render; dither phase and vignette use canvas
+    coordinates. Assembled tiles equal generate_background() bit for bit,
+    while peak memory is a few tile_size x tile_size buffers.
+
+    Yields:
+        (x0, y0, tile) with tile an RGBA uint8 array for that window
+    """
+    primary, secondary, accent = _zone_colors(zone)
+    large_bounds = fbm_noise_bounds(width, height, _LARGE_SCALE, seed, _LARGE_OCTAVES, tile_size)
+    detail_seed = seed + _DETAIL_SEED_OFFSET
+    detail_bounds = fbm_noise_bounds(
+        width, height, _DETAIL_SCALE, detail_seed, _DETAIL_OCTAVES, tile_size
+    )
+
+    for y0 in range(0, height, tile_size):
+        tile_h = min(tile_size, height - y0)
+        for x0 in range(0, width, tile_size):
+            tile_w = min(tile_size, width - x0)
+            noise_large = normalize_noise(
+                fbm_noise(tile_w, tile_h, _LARGE_SCALE, seed, _LARGE_OCTAVES, x0, y0),
+                large_bounds,
+            )
+            noise_detail = normalize_noise(
+                fbm_noise(tile_w, tile_h, _DETAIL_SCALE, detail_seed, _DETAIL_OCTAVES, x0, y0),
+                detail_bounds,
+            )
+            tile = _shade(
+                noise_large, noise_detail, primary, secondary, accent, width, height, x0, y0
+            )
+            yield x0, y0, apply_ordered_dither(
+                tile, matrix_size=_DITHER_MATRIX, spread=_DITHER_SPREAD, origin=(x0, y0)
+            )
+
+
+def render_background_tiled(
+    zone: str,
+    width: int,
+    height: int,
+    out: np.ndarray,
+    seed: int = 42,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> None:
+    """Render a background tile by tile into a preallocated (H, W, 4) array or memmap."""
+    for x0, y0, tile in iter_background_tiles(zone, width, height, seed, tile_size):
+        out[y0:y0 + tile.shape[0], x0:x0 + tile.shape[1]] = tile
+
+
+def save_background_npy(
+    path: Path,
+    zone: str,
+    width: int,
+    height: int,
+    seed: int = 42,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> np.memmap:
+    """Render a background straight into a memory-mapped .npy file.
+
+    Returns:
+        The (height, width, 4) uint8 memmap backing the file
+    """
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(height, width, 4))
+    render_background_tiled(zone, width, height, out, seed, tile_size)
+    out.flush()
+    return out
+
+
+def save_background_png(
+    path: Path,
+    zone: str,
+    width: int,
+    height: int,
+    seed: int = 42,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> None:
+    """Render a background and stream it to a PNG one band of tiles at a time.
+
+    PNG rows span the full width, so besides the per-tile buffers one
+    tile_size x width uint8 band is held while its row of tiles completes.
+    """
+    band = np.empty((min(tile_size, height), width, 4), dtype=np.uint8)
+    with PngStreamWriter(path, width, height) as writer:
+        for x0, y0, tile in iter_background_tiles(zone, width, height, seed, tile_size):
+            tile_h, tile_w = tile.shape[:2]
+            band[:tile_h, x0:x0 + tile_w] = tile
+            if x0 + tile_w == width:
+                writer.write_rows(band[:tile_h])
+
+
+def save_background_pyramid(
+    output_dir: Path,
+    zone: str,
+    sizes: list[tuple[int, int]],
+    seed: int = 42,
+    noise_cache: NoiseCache | None = None,
+) -> list[Path]:
+    """Render a background pyramid and write each level as <zone>-<width>x<height>.png.
+
+    Returns:
+        Paths of the written PNGs, in the order of sizes
+    """
+    output_dir = Path(output_dir)
+    levels = generate_background_pyramid(zone, sizes, seed, noise_cache)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for (width, height), level in zip(sizes, levels):
+        path = output_dir / f"{zone}-{width}x{height}.png"
+        Image.fromarray(level).save(path)
+        paths.append(path)
+    return paths
@@ -2,48 +2,59 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 from PIL import Image
 
-from src.core.palette import MATERIAL_RAMPS, nearest_color, hex_to_rgb
-from src.core.seed import SeededRNG
+from src.core.materials import default_registry
+from src.core.palette import nearest_color_batch, hex_to_rgb
+from src.core.ramp_map import load_ramp_map, source_ramps, swap_with_ramp_map
+from src.core.seed import stream_rng
+from src.core.shapes import circle_mask
 from src.core.dither import apply_ordered_dither
+from src.core.layer import Layer
 from src.palettes.game_palettes import QUALITY_GLOW_PARAMS
 
 
 def _swap_material(
-    img: np.ndarray,
+    layer: Layer,
     region_pixels: list[list[int]],
     source_ramp: list[tuple[int, int, int]],
     target_ramp: list[tuple[int, int, int]],
-    rng: SeededRNG,
-) -> np.ndarray:
-    """Swap material colors in a region from source to target ramp."""
+) -> Layer:
+    """Swap material colors in a region from source to target ramp.
+
+    Alpha is untouched, so the result keeps the input's bounding box.
+    """
+    img = layer.pixels
     result = img.copy()
-    for coord in region_pixels:
-        x, y = coord[0], coord[1]
-        if y >= img.shape[0] or x >= img.shape[1]:
-            continue
-        if img[y, x, 3] == 0:
-            continue
-        pixel_rgb = tuple(img[y, x, :3])
-        src_idx = nearest_color(pixel_rgb, source_ramp)
-        # Add seed-based jitter: ±0.5 index shift
-        jitter = rng.jitter(0.0, 1.0)  # -1.0 to +1.0
-        target_idx = max(0, min(len(target_ramp) - 1, int(src_idx + jitter * 0.5)))
-        result[y, x, :3] = target_ramp[target_idx]
-    return result
-
-
-def _add_outline(img: np.ndarray, color: tuple[int, int, int, int] = (20, 20, 25, 255), width: int = 2) -> np.ndarray:
+    coords = np.asarray(region_pixels, dtype=np.intp).reshape(-1, 2)
+    xs, ys = coords[:, 0], coords[:, 1]
+    inside = (ys < img.shape[0]) & (xs < img.shape[1])
+    xs, ys = xs[inside], ys[inside]
+    solid = img[ys, xs, 3] != 0
+    xs, ys = xs[solid], ys[solid]
+
+    src_idx = nearest_color_batch(img[ys, xs, :3], source_ramp)
+    # Ramp positions carry straight across to the target ramp
+    target_idx = np.clip(src_idx, 0, len(target_ramp) - 1)
+    result[ys, xs, :3] = np.asarray(target_ramp, dtype=np.uint8)[target_idx]
+    return Layer(result, layer.bbox)
+
+
+def _add_outline(layer: Layer, color: tuple[int, int, int, int] = (20, 20, 25, 255), width: int = 2) -> Layer:
     """Add dark outline around solid pixels."""
+    if layer.bbox is None:
+        return layer
+    img = layer.pixels
     result = img.copy()
     h, w = img.shape[:2]
+    x0, y0, x1, y1 = layer.bbox
     # Find edge pixels: solid pixels adjacent to transparent
     outline_pixels = set()
-    for y in range(h):
-        for x in range(w):
+    for y in range(y0, y1):
+        for x in range(x0, x1):
             if img[y, x, 3] > 0:
                 for dy in range(-width, width + 1):
                     for dx in range(-width, width + 1):
@@ -52,54 +63,61 @@ def _add_outline(img: np.ndarray, color: tuple[int, int, int, int] = (20, 20, 25
                             outline_pixels.add((nx, ny))
     for x, y in outline_pixels:
         result[y, x] = color
-    return result
+    return Layer.from_array(result)
 
 
-def _apply_quality_glow(img: np.ndarray, quality: str) -> np.ndarray:
-    """Apply quality-tier glow around the icon edges."""
+def _glow_kernel(radius: int, intensity: float) -> np.ndarray:
+    """Glow alpha by offset from an edge pixel: a disc fading out linearly with distance."""
+    reach = radius + 1
+    disc = circle_mask(reach)
+    kernel = np.zeros(disc.shape, dtype=np.uint8)
+    for dy, dx in np.argwhere(disc) - reach:
+        dist = float(dx * dx + dy * dy) ** 0.5
+        alpha = max(0.0, min(1.0, intensity * (1.0 - dist / reach)))
+        kernel[dy + reach, dx + reach] = int(alpha * 255)
+    return kernel
+
+
+def _apply_quality_glow(layer: Layer, quality: str) -> Layer:
+    """Apply quality-tier glow around the icon edges.
+
+    Every edge pixel (solid, with a transparent 4-neighbour) radiates the
+    glow kernel; each transparent pixel takes the strongest glow reaching it.
+    """
     params = QUALITY_GLOW_PARAMS.get(quality, QUALITY_GLOW_PARAMS["common"])
     radius = params["radius"]
     intensity = params["intensity"]
     glow_color_hex = params["color"]
 
-    if radius == 0 or intensity == 0 or glow_color_hex is None:
-        return img
+    if radius == 0 or intensity == 0 or glow_color_hex is None or layer.bbox is None:
+        return layer
 
     glow_rgb = hex_to_rgb(glow_color_hex)
+    img = layer.pixels
     result = img.copy()
     h, w = img.shape[:2]
 
-    # Find edge pixels (solid pixels adjacent to transparent)
-    edges = set()
-    for y in range(h):
-        for x in range(w):
-            if img[y, x, 3] > 0:
-                for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < h and 0 <= nx < w and img[ny, nx, 3] == 0:
-                        edges.add((x, y))
-                        break
-
-    # Radiate glow outward from edges
-    for ex, ey in edges:
-        for dy in range(-radius - 1, radius + 2):
-            for dx in range(-radius - 1, radius + 2):
-                ny, nx = ey + dy, ex + dx
-                if not (0 <= ny < h and 0 <= nx < w):
-                    continue
-                if result[ny, nx, 3] > 0:
-                    continue  # Don't glow over solid pixels
-                dist = (dx * dx + dy * dy) ** 0.5
-                if dist > radius + 1:
-                    continue
-                alpha = intensity * (1.0 - dist / (radius + 1))
-                alpha = max(0.0, min(1.0, alpha))
-                glow_alpha = int(alpha * 255)
-                # Blend with existing pixel (take max alpha for overlapping glows)
-                if glow_alpha > result[ny, nx, 3]:
-                    result[ny, nx] = [glow_rgb[0], glow_rgb[1], glow_rgb[2], glow_alpha]
-
-    return result
+    # Edge pixels; neighbours off the canvas do not count as transparent
+    solid = np.pad(img[:, :, 3] > 0, 1, constant_values=True)
+    inner = solid[1:-1, 1:-1]
+    edges = inner & ~(solid[:-2, 1:-1] & solid[2:, 1:-1] & solid[1:-1, :-2] & solid[1:-1, 2:])
+
+    # Grey dilation of the edges by the kernel, one shifted max per offset
+    kernel = _glow_kernel(radius, intensity)
+    reach = radius + 1
+    glow = np.zeros((h, w), dtype=np.uint8)
+    for ky, kx in np.argwhere(kernel):
+        dy, dx = ky - reach, kx - reach
+        src = edges[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)]
+        dst = glow[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+        np.maximum(dst, np.where(src, kernel[ky, kx], 0).astype(np.uint8), out=dst)
+
+    # Don't glow over solid pixels
+    glowing = ~inner & (glow > 0)
+    result[glowing, :3] = glow_rgb
+    result[glowing, 3] = glow[glowing]
+
+    return Layer.from_array(result)
 
 
 def generate_icon(
@@ -115,58 +133,61 @@ def generate_icon(
     Args:
         template_dir: Directory containing template PNGs and JSON metadata
         template_name: Name of the template (without extension)
-        material: Material name (iron, gold, leather, etc.)
+        material: Material id from the material registry (iron, steel, gold, ...)
         quality: Quality tier (common, uncommon, rare, epic, legendary)
         seed: RNG seed for deterministic variation
         output_dir: Where to save the output PNG
 
     Returns:
         Path to the generated PNG file
+
+    Raises:
+        ValueError: If the material is not in the registry
     """
     template_dir = Path(template_dir)
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Load template
-    img = np.array(Image.open(template_dir / f"{template_name}.png").convert("RGBA"))
+    layer = Layer.load(template_dir / f"{template_name}.png")
     meta_path = template_dir / f"{template_name}.json"
     meta = json.loads(meta_path.read_text())
 
-    rng = SeededRNG(seed)
+    # Each stage draws from its own substream of this variant's key, so no
+    # stage's randomness depends on what ran before it
+    key = (template_name, material, quality, seed)
 
     # Material swap for each region
-    target_ramp = MATERIAL_RAMPS.get(material, MATERIAL_RAMPS["iron"])
-    for region in meta.get("regions", []):
-        # Detect source ramp from region's dominant color
-        dom_color = tuple(region.get("dominant_color", [140, 140, 150])[:3])
-        # Find closest material ramp
-        best_material = "iron"
-        best_dist = float("inf")
-        for mat_name, ramp in MATERIAL_RAMPS.items():
-            mid_color = ramp[3]  # Middle of ramp
-            d = sum((a - b) ** 2 for a, b in zip(dom_color, mid_color))
-            if d < best_dist:
-                best_dist = d
-                best_material = mat_name
-        source_ramp = MATERIAL_RAMPS[best_material]
-        img = _swap_material(img, region["pixels"], source_ramp, target_ramp, rng)
+    target_ramp = default_registry().lut(material)
+    regions = meta.get("regions", [])
+    # Templates ingested with a ramp map already know each pixel's region and
+    # source ramp index, so all regions swap in one gather; otherwise detect
+    # each region's source ramp from its dominant color and search it per pixel
+    ramp_map = load_ramp_map(template_dir, template_name, meta, layer.pixels)
+    if ramp_map is not None:
+        layer = Layer(swap_with_ramp_map(layer.pixels, ramp_map, target_ramp), layer.bbox)
+    else:
+        dom_colors = [region.get("dominant_color", [140, 140, 150])[:3] for region in regions]
+        for region, source_ramp in zip(regions, source_ramps(dom_colors)):
+            layer = _swap_material(layer, region["pixels"], source_ramp, target_ramp)
 
     # Apply dithering with seed-based spread variation
-    spread = rng.randint(6, 12)
-    img = apply_ordered_dither(img, matrix_size=4, spread=spread)
+    spread = stream_rng(*key, "dither").randint(6, 12)
+    # Dithering leaves alpha untouched, so the bounding box carries over
+    layer = Layer(apply_ordered_dither(layer.pixels, matrix_size=4, spread=spread), layer.bbox)
 
     # Add outline
-    img = _add_outline(img)
+    layer = _add_outline(layer)
 
     # Apply quality glow
-    img = _apply_quality_glow(img, quality)
+    layer = _apply_quality_glow(layer, quality)
 
     # Save
     # Get type from metadata for naming
     asset_type = meta.get("type", "item")
     filename = f"{asset_type}-{template_name}-{material}-{quality}-{seed:03d}.png"
     output_path = output_dir / filename
-    Image.fromarray(img).save(output_path)
+    Image.fromarray(layer.pixels).save(output_path)
 
     return output_path
 
@@ -178,23 +199,44 @@ def generate_icon_batch(
     qualities: list[str],
     seeds: list[int],
     output_dir: Path,
+    workers: int = 1,
 ) -> list[Path]:
     """Generate a batch of icon variants (materials × qualities × seeds).
 
+    All materials are validated before anything is rendered. Every variant
+    seeds its own streams, so it renders identically whether the batch runs
+    serially, across worker processes, or split into several runs.
+
+    Args:
+        workers: Number of worker processes; 1 renders in this process
+
     Returns:
-        List of paths to generated PNG files
+        List of paths to generated PNG files, in materials × qualities ×
+        seeds order
+
+    Raises:
+        ValueError: If any material is not in the registry
     """
-    results = []
-    for material in materials:
-        for quality in qualities:
-            for seed in seeds:
-                path = generate_icon(
-                    template_dir=template_dir,
-                    template_name=template_name,
-                    material=material,
-                    quality=quality,
-                    seed=seed,
-                    output_dir=output_dir,
-                )
-                results.append(path)
-    return results
+    default_registry().validate(materials)
+    jobs = [
+        dict(
+            template_dir=template_dir,
+            template_name=template_name,
+            material=material,
+            quality=quality,
+            seed=seed,
+            output_dir=output_dir,
+        )
+        for material in materials
+        for quality in qualities
+        for seed in seeds
+    ]
+    if workers <= 1 or len(jobs) <= 1:
+        return [generate_icon(**job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_generate_icon_job, jobs))
+
+
+def _generate_icon_job(job: dict) -> Path:
+    """Worker-process entry point for one batch variant."""
+    return generate_icon(**job)
@@ -3,12 +3,14 @@ from __future__ import annotations
 
 from pathlib import Path
 import numpy as np
-from PIL import Image
 
-from src.core.compositor import alpha_composite, alpha_composite_at
-from src.core.palette import quantize_image, MATERIAL_RAMPS
+from src.core.compositor import flatten_layers
+from src.core.layer import Layer
+from src.core.dither import dither_to_indices
+from src.core.palette import indices_to_rgba, MATERIAL_RAMPS
+from src.core.palette_extract import extract_palette
 from src.core.seed import SeededRNG
-from src.core.primitives import draw_ellipse
+from src.core.shapes import ellipse_mask, paint_mask
 
 # Equipment layer order from art-style-guide.md section 2.2
 LAYER_ORDER: list[str] = [
@@ -49,9 +51,9 @@ def compose_sprite(
         RGBA uint8 array (512, 256, 4) — the composited sprite
     """
     layer_dir = Path(layer_dir)
-    canvas = np.zeros((SPRITE_HEIGHT, SPRITE_WIDTH, 4), dtype=np.uint8)
 
-    # Composite layers in order
+    # Load the equipment stack; missing files are skipped
+    stack: dict[str, Layer] = {}
     for layer_name in LAYER_ORDER:
         if layer_name not in layers:
             continue
@@ -62,65 +64,40 @@ def compose_sprite(
         if not layer_path.exists():
             continue
 
-        layer_img = np.array(Image.open(layer_path).convert("RGBA"))
-
-        # Resize if needed to match canvas
-        if layer_img.shape[:2] != (SPRITE_HEIGHT, SPRITE_WIDTH):
-            pil_img = Image.fromarray(layer_img).resize(
-                (SPRITE_WIDTH, SPRITE_HEIGHT), Image.Resampling.NEAREST
-            )
-            layer_img = np.array(pil_img)
-
-        canvas = alpha_composite(canvas, layer_img)
-
-    # Add floor shadow if requested
-    if add_shadow and np.any(canvas[:, :, 3] > 0):
-        shadow = np.zeros_like(canvas)
-        # Shadow ellipse at bottom center
-        cx = SPRITE_WIDTH // 2
-        cy = SPRITE_HEIGHT - 20
-        rx = 40
-        ry = 8
-        shadow_color = (0, 0, 0, 76)  # 30% opacity
-        draw_ellipse(shadow, cx, cy, rx, ry, shadow_color)
-        # Fill the shadow ellipse
-        _fill_ellipse(shadow, cx, cy, rx, ry, shadow_color)
-        # Shadow goes behind the character
-        canvas = alpha_composite(shadow, canvas)
+        stack[layer_name] = Layer.load(layer_path, size=(SPRITE_WIDTH, SPRITE_HEIGHT))
+
+    # Floor shadow goes behind the character, so it is the bottom of the stack
+    order = LAYER_ORDER
+    if add_shadow and any(not layer.is_empty for layer in stack.values()):
+        stack["shadow"] = _shadow_layer()
+        order = ["shadow", *LAYER_ORDER]
+
+    # Flatten all layers in one pass
+    canvas = flatten_layers(stack, order, size=(SPRITE_WIDTH, SPRITE_HEIGHT))
 
     # Final palette quantization
     if max_colors > 0:
         # Build palette from existing colors
         opaque = canvas[:, :, 3] > 0
         if np.any(opaque):
-            colors = canvas[opaque][:, :3]
-            unique = np.unique(colors.reshape(-1, 3), axis=0)
-            if len(unique) > max_colors:
-                step = max(1, len(unique) // max_colors)
-                palette = [tuple(c) for c in unique[::step][:max_colors]]
-            else:
-                palette = [tuple(c) for c in unique]
-            canvas = quantize_image(canvas, palette)
+            palette = extract_palette(canvas[opaque][:, :3], max_colors)
+            indices = dither_to_indices(canvas, palette, spread=0)
+            canvas = indices_to_rgba(indices, palette, canvas[:, :, 3])
 
     return canvas
 
 
-def _fill_ellipse(
-    canvas: np.ndarray, cx: int, cy: int, rx: int, ry: int, color: tuple[int, int, int, int]
-) -> None:
-    """Fill an ellipse (scan-line approach for shadow)."""
-    h, w = canvas.shape[:2]
-    for y in range(max(0, cy - ry), min(h, cy + ry + 1)):
-        dy = y - cy
-        if ry == 0:
-            continue
-        # x range from ellipse equation
-        x_span = rx * ((1 - (dy * dy) / (ry * ry)) ** 0.5) if abs(dy) <= ry else 0
-        x_start = max(0, int(cx - x_span))
-        x_end = min(w, int(cx + x_span) + 1)
-        for x in range(x_start, x_end):
-            if canvas[y, x, 3] == 0:  # Only fill transparent pixels
-                canvas[y, x] = color
+def _shadow_layer() -> Layer:
+    """Build the semi-transparent floor shadow ellipse at bottom center."""
+    shadow = np.zeros((SPRITE_HEIGHT, SPRITE_WIDTH, 4), dtype=np.uint8)
+    cx = SPRITE_WIDTH // 2
+    cy = SPRITE_HEIGHT - 20
+    rx = 40
+    ry = 8
+    shadow_color = (0, 0, 0, 76)  # 30% opacity
+    # Half-pixel radii give a 2r + 1 pixel span with rounded ends
+    paint_mask(shadow, ellipse_mask(rx + 0.5, ry + 0.5), cx - rx, cy - ry, shadow_color)
+    return Layer.from_array(shadow)
 
 
 def compose_sprite_with_materials(
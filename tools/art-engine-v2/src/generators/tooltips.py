@@ -7,7 +7,7 @@ from PIL import Image
 
 from src.core.palette import hex_to_rgb, UI_COLORS, QUALITY_COLORS
 from src.core.primitives import draw_filled_rect, draw_line
-from src.core.compositor import alpha_composite_at
+from src.core.compositor import composite_into
 from src.layout.text import TextRenderer
 from src.generators.ui_chrome import render_panel_frame
 
@@ -138,7 +138,7 @@ def render_tooltip(item: dict, width: int = TOOLTIP_WIDTH) -> np.ndarray:
         # Clip image width to content area
         iw = min(img.shape[1], content_width)
         clipped = img[:, :iw]
-        frame = alpha_composite_at(frame, clipped, x, y)
+        composite_into(frame, clipped, x, y)
         y += img.shape[0] + LINE_SPACING
 
     return frame
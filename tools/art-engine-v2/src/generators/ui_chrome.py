@@ -1,10 +1,13 @@
 """UI chrome components — 9-slice frames, panels, buttons, progress bars."""
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
+from src.core.display_list import DisplayList
 from src.core.palette import hex_to_rgb, UI_COLORS
-from src.core.primitives import draw_filled_rect, draw_line
-from src.core.compositor import alpha_composite_at
+from src.core.primitives import draw_rect
+from src.core.shapes import rounded_rect_mask
 from src.layout.text import TextRenderer
 from src.palettes.game_palettes import BAR_COLORS
 
@@ -93,58 +96,81 @@ def render_panel_frame(width: int, height: int) -> np.ndarray:
     - Innermost: 1px #5C4D2E (dark inner bevel)
     - Content: #1A1A1F (panel background)
     """
-    result = np.zeros((height, width, 4), dtype=np.uint8)
+    return _panel_frame_list(width, height).render()
+
+
+@lru_cache(maxsize=64)
+def _panel_frame_list(width: int, height: int) -> DisplayList:
+    """Compiled drawing commands of a panel frame, shared by every frame of this size."""
+    dl = DisplayList(width, height)
 
     # Fill content background
     bg = hex_to_rgb(UI_COLORS["panel_bg"])
-    draw_filled_rect(result, 0, 0, width - 1, height - 1, (*bg, 255))
+    dl.rect(0, 0, width - 1, height - 1, (*bg, 255))
 
     # Layer 1: Outermost shadow (1px)
     shadow = hex_to_rgb(UI_COLORS["frame_shadow"])
-    draw_rect_border(result, 0, 0, width - 1, height - 1, (*shadow, 255))
+    dl.rect_outline(0, 0, width - 1, height - 1, (*shadow, 255))
 
     # Layer 2: Gold metallic (2px)
     gold = hex_to_rgb(UI_COLORS["frame_outer"])
-    draw_rect_border(result, 1, 1, width - 2, height - 2, (*gold, 255))
-    draw_rect_border(result, 2, 2, width - 3, height - 3, (*gold, 255))
+    dl.rect_outline(1, 1, width - 2, height - 2, (*gold, 255))
+    dl.rect_outline(2, 2, width - 3, height - 3, (*gold, 255))
 
     # Layer 3: Highlight (1px, top-left edges only)
     highlight = hex_to_rgb(UI_COLORS["frame_highlight"])
-    draw_line(result, 3, 3, width - 4, 3, (*highlight, 255))  # Top
-    draw_line(result, 3, 3, 3, height - 4, (*highlight, 255))  # Left
+    dl.line(3, 3, width - 4, 3, (*highlight, 255))  # Top
+    dl.line(3, 3, 3, height - 4, (*highlight, 255))  # Left
 
     # Layer 4: Inner bevel (1px)
     inner = hex_to_rgb(UI_COLORS["frame_inner"])
-    draw_rect_border(result, 4, 4, width - 5, height - 5, (*inner, 255))
+    dl.rect_outline(4, 4, width - 5, height - 5, (*inner, 255))
 
-    return result
+    dl.compile()
+    return dl
 
 
 def draw_rect_border(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: tuple) -> None:
-    """Draw rectangle outline using lines."""
-    draw_line(canvas, x0, y0, x1, y0, color)  # Top
-    draw_line(canvas, x0, y1, x1, y1, color)  # Bottom
-    draw_line(canvas, x0, y0, x0, y1, color)  # Left
-    draw_line(canvas, x1, y0, x1, y1, color)  # Right
+    """Draw rectangle outline (four slice-filled edges)."""
+    draw_rect(canvas, x0, y0, x1, y1, color)
 
 
-def render_button(width: int, height: int, label: str = "") -> np.ndarray:
-    """Render a UI button with optional text label."""
+def render_button(width: int, height: int, label: str = "", radius: int = 0) -> np.ndarray:
+    """Render a UI button with optional text label.
+
+    Args:
+        radius: Corner radius; 0 keeps square corners
+    """
+    return _button_list(width, height, label, radius).render()
+
+
+@lru_cache(maxsize=64)
+def _button_list(width: int, height: int, label: str, radius: int) -> DisplayList:
+    """Compiled drawing commands of a button."""
     # Simple beveled button
-    result = np.zeros((height, width, 4), dtype=np.uint8)
+    dl = DisplayList(width, height)
 
     # Background
     bg = hex_to_rgb(UI_COLORS["frame_inner"])
-    draw_filled_rect(result, 0, 0, width - 1, height - 1, (*bg, 255))
+    dl.rect(0, 0, width - 1, height - 1, (*bg, 255))
 
     # Border
     border = hex_to_rgb(UI_COLORS["frame_outer"])
-    draw_rect_border(result, 0, 0, width - 1, height - 1, (*border, 255))
+    dl.rect_outline(0, 0, width - 1, height - 1, (*border, 255))
 
     # Highlight top-left
     hl = hex_to_rgb(UI_COLORS["frame_highlight"])
-    draw_line(result, 1, 1, width - 2, 1, (*hl, 255))
-    draw_line(result, 1, 1, 1, height - 2, (*hl, 255))
+    dl.line(1, 1, width - 2, 1, (*hl, 255))
+    dl.line(1, 1, 1, height - 2, (*hl, 255))
+
+    # Round the corners: clear outside the outer shape, border the ring
+    # between it and the shape inset by one pixel
+    if radius > 0:
+        outer = rounded_rect_mask(width, height, radius)
+        inner = np.zeros_like(outer)
+        inner[1:-1, 1:-1] = rounded_rect_mask(max(0, width - 2), max(0, height - 2), radius - 1)
+        dl.mask(~outer, 0, 0, (0, 0, 0, 0))
+        dl.mask(outer & ~inner, 0, 0, (*border, 255))
 
     # Add text label if provided
     if label:
@@ -153,9 +179,10 @@ def render_button(width: int, height: int, label: str = "") -> np.ndarray:
         th, tw = text_img.shape[:2]
         tx = (width - tw) // 2
         ty = (height - th) // 2
-        result = alpha_composite_at(result, text_img, tx, ty)
+        dl.blit(text_img, tx, ty)
 
-    return result
+    dl.compile()
+    return dl
 
 
 def render_progress_bar(
@@ -171,21 +198,28 @@ def render_progress_bar(
         progress: 0.0 to 1.0
         bar_type: One of health, mana, energy, rage, xp, reputation, profession, cast
     """
-    result = np.zeros((height, width, 4), dtype=np.uint8)
+    fill_width = max(0, int((width - 2) * max(0.0, min(1.0, progress))))
+    return _progress_bar_list(width, height, fill_width, bar_type).render()
+
+
+@lru_cache(maxsize=64)
+def _progress_bar_list(width: int, height: int, fill_width: int, bar_type: str) -> DisplayList:
+    """Compiled drawing commands of a progress bar filled fill_width pixels."""
+    dl = DisplayList(width, height)
     colors = BAR_COLORS.get(bar_type, BAR_COLORS["health"])
 
     # Background
     bg = hex_to_rgb(colors["bg"])
-    draw_filled_rect(result, 0, 0, width - 1, height - 1, (*bg, 255))
+    dl.rect(0, 0, width - 1, height - 1, (*bg, 255))
 
     # Fill
-    fill_width = max(0, int((width - 2) * max(0.0, min(1.0, progress))))
     if fill_width > 0:
         fill = hex_to_rgb(colors["fill"])
-        draw_filled_rect(result, 1, 1, fill_width, height - 2, (*fill, 255))
+        dl.rect(1, 1, fill_width, height - 2, (*fill, 255))
 
     # Border
     border = hex_to_rgb(colors["border"])
-    draw_rect_border(result, 0, 0, width - 1, height - 1, (*border, 255))
+    dl.rect_outline(0, 0, width - 1, height - 1, (*border, 255))
 
-    return result
+    dl.compile()
+    return dl
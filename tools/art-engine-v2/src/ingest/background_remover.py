@@ -3,11 +3,14 @@ from __future__ import annotations
 
 import numpy as np
 
+from src.core.primitives import connected_region
+
 
 def remove_background(
     img: np.ndarray,
     bg_color: tuple[int, int, int] = (0x1A, 0x1A, 0x1F),
     threshold: int = 30,
+    connected: bool = False,
 ) -> np.ndarray:
     """Set pixels matching bg_color (within threshold) to transparent.
 
@@ -15,16 +18,20 @@ def remove_background(
         img: RGBA uint8 array
         bg_color: Background color to remove (default: #1A1A1F panel bg)
         threshold: Euclidean distance threshold for matching
+        connected: Only remove matching pixels flood-connected to the image
+            border, keeping dark details enclosed by the subject
 
     Returns:
         RGBA array with matching pixels set to alpha=0
     """
     result = img.copy()
-    h, w = img.shape[:2]
-    for y in range(h):
-        for x in range(w):
-            r, g, b = int(img[y, x, 0]), int(img[y, x, 1]), int(img[y, x, 2])
-            dist = ((r - bg_color[0]) ** 2 + (g - bg_color[1]) ** 2 + (b - bg_color[2]) ** 2) ** 0.5
-            if dist <= threshold:
-                result[y, x, 3] = 0
+    diff = img[:, :, :3].astype(np.int32) - np.asarray(bg_color, dtype=np.int32)
+    matches = np.sqrt((diff * diff).sum(axis=2)) <= threshold
+    if connected:
+        h, w = matches.shape
+        # Seed from every border pixel
+        xs = np.concatenate([np.arange(w), np.arange(w), np.zeros(h, int), np.full(h, w - 1)])
+        ys = np.concatenate([np.zeros(w, int), np.full(w, h - 1), np.arange(h), np.arange(h)])
+        matches = connected_region(matches, xs, ys)
+    result[matches, 3] = 0
     return result
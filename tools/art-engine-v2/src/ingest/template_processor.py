@@ -7,8 +7,11 @@ from pathlib import Path
 import numpy as np
 from PIL import Image
 
-from src.core.dither import apply_ordered_dither
-from src.core.palette import quantize_image
+from src.core.dither import dither_to_indices
+from src.core.export import save_indexed_png
+from src.core.palette import indices_to_rgba
+from src.core.palette_extract import extract_palette
+from src.core.ramp_map import build_ramp_map, pixels_digest, ramp_map_path
 from src.ingest.background_remover import remove_background
 from src.ingest.region_extractor import extract_regions
 
@@ -21,17 +24,18 @@ def process_template(
     num_regions: int = 1,
     max_colors: int = 128,
     bg_threshold: int = 30,
+    bg_connected: bool = False,
 ) -> dict:
     """Process an AI draft through the full ingest pipeline.
 
     Steps:
     1. Load PNG
-    2. Remove dark background
+    2. Remove dark background (optionally only where connected to the border)
     3. Build a game palette from the image's dominant colors
-    4. Apply ordered dithering
-    5. Quantize to palette
-    6. Extract material regions
-    7. Save cleaned PNG + metadata JSON
+    4. Apply ordered dithering and quantize to the palette (one fused pass)
+    5. Extract material regions
+    6. Map each region pixel to its position in the source material ramp
+    7. Save cleaned PNG (paletted when possible), ramp map + metadata JSON
 
     Returns:
         Metadata dict (also saved to JSON)
@@ -43,35 +47,32 @@ def process_template(
     img = np.array(Image.open(input_path).convert("RGBA"))
 
     # Remove background
-    img = remove_background(img, threshold=bg_threshold)
+    img = remove_background(img, threshold=bg_threshold, connected=bg_connected)
 
     # Build palette from opaque pixels
     opaque_mask = img[:, :, 3] > 0
     if np.any(opaque_mask):
-        opaque_pixels = img[opaque_mask][:, :3]
-        # Simple palette: pick unique-ish colors, limit to max_colors
-        # Use k-means-like reduction on colors
-        unique_colors = np.unique(opaque_pixels.reshape(-1, 3), axis=0)
-        if len(unique_colors) > max_colors:
-            # Subsample deterministically
-            step = len(unique_colors) // max_colors
-            palette = [tuple(c) for c in unique_colors[::step][:max_colors]]
-        else:
-            palette = [tuple(c) for c in unique_colors]
+        # Median cut over the opaque pixels' color histogram
+        palette = extract_palette(img[opaque_mask][:, :3], max_colors)
     else:
         palette = [(0, 0, 0)]
 
-    # Apply dithering
-    img = apply_ordered_dither(img, matrix_size=4, spread=8)
-
-    # Quantize
-    img = quantize_image(img, palette)
+    # Dither and quantize straight to palette indices
+    alpha = img[:, :, 3]
+    indices = dither_to_indices(img, palette, matrix_size=4, spread=8)
+    img = indices_to_rgba(indices, palette, alpha)
 
     # Extract regions
     regions = extract_regions(img, num_regions=num_regions)
 
-    # Save cleaned PNG
-    Image.fromarray(img).save(output_dir / f"{name}.png")
+    # Save cleaned PNG; the indexed form is exact when alpha is on/off only
+    if len(palette) < 256 and np.all((alpha == 0) | (alpha == 255)):
+        save_indexed_png(output_dir / f"{name}.png", indices, palette)
+    else:
+        Image.fromarray(img).save(output_dir / f"{name}.png")
+
+    # Precompute each pixel's source ramp index for material swaps
+    ramp_map = build_ramp_map(img, regions)
 
     # Build and save metadata
     metadata = {
@@ -90,6 +91,13 @@ def process_template(
         ],
     }
 
+    map_path = ramp_map_path(output_dir, name)
+    if ramp_map is not None:
+        np.save(map_path, ramp_map)
+        metadata["ramp_map_digest"] = pixels_digest(img)
+    else:
+        map_path.unlink(missing_ok=True)
+
     (output_dir / f"{name}.json").write_text(json.dumps(metadata, indent=2))
 
     return metadata
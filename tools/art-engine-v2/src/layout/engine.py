@@ -6,9 +6,8 @@ from pathlib import Path
 import numpy as np
 from PIL import Image
 
+from src.core.display_list import DisplayList
 from src.core.palette import hex_to_rgb
-from src.core.primitives import draw_filled_rect, draw_line
-from src.core.compositor import alpha_composite_at
 from src.layout.text import TextRenderer
 from src.generators.ui_chrome import render_panel_frame, render_progress_bar
 
@@ -38,24 +37,34 @@ class LayoutEngine:
         - progress_bar: {type, x, y, width, height, progress, bar_type}
         - separator: {type, x, y, width}
         """
+        return self.compile(layout).render()
+
+    def compile(self, layout: dict) -> DisplayList:
+        """Build the display list of a layout (see render for the format).
+
+        Text and widgets are rendered once while building; rendering the
+        returned list again only replays the compiled draws, so a layout shown
+        repeatedly can keep its list. Image files are read while building.
+        """
         w = layout["width"]
         h = layout["height"]
-        canvas = np.zeros((h, w, 4), dtype=np.uint8)
+        dl = DisplayList(w, h)
 
         # Background color
         bg = layout.get("background")
         if bg:
             rgb = hex_to_rgb(bg)
-            draw_filled_rect(canvas, 0, 0, w - 1, h - 1, (*rgb, 255))
+            dl.rect(0, 0, w - 1, h - 1, (*rgb, 255))
 
         # Render elements
         for elem in layout.get("elements", []):
-            self._render_element(canvas, elem, offset_x=0, offset_y=0)
+            self._render_element(dl, elem, offset_x=0, offset_y=0)
 
-        return canvas
+        dl.compile()
+        return dl
 
-    def _render_element(self, canvas: np.ndarray, elem: dict, offset_x: int, offset_y: int) -> None:
-        """Render a single element onto the canvas."""
+    def _render_element(self, dl: DisplayList, elem: dict, offset_x: int, offset_y: int) -> None:
+        """Record a single element's drawing commands."""
         etype = elem.get("type", "")
         x = elem.get("x", 0) + offset_x
         y = elem.get("y", 0) + offset_y
@@ -64,7 +73,7 @@ class LayoutEngine:
             w = elem.get("width", 10)
             h = elem.get("height", 10)
             color = hex_to_rgb(elem.get("color", "#FFFFFF"))
-            draw_filled_rect(canvas, x, y, x + w - 1, y + h - 1, (*color, 255))
+            dl.rect(x, y, x + w - 1, y + h - 1, (*color, 255))
 
         elif etype == "text":
             text = elem.get("text", "")
@@ -72,25 +81,22 @@ class LayoutEngine:
             size = elem.get("size", 14)
             color = elem.get("color", "#FFFFFF")
             text_img = self._text_renderer.render_text(text, font, size, color)
-            result = alpha_composite_at(canvas, text_img, x, y)
-            canvas[:] = result
+            dl.blit(text_img, x, y)
 
         elif etype == "image":
             path = elem.get("path", "")
             if path and Path(path).exists():
                 img = np.array(Image.open(path).convert("RGBA"))
-                result = alpha_composite_at(canvas, img, x, y)
-                canvas[:] = result
+                dl.blit(img, x, y)
 
         elif etype == "panel":
             w = elem.get("width", 100)
             h = elem.get("height", 100)
             frame = render_panel_frame(w, h)
-            result = alpha_composite_at(canvas, frame, x, y)
-            canvas[:] = result
+            dl.blit(frame, x, y)
             # Render child elements relative to panel position
             for child in elem.get("elements", []):
-                self._render_element(canvas, child, offset_x=x, offset_y=y)
+                self._render_element(dl, child, offset_x=x, offset_y=y)
 
         elif etype == "progress_bar":
             w = elem.get("width", 100)
@@ -98,13 +104,12 @@ class LayoutEngine:
             progress = elem.get("progress", 0.5)
             bar_type = elem.get("bar_type", "health")
             bar = render_progress_bar(w, h, progress, bar_type)
-            result = alpha_composite_at(canvas, bar, x, y)
-            canvas[:] = result
+            dl.blit(bar, x, y)
 
         elif etype == "separator":
             w = elem.get("width", 100)
             color = hex_to_rgb(elem.get("color", "#3D3529"))
-            draw_line(canvas, x, y, x + w - 1, y, (*color, 255))
+            dl.line(x, y, x + w - 1, y, (*color, 255))
 
     def render_from_file(self, layout_path: Path) -> np.ndarray:
         """Load layout from JSON file and render."""
@@ -1,5 +1,18 @@
 import numpy as np
-from src.generators.backgrounds import generate_background
+import pytest
+from PIL import Image
+from src.generators.backgrounds import (
+    _shade,
+    _vignette,
+    _vignette_window,
+    generate_background,
+    generate_background_pyramid,
+    iter_background_tiles,
+    render_background_tiled,
+    save_background_npy,
+    save_background_png,
+    save_background_pyramid,
+)
 
 
 class TestBackgroundGenerator:
@@ -29,3 +42,180 @@ class TestBackgroundGenerator:
     def test_unknown_zone_fallback(self):
         bg = generate_background("nonexistent_zone", 50, 50, seed=42)
         assert bg.shape == (50, 50, 4)
+
+
+class TestTiledBackground:
+    @pytest.mark.parametrize("tile_size", [16, 20, 64])
+    def test_tiles_match_single_shot(self, tile_size):
+        expected = generate_background("mistmoors", 50, 37, seed=7)
+        out = np.zeros_like(expected)
+        render_background_tiled("mistmoors", 50, 37, out, seed=7, tile_size=tile_size)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_tiles_are_bounded(self):
+        tiles = list(iter_background_tiles("skyreach", 40, 30, seed=1, tile_size=16))
+        assert [(x0, y0) for x0, y0, _ in tiles] == [
+            (0, 0), (16, 0), (32, 0), (0, 16), (16, 16), (32, 16),
+        ]
+        assert all(t.shape[0] <= 16 and t.shape[1] <= 16 for _, _, t in tiles)
+
+    def test_npy_memmap_output(self, tmp_path):
+        path = tmp_path / "bg.npy"
+        save_background_npy(path, "skyreach", 45, 33, seed=3, tile_size=16)
+        np.testing.assert_array_equal(
+            np.load(path), generate_background("skyreach", 45, 33, seed=3)
+        )
+
+    def test_streamed_png_output(self, tmp_path):
+        path = tmp_path / "bg.png"
+        save_background_png(path, "blighted_wastes", 45, 33, seed=3, tile_size=16)
+        np.testing.assert_array_equal(
+            np.array(Image.open(path)), generate_background("blighted_wastes", 45, 33, seed=3)
+        )
+
+
+def _shade_reference(noise_large, noise_detail, primary, secondary, accent, width, height):
+    """The per-pixel shader the vectorized _shade replaced."""
+    result = np.zeros((height, width, 4), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            t_large = noise_large[y, x]
+            t_detail = noise_detail[y, x]
+            r = int(primary[0] * (1 - t_large) + secondary[0] * t_large)
+            g = int(primary[1] * (1 - t_large) + secondary[1] * t_large)
+            b = int(primary[2] * (1 - t_large) + secondary[2] * t_large)
+            if t_detail > 0.7:
+                accent_strength = (t_detail - 0.7) / 0.3 * 0.3
+                r = int(r * (1 - accent_strength) + accent[0] * accent_strength)
+                g = int(g * (1 - accent_strength) + accent[1] * accent_strength)
+                b = int(b * (1 - accent_strength) + accent[2] * accent_strength)
+            cx, cy = width / 2, height / 2
+            dist = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
+            max_dist = (cx ** 2 + cy ** 2) ** 0.5
+            vignette = max(0, 1.0 - (dist / max_dist) * 0.4)
+            r = int(r * vignette)
+            g = int(g * vignette)
+            b = int(b * vignette)
+            result[y, x] = [max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b)), 255]
+    return result
+
+
+class TestShade:
+    @pytest.mark.parametrize("size", [(37, 23), (64, 64), (101, 57)])
+    def test_matches_per_pixel_reference(self, size):
+        width, height = size
+        rng = np.random.default_rng(width)
+        noise_large = rng.random((height, width))
+        noise_detail = rng.random((height, width))
+        colors = ((30, 60, 20), (90, 140, 70), (230, 200, 90))
+        np.testing.assert_array_equal(
+            _shade(noise_large, noise_detail, *colors, width, height),
+            _shade_reference(noise_large, noise_detail, *colors, width, height),
+        )
+
+    def test_window_matches_full_canvas(self):
+        rng = np.random.default_rng(5)
+        noise_large = rng.random((30, 40))
+        noise_detail = rng.random((30, 40))
+        colors = ((10, 20, 30), (200, 180, 160), (255, 255, 255))
+        full = _shade(noise_large, noise_detail, *colors, 40, 30)
+        window = _shade(noise_large[7:19, 11:33], noise_detail[7:19, 11:33], *colors, 40, 30, 11, 7)
+        np.testing.assert_array_equal(window, full[7:19, 11:33])
+
+    def test_vignette_matches_scalar_distance(self):
+        # Some of these distances round differently under np.sqrt than pow()
+        width, height = 257, 131
+        vignette = _vignette_window(width, height, 0, 0, width, height)
+        cx, cy = width / 2, height / 2
+        max_dist = (cx ** 2 + cy ** 2) ** 0.5
+        expected = [
+            [max(0, 1.0 - (((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 / max_dist) * 0.4) for x in range(width)]
+            for y in range(height)
+        ]
+        np.testing.assert_array_equal(vignette, expected)
+
+    def test_vignette_is_cached_read_only(self):
+        vignette = _vignette(48, 32)
+        assert _vignette(48, 32) is vignette
+        assert not vignette.flags.writeable
+        assert vignette[16, 24] == 1.0
+
+    def test_vignette_cache_bounded_by_bytes(self, monkeypatch):
+        from src.generators import backgrounds
+        from src.core.lru import ByteLRU
+        monkeypatch.setattr(backgrounds, "_VIGNETTES", ByteLRU(2 * 64 * 64 * 8))
+        for size in (64, 63, 62):
+            _vignette(size, 64)
+        assert backgrounds._VIGNETTES.nbytes <= 2 * 64 * 64 * 8
+        assert (64, 64) not in backgrounds._VIGNETTES
+        # A canvas over the cap is still computed, just not kept
+        assert _vignette(200, 100).shape == (100, 200)
+        assert (200, 100) not in backgrounds._VIGNETTES
+
+
+class TestBackgroundPyramid:
+    def test_levels_in_requested_order(self):
+        sizes = [(24, 12), (64, 36), (32, 18)]
+        levels = generate_background_pyramid("mistmoors", sizes, seed=5)
+        assert [level.shape for level in levels] == [(12, 24, 4), (36, 64, 4), (18, 32, 4)]
+        assert all(np.all(level[:, :, 3] == 255) for level in levels)
+
+    def test_synthesis_size_matches_single_render(self):
+        full, _ = generate_background_pyramid("skyreach", [(48, 30), (24, 15)], seed=9)
+        np.testing.assert_array_equal(full, generate_background("skyreach", 48, 30, seed=9))
+
+    def test_synthesizes_noise_once(self, monkeypatch):
+        from src.generators import backgrounds
+        calls = []
+        original = backgrounds.generate_noise
+
+        def counting(width, height, **kwargs):
+            calls.append((width, height))
+            return original(width, height, **kwargs)
+
+        monkeypatch.setattr(backgrounds, "generate_noise", counting)
+        generate_background_pyramid("mistmoors", [(64, 36), (32, 18), (16, 9)], seed=1)
+        # One large-scale and one detail field, both at the synthesis size
+        assert calls == [(64, 36), (64, 36)]
+
+    def test_each_level_dithered_at_its_resolution(self, monkeypatch):
+        from src.generators import backgrounds
+        shapes = []
+        original = backgrounds.apply_ordered_dither
+
+        def recording(img, **kwargs):
+            shapes.append(img.shape[:2])
+            return original(img, **kwargs)
+
+        monkeypatch.setattr(backgrounds, "apply_ordered_dither", recording)
+        generate_background_pyramid("mistmoors", [(64, 64), (32, 32), (8, 8)], seed=2)
+        assert shapes == [(64, 64), (32, 32), (8, 8)]
+
+    def test_mixed_aspect_ratios_crop(self):
+        wide, square = generate_background_pyramid("mistmoors", [(60, 20), (20, 20)], seed=3)
+        assert wide.shape == (20, 60, 4)
+        assert square.shape == (20, 20, 4)
+
+    def test_largest_level_matches_single_render_in_any_position(self):
+        small, full, wide = generate_background_pyramid(
+            "skyreach", [(20, 20), (48, 30), (48, 10)], seed=9
+        )
+        np.testing.assert_array_equal(full, generate_background("skyreach", 48, 30, seed=9))
+        assert small.shape == (20, 20, 4)
+        assert wide.shape == (10, 48, 4)
+
+    @pytest.mark.parametrize("sizes", [
+        [],
+        [(0, 10)],
+        [(10, -1)],
+        [(64, 36), (36, 64)],  # Mixed orientations would need an upscale
+        [(64, 36), (70, 20)],  # Wider than the largest level
+    ])
+    def test_invalid_sizes_raise(self, sizes):
+        with pytest.raises(ValueError):
+            generate_background_pyramid("mistmoors", sizes)
+
+    def test_save_writes_each_level(self, tmp_path):
+        paths = save_background_pyramid(tmp_path / "out", "skyreach", [(40, 24), (20, 12)], seed=4)
+        assert [p.name for p in paths] == ["skyreach-40x24.png", "skyreach-20x12.png"]
+        assert np.array(Image.open(paths[1])).shape == (12, 20, 4)
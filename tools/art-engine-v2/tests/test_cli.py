@@ -138,6 +138,87 @@ class TestManifestCLI:
         assert len(pngs) == 8
 
 
+class TestComposeBackgroundCLI:
+    def test_background_with_noise_cache(self, tmp_path):
+        runner = CliRunner()
+        args = [
+            "compose", "background",
+            "--zone", "mistmoors", "--width", "40", "--height", "30",
+            "--noise-cache", str(tmp_path / "cache"),
+        ]
+        first = runner.invoke(cli, args + ["--output", str(tmp_path / "a.png")])
+        second = runner.invoke(cli, args + ["--output", str(tmp_path / "b.png")])
+        assert first.exit_code == 0, first.output
+        assert second.exit_code == 0, second.output
+        assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+        np.testing.assert_array_equal(
+            np.array(Image.open(tmp_path / "a.png")), np.array(Image.open(tmp_path / "b.png"))
+        )
+
+
+    def test_background_tiled(self, tmp_path):
+        runner = CliRunner()
+        args = ["compose", "background", "--zone", "mistmoors", "--width", "40", "--height", "30"]
+        whole = runner.invoke(cli, args + ["--output", str(tmp_path / "whole.png")])
+        tiled = runner.invoke(cli, args + ["--tile-size", "16", "--output", str(tmp_path / "tiled.png")])
+        assert whole.exit_code == 0, whole.output
+        assert tiled.exit_code == 0, tiled.output
+        np.testing.assert_array_equal(
+            np.array(Image.open(tmp_path / "whole.png")), np.array(Image.open(tmp_path / "tiled.png"))
+        )
+
+    def test_background_tiled_rejects_noise_cache(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "compose", "background", "--zone", "mistmoors", "--width", "40", "--height", "30",
+            "--tile-size", "16", "--noise-cache", str(tmp_path / "cache"),
+            "--output", str(tmp_path / "bg.png"),
+        ])
+        assert result.exit_code == 2
+        assert "--noise-cache" in result.output
+        assert not (tmp_path / "bg.png").exists()
+
+
+class TestComposeBackgroundPyramidCLI:
+    def test_writes_all_levels(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "compose", "background-pyramid",
+            "--zone", "mistmoors", "--size", "48x27", "--size", "24x14",
+            "--output-dir", str(tmp_path / "bg"),
+        ])
+        assert result.exit_code == 0, result.output
+        assert sorted(p.name for p in (tmp_path / "bg").iterdir()) == [
+            "mistmoors-24x14.png", "mistmoors-48x27.png",
+        ]
+        largest = np.array(Image.open(tmp_path / "bg" / "mistmoors-48x27.png"))
+        single = runner.invoke(cli, [
+            "compose", "background", "--zone", "mistmoors", "--width", "48", "--height", "27",
+            "--output", str(tmp_path / "single.png"),
+        ])
+        assert single.exit_code == 0, single.output
+        np.testing.assert_array_equal(largest, np.array(Image.open(tmp_path / "single.png")))
+
+    def test_rejects_malformed_size(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "compose", "background-pyramid", "--zone", "mistmoors", "--size", "48by27",
+            "--output-dir", str(tmp_path / "bg"),
+        ])
+        assert result.exit_code != 0
+        assert "WIDTHxHEIGHT" in result.output
+
+
+    def test_rejects_mixed_orientations(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "compose", "background-pyramid", "--zone", "mistmoors",
+            "--size", "48x27", "--size", "27x48", "--output-dir", str(tmp_path / "bg"),
+        ])
+        assert result.exit_code == 2
+        assert "orientations" in result.output
+        assert not (tmp_path / "bg").exists()
+
 class TestVersionFlag:
     def test_version(self):
         runner = CliRunner()
@@ -1,7 +1,15 @@
 """Tests for alpha compositing."""
 import numpy as np
 import pytest
-from src.core.compositor import alpha_composite, alpha_composite_at
+from src.core.compositor import (
+    alpha_composite,
+    alpha_composite_at,
+    alpha_composite_fixed,
+    composite_into,
+    composite_layer,
+    flatten_layers,
+)
+from src.core.layer import Layer
 
 
 def test_alpha_composite_opaque_replaces():
@@ -159,3 +167,161 @@ def test_alpha_composite_preserves_alpha():
     # 0.5 + 0.5 * 0.5 = 0.75 = 191.25 ≈ 191
     assert result[0, 0, 3] > 128
     assert result[0, 0, 3] <= 255
+
+
+def test_alpha_composite_fixed_matches_float():
+    """Fixed-point compositing is within one level of the float64 path."""
+    rng = np.random.default_rng(7)
+    bg = rng.integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    fg = rng.integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    bg[:16, :, 3] = 0    # Transparent background rows
+    fg[16:32, :, 3] = 0  # Transparent foreground rows
+    fg[32:48, :, 3] = 255  # Opaque foreground rows
+
+    expected = alpha_composite(bg, fg).astype(np.int16)
+    result = alpha_composite_fixed(bg, fg).astype(np.int16)
+
+    assert np.abs(expected - result).max() <= 1
+    # Opaque foreground replaces the background exactly
+    np.testing.assert_array_equal(result[32:48], fg[32:48])
+
+
+def test_alpha_composite_fixed_writes_out_buffer():
+    """Fixed-point compositing writes into the caller's buffer, including in place."""
+    bg = np.zeros((10, 10, 4), dtype=np.uint8)
+    bg[:, :] = [200, 0, 0, 255]
+    fg = np.zeros((10, 10, 4), dtype=np.uint8)
+    fg[:, :] = [0, 0, 200, 128]
+
+    out = np.empty_like(bg)
+    returned = alpha_composite_fixed(bg, fg, out=out)
+    assert returned is out
+
+    in_place = bg.copy()
+    alpha_composite_fixed(in_place, fg, out=in_place)
+    np.testing.assert_array_equal(in_place, out)
+    assert out[0, 0, 3] == 255
+
+
+def test_alpha_composite_fixed_transparent_over_transparent():
+    """Two transparent layers stay fully transparent black."""
+    bg = np.zeros((4, 4, 4), dtype=np.uint8)
+    fg = np.zeros((4, 4, 4), dtype=np.uint8)
+    fg[:, :, :3] = 255
+
+    result = alpha_composite_fixed(bg, fg)
+
+    np.testing.assert_array_equal(result, 0)
+
+
+def test_composite_into_modifies_canvas_in_place():
+    """composite_into writes the clipped window and leaves the rest untouched."""
+    canvas = np.zeros((20, 20, 4), dtype=np.uint8)
+    canvas[:, :, 3] = 255
+    fg = np.ones((5, 5, 4), dtype=np.uint8) * 255
+
+    composite_into(canvas, fg, x=5, y=5)
+
+    assert np.all(canvas[5:10, 5:10, :3] == 255)
+    assert np.all(canvas[0:5, 0:5, :3] == 0)
+    assert np.all(canvas[10:, 10:, :3] == 0)
+
+
+def test_composite_into_matches_fixed_point_on_window():
+    """composite_into and alpha_composite_at equal alpha_composite_fixed on the overlap."""
+    rng = np.random.default_rng(3)
+    bg = rng.integers(0, 256, (16, 16, 4), dtype=np.uint8)
+    fg = rng.integers(0, 256, (8, 8, 4), dtype=np.uint8)
+
+    # (x, y) -> (bg rows, bg cols, fg rows, fg cols) of the overlap, worked out by hand
+    cases = {
+        (0, 0): (slice(0, 8), slice(0, 8), slice(0, 8), slice(0, 8)),
+        (4, 6): (slice(6, 14), slice(4, 12), slice(0, 8), slice(0, 8)),
+        (-3, -2): (slice(0, 6), slice(0, 5), slice(2, 8), slice(3, 8)),
+        (12, 13): (slice(13, 16), slice(12, 16), slice(0, 3), slice(0, 4)),
+    }
+    for (x, y), (bg_rows, bg_cols, fg_rows, fg_cols) in cases.items():
+        expected = bg.copy()
+        expected[bg_rows, bg_cols] = alpha_composite_fixed(bg[bg_rows, bg_cols], fg[fg_rows, fg_cols])
+
+        canvas = bg.copy()
+        composite_into(canvas, fg, x, y)
+        np.testing.assert_array_equal(canvas, expected)
+        np.testing.assert_array_equal(alpha_composite_at(bg, fg, x, y), expected)
+
+    # No overlap leaves the background untouched
+    canvas = bg.copy()
+    composite_into(canvas, fg, 40, 40)
+    np.testing.assert_array_equal(canvas, bg)
+
+
+def test_composite_layer_matches_full_frame():
+    """Blending only the layer's bounding box equals a full-frame composite."""
+    rng = np.random.default_rng(11)
+    canvas = rng.integers(0, 256, (32, 32, 4), dtype=np.uint8)
+    canvas[:, :, 3] = np.maximum(canvas[:, :, 3], 1)  # Invisible RGB is not preserved
+    overlay = np.zeros((32, 32, 4), dtype=np.uint8)
+    overlay[20:28, 4:12] = rng.integers(0, 256, (8, 8, 4), dtype=np.uint8)
+    overlay[20, 4, 3] = 255
+
+    expected = alpha_composite_fixed(canvas, overlay)
+    composite_layer(canvas, Layer.from_array(overlay))
+
+    np.testing.assert_array_equal(canvas, expected)
+
+
+def test_flatten_layers_opaque_stack_exact():
+    """Opaque layers flatten to the same result as sequential compositing."""
+    base = np.zeros((16, 16, 4), dtype=np.uint8)
+    base[2:14, 2:14] = [180, 140, 100, 255]
+    top = np.zeros((16, 16, 4), dtype=np.uint8)
+    top[4:8, 4:12] = [20, 40, 200, 255]
+    layers = {"body": Layer.from_array(base), "chest": Layer.from_array(top)}
+
+    result = flatten_layers(layers, ["body", "chest"])
+
+    expected = alpha_composite(alpha_composite(np.zeros_like(base), base), top)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_flatten_layers_respects_order():
+    """Later names in order are composited on top."""
+    red = np.zeros((4, 4, 4), dtype=np.uint8)
+    red[:, :] = [255, 0, 0, 255]
+    blue = np.zeros((4, 4, 4), dtype=np.uint8)
+    blue[:, :] = [0, 0, 255, 255]
+    layers = {"a": Layer.from_array(red), "b": Layer.from_array(blue)}
+
+    assert flatten_layers(layers, ["a", "b"])[0, 0, 2] == 255
+    assert flatten_layers(layers, ["b", "a"])[0, 0, 0] == 255
+
+
+def test_flatten_layers_semi_transparent_close_to_float():
+    """Semi-transparent stacks stay within one level of the float64 reference."""
+    rng = np.random.default_rng(5)
+    arrays = [rng.integers(0, 256, (24, 24, 4), dtype=np.uint8) for _ in range(4)]
+    layers = {f"l{i}": Layer.from_array(a) for i, a in enumerate(arrays)}
+
+    # Reference: sequential premultiplied float64 'over', rounded once
+    acc_rgb = np.zeros((24, 24, 3))
+    acc_a = np.zeros((24, 24, 1))
+    for a in arrays:
+        fa = a[:, :, 3:4] / 255.0
+        acc_rgb = a[:, :, :3] * fa + acc_rgb * (1 - fa)
+        acc_a = fa + acc_a * (1 - fa)
+    ref_rgb = np.rint(acc_rgb / np.where(acc_a > 0, acc_a, 1))
+
+    result = flatten_layers(layers, list(layers))
+
+    assert np.abs(result[:, :, :3].astype(int) - ref_rgb).max() <= 1
+    np.testing.assert_array_equal(result[:, :, 3], np.rint(acc_a[:, :, 0] * 255))
+
+
+def test_flatten_layers_empty_needs_size():
+    """An empty stack yields a transparent canvas of the requested size."""
+    result = flatten_layers({}, ["body"], size=(8, 4))
+    assert result.shape == (4, 8, 4)
+    assert not np.any(result)
+
+    with pytest.raises(ValueError):
+        flatten_layers({}, ["body"])
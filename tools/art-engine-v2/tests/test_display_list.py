@@ -0,0 +1,131 @@
+"""Tests for recorded, compiled drawing commands."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.core.compositor import composite_into
+from src.core.display_list import DisplayList
+from src.core.primitives import draw_ellipse, draw_filled_rect, draw_line, draw_rect, flood_fill
+from src.core.shapes import circle_mask, ellipse_mask, paint_mask
+
+RED = (255, 0, 0, 255)
+GREEN = (0, 255, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def _random_commands(rng: np.random.Generator, n: int) -> list[tuple]:
+    colors = [RED, GREEN, BLUE, (10, 20, 30, 128), (0, 0, 0, 0)]
+    kinds = ["rect", "rect_outline", "line", "ellipse", "disc", "mask"]
+    commands = []
+    for _ in range(n):
+        kind = kinds[rng.integers(len(kinds))]
+        color = colors[rng.integers(len(colors))]
+        a, b, c, d = (int(v) for v in rng.integers(-8, 40, size=4))
+        commands.append((kind, a, b, c, d, color))
+    return commands
+
+
+def _draw_immediately(canvas: np.ndarray, commands: list[tuple]) -> None:
+    for kind, a, b, c, d, color in commands:
+        if kind == "rect":
+            draw_filled_rect(canvas, a, b, c, d, color)
+        elif kind == "rect_outline":
+            draw_rect(canvas, a, b, c, d, color)
+        elif kind == "line":
+            draw_line(canvas, a, b, c, d, color)
+        elif kind == "ellipse":
+            draw_ellipse(canvas, a, b, abs(c) % 9, abs(d) % 9, color)
+        elif kind == "disc":
+            rx, ry = abs(c) % 9, abs(d) % 9
+            paint_mask(canvas, ellipse_mask(rx + 0.5, ry + 0.5), a - rx, b - ry, color)
+        else:
+            paint_mask(canvas, circle_mask(abs(c) % 6), a, b, color)
+
+
+def _record(dl: DisplayList, commands: list[tuple]) -> None:
+    for kind, a, b, c, d, color in commands:
+        if kind == "rect":
+            dl.rect(a, b, c, d, color)
+        elif kind == "rect_outline":
+            dl.rect_outline(a, b, c, d, color)
+        elif kind == "line":
+            dl.line(a, b, c, d, color)
+        elif kind == "ellipse":
+            dl.ellipse(a, b, abs(c) % 9, abs(d) % 9, color)
+        elif kind == "disc":
+            dl.ellipse(a, b, abs(c) % 9, abs(d) % 9, color, filled=True)
+        else:
+            dl.mask(circle_mask(abs(c) % 6), a, b, color)
+
+
+class TestDisplayList:
+    def test_matches_immediate_drawing(self):
+        rng = np.random.default_rng(3)
+        for _ in range(30):
+            commands = _random_commands(rng, 25)
+            expected = np.zeros((32, 40, 4), dtype=np.uint8)
+            _draw_immediately(expected, commands)
+            dl = DisplayList(40, 32)
+            _record(dl, commands)
+            assert np.array_equal(dl.render(), expected)
+
+    def test_barriers_keep_order(self):
+        sprite = np.zeros((4, 4, 4), dtype=np.uint8)
+        sprite[1:3, 1:3] = (255, 255, 255, 128)
+
+        dl = DisplayList(12, 12)
+        dl.rect(0, 0, 11, 11, RED).rect_outline(2, 2, 9, 9, GREEN)
+        dl.fill(5, 5, BLUE)
+        dl.blit(sprite, 4, 4)
+        dl.line(0, 11, 11, 0, GREEN)
+
+        expected = np.zeros((12, 12, 4), dtype=np.uint8)
+        draw_filled_rect(expected, 0, 0, 11, 11, RED)
+        draw_rect(expected, 2, 2, 9, 9, GREEN)
+        flood_fill(expected, 5, 5, BLUE)
+        composite_into(expected, sprite, 4, 4)
+        draw_line(expected, 0, 11, 11, 0, GREEN)
+
+        assert np.array_equal(dl.render(), expected)
+        assert len(dl) == 5
+        # Two paint segments around the fill and blit barriers
+        assert len(dl.compile()) == 4
+
+    def test_compiled_once_until_changed(self):
+        dl = DisplayList(8, 8).rect(0, 0, 3, 3, RED)
+        steps = dl.compile()
+        assert dl.compile() is steps
+        first = dl.render()
+        assert np.array_equal(dl.render(), first)
+        dl.rect(4, 4, 7, 7, GREEN)
+        assert dl.compile() is not steps
+        assert tuple(dl.render()[5, 5]) == GREEN
+
+    def test_colors_share_labels(self):
+        dl = DisplayList(16, 16)
+        for i in range(8):
+            dl.line(0, i, 15, i, RED if i % 2 else GREEN)
+        (segment,) = dl.compile()
+        assert len(segment.colors) == 3  # Unused 0, red, green
+        assert segment.labels.shape == (8, 16)
+
+    def test_renders_onto_canvas(self):
+        canvas = np.full((6, 6, 4), 7, dtype=np.uint8)
+        DisplayList(6, 6).rect(1, 1, 2, 2, RED).render(canvas)
+        assert tuple(canvas[1, 1]) == RED
+        assert tuple(canvas[4, 4]) == (7, 7, 7, 7)
+
+    def test_transparent_paint_clears(self):
+        canvas = np.full((4, 4, 4), 200, dtype=np.uint8)
+        DisplayList(4, 4).rect(0, 0, 1, 1, (0, 0, 0, 0)).render(canvas)
+        assert not canvas[:2, :2].any()
+        assert canvas[3, 3, 3] == 200
+
+    def test_empty_list(self):
+        assert not DisplayList(5, 3).render().any()
+        assert not DisplayList(5, 3).rect(10, 10, 12, 12, RED).render().any()
+
+    def test_canvas_size_mismatch(self):
+        with pytest.raises(ValueError):
+            DisplayList(4, 4).render(np.zeros((5, 4, 4), dtype=np.uint8))
@@ -2,7 +2,14 @@
 from __future__ import annotations
 import numpy as np
 import pytest
-from src.core.dither import bayer_matrix, apply_ordered_dither
+from src.core.dither import (
+    bayer_matrix,
+    bayer_offsets,
+    tiled_bayer_offsets,
+    apply_ordered_dither,
+    dither_to_indices,
+)
+from src.core.palette import indices_to_rgba, quantize_image
 
 
 def test_bayer_matrix_size_2():
@@ -104,3 +111,111 @@ def test_apply_ordered_dither_deterministic():
     result2 = apply_ordered_dither(img, matrix_size=4, spread=16)
 
     assert np.array_equal(result1, result2)
+
+
+def _reference_dither(img, matrix_size, spread):
+    """Per-pixel reference implementation of ordered dithering."""
+    result = img.copy()
+    matrix = bayer_matrix(matrix_size)
+    h, w = img.shape[:2]
+    for y in range(h):
+        for x in range(w):
+            if img[y, x, 3] == 0:
+                continue
+            threshold = matrix[y % matrix_size, x % matrix_size]
+            for c in range(3):
+                val = int(img[y, x, c]) + int(threshold * spread)
+                result[y, x, c] = max(0, min(255, val))
+    return result
+
+
+@pytest.mark.parametrize("matrix_size", [2, 4, 8])
+@pytest.mark.parametrize("spread", [0, 7, 12, 33])
+def test_apply_ordered_dither_matches_reference(matrix_size, spread):
+    """Vectorized dithering is bit-identical to the per-pixel definition."""
+    rng = np.random.default_rng(matrix_size * 100 + spread)
+    img = rng.integers(0, 256, (19, 27, 4), dtype=np.uint8)
+    img[rng.random((19, 27)) < 0.3, 3] = 0  # Non-multiple size, mixed alpha
+
+    result = apply_ordered_dither(img, matrix_size=matrix_size, spread=spread)
+
+    np.testing.assert_array_equal(result, _reference_dither(img, matrix_size, spread))
+
+
+def test_bayer_offsets_memoized():
+    """Offset tiles are built once per (size, spread) and are read-only."""
+    tile = bayer_offsets(4, 8)
+    assert tile is bayer_offsets(4, 8)
+    assert tile.dtype == np.int16
+    assert not tile.flags.writeable
+    np.testing.assert_array_equal(tile, (bayer_matrix(4) * 8).astype(int))
+
+
+def test_tiled_bayer_offsets_repeat_tile():
+    """Canvas-sized offsets repeat the tile and are reused per size."""
+    tiled = tiled_bayer_offsets(8, 12, 20, 30)
+    assert tiled.shape == (20, 30, 1)
+    assert tiled is tiled_bayer_offsets(8, 12, 20, 30)
+    tile = bayer_offsets(8, 12)
+    np.testing.assert_array_equal(tiled[8:16, 16:24, 0], tile)
+    np.testing.assert_array_equal(tiled[16:20, 24:30, 0], tile[:4, :6])
+
+
+def test_tiled_bayer_offsets_cache_is_byte_capped(monkeypatch):
+    """Cached canvases stay under the byte cap; larger ones are not kept."""
+    from src.core import dither
+    from src.core.lru import ByteLRU
+    monkeypatch.setattr(dither, "_TILED_OFFSETS", ByteLRU(3 * 100 * 100 * 2))
+
+    first = tiled_bayer_offsets(8, 12, 100, 100)
+    tiled_bayer_offsets(8, 12, 100, 101)
+    latest = tiled_bayer_offsets(8, 12, 100, 102)
+    assert dither._TILED_OFFSETS.nbytes <= dither._TILED_OFFSETS.max_bytes
+    assert (8, 12, 100, 100) not in dither._TILED_OFFSETS
+    assert tiled_bayer_offsets(8, 12, 100, 102) is latest
+
+    big = tiled_bayer_offsets(8, 12, 200, 200)
+    assert big.shape == (200, 200, 1)
+    assert (8, 12, 200, 200) not in dither._TILED_OFFSETS
+    np.testing.assert_array_equal(big[:100, :100], first)
+
+
+def test_dither_to_indices_matches_two_pass():
+    """Fused dither+quantize equals dithering then quantizing."""
+    rng = np.random.default_rng(21)
+    img = rng.integers(0, 256, (12, 14, 4), dtype=np.uint8)
+    img[rng.random((12, 14)) < 0.25, 3] = 0
+    palette = [tuple(int(c) for c in rng.integers(0, 256, 3)) for _ in range(9)]
+
+    indices = dither_to_indices(img, palette, matrix_size=4, spread=8)
+    fused = indices_to_rgba(indices, palette, img[:, :, 3])
+
+    expected = quantize_image(apply_ordered_dither(img, matrix_size=4, spread=8), palette)
+    opaque = img[:, :, 3] != 0
+    np.testing.assert_array_equal(fused[opaque], expected[opaque])
+    np.testing.assert_array_equal(fused[:, :, 3], img[:, :, 3])
+
+
+def test_dither_to_indices_transparent_index():
+    """Transparent pixels map to the index one past the palette."""
+    img = np.zeros((4, 4, 4), dtype=np.uint8)
+    img[0, 0] = [250, 250, 250, 255]
+    palette = [(0, 0, 0), (255, 255, 255)]
+
+    indices = dither_to_indices(img, palette)
+
+    assert indices.dtype == np.uint8
+    assert indices[0, 0] == 1
+    assert np.all(indices.ravel()[1:] == len(palette))
+
+
+def test_apply_ordered_dither_origin_keeps_phase():
+    """Dithering a window with its origin matches the same slice of the full image."""
+    rng = np.random.default_rng(3)
+    img = rng.integers(0, 256, (30, 30, 4), dtype=np.uint8)
+    img[:, :, 3] = 255
+    full = apply_ordered_dither(img, matrix_size=8, spread=12)
+
+    window = apply_ordered_dither(img[5:20, 11:29], matrix_size=8, spread=12, origin=(11, 5))
+
+    np.testing.assert_array_equal(window, full[5:20, 11:29])
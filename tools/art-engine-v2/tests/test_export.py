@@ -0,0 +1,50 @@
+"""Tests for PNG export helpers."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.core.export import PngStreamWriter, save_indexed_png
+
+
+def test_save_indexed_png_roundtrip(tmp_path):
+    """Paletted PNG reloads to the palette colors with transparency."""
+    palette = [(255, 0, 0), (0, 0, 255)]
+    indices = np.array([[0, 1], [2, 0]], dtype=np.uint8)
+    path = tmp_path / "indexed.png"
+
+    save_indexed_png(path, indices, palette)
+
+    img = Image.open(path)
+    assert img.mode == "P"
+    rgba = np.array(img.convert("RGBA"))
+    assert tuple(rgba[0, 0]) == (255, 0, 0, 255)
+    assert tuple(rgba[0, 1]) == (0, 0, 255, 255)
+    assert rgba[1, 0, 3] == 0
+
+
+def test_save_indexed_png_rejects_large_palette(tmp_path):
+    """Palettes that leave no room for the transparent entry are rejected."""
+    palette = [(i, i, i) for i in range(256)]
+    with pytest.raises(ValueError):
+        save_indexed_png(tmp_path / "big.png", np.zeros((2, 2), dtype=np.uint8), palette)
+
+
+def test_png_stream_writer_roundtrip(tmp_path):
+    """Rows written in bands decode to the original RGBA image."""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (23, 17, 4), dtype=np.uint8)
+    path = tmp_path / "streamed.png"
+
+    with PngStreamWriter(path, 17, 23) as writer:
+        for start in range(0, 23, 5):
+            writer.write_rows(img[start:start + 5])
+
+    np.testing.assert_array_equal(np.array(Image.open(path)), img)
+
+
+def test_png_stream_writer_rejects_short_image(tmp_path):
+    """Closing before every row is written is an error."""
+    writer = PngStreamWriter(tmp_path / "short.png", 4, 4)
+    writer.write_rows(np.zeros((2, 4, 4), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        writer.close()
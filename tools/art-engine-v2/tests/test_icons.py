@@ -1,8 +1,11 @@
 import json
 import numpy as np
+import pytest
 from pathlib import Path
 from PIL import Image
-from src.generators.icons import generate_icon, generate_icon_batch
+from src.core.layer import Layer
+from src.core.palette import MATERIAL_RAMPS, nearest_color
+from src.generators.icons import _apply_quality_glow, _swap_material, generate_icon, generate_icon_batch
 
 
 def _make_template(tmp_path):
@@ -109,3 +112,87 @@ class TestGenerateIconBatch:
         # All filenames should be unique
         names = [r.name for r in results]
         assert len(names) == len(set(names))
+
+    def test_parallel_and_sharded_runs_match_serial(self, tmp_path):
+        tpl_dir = _make_template(tmp_path)
+        args = dict(materials=["iron", "gold"], qualities=["common", "epic"], seeds=[7, 8])
+        serial = generate_icon_batch(tpl_dir, "test_sword", output_dir=tmp_path / "serial", **args)
+        parallel = generate_icon_batch(
+            tpl_dir, "test_sword", output_dir=tmp_path / "parallel", workers=2, **args
+        )
+        assert [p.name for p in parallel] == [p.name for p in serial]
+        for a, b in zip(serial, parallel):
+            assert a.read_bytes() == b.read_bytes()
+
+        # A single variant rendered on its own, out of order, is the same file
+        alone = generate_icon(tpl_dir, "test_sword", "gold", "epic", 8, tmp_path / "alone")
+        assert alone.read_bytes() == (tmp_path / "serial" / alone.name).read_bytes()
+
+
+class TestMaterials:
+    def test_registry_material_differs_from_iron(self, tmp_path):
+        tpl_dir = _make_template(tmp_path)
+        iron = generate_icon(tpl_dir, "test_sword", "iron", "common", 42, tmp_path / "out")
+        steel = generate_icon(tpl_dir, "test_sword", "steel", "common", 42, tmp_path / "out")
+        assert not np.array_equal(np.array(Image.open(iron)), np.array(Image.open(steel)))
+
+    def test_unknown_material_raises(self, tmp_path):
+        tpl_dir = _make_template(tmp_path)
+        with pytest.raises(ValueError):
+            generate_icon(tpl_dir, "test_sword", "unobtainium", "common", 42, tmp_path / "out")
+
+    def test_batch_validates_before_rendering(self, tmp_path):
+        tpl_dir = _make_template(tmp_path)
+        out_dir = tmp_path / "out"
+        with pytest.raises(ValueError):
+            generate_icon_batch(tpl_dir, "test_sword", ["iron", "unobtainium"], ["common"], [1], out_dir)
+        assert not out_dir.exists()
+
+
+class TestSwapMaterial:
+    def test_matches_per_pixel_reference(self):
+        rng = np.random.default_rng(0)
+        img = np.zeros((20, 20, 4), dtype=np.uint8)
+        img[2:18, 2:18, :3] = rng.integers(0, 256, (16, 16, 3))
+        img[2:18, 2:18, 3] = 255
+        img[5, 5, 3] = 0
+        # Includes a transparent pixel and out-of-bounds coordinates
+        pixels = [[x, y] for y in range(0, 22) for x in range(0, 22, 2)]
+        source, target = MATERIAL_RAMPS["iron"], MATERIAL_RAMPS["gold"]
+
+        expected = img.copy()
+        for x, y in pixels:
+            if y < 20 and x < 20 and img[y, x, 3] != 0:
+                src_idx = nearest_color(tuple(img[y, x, :3]), source)
+                expected[y, x, :3] = target[min(len(target) - 1, src_idx)]
+
+        result = _swap_material(Layer.from_array(img), pixels, source, target)
+
+        np.testing.assert_array_equal(result.pixels, expected)
+
+
+class TestQualityGlow:
+    def test_common_has_no_glow(self):
+        img = np.zeros((9, 9, 4), dtype=np.uint8)
+        img[4, 4] = [200, 200, 200, 255]
+        layer = Layer.from_array(img)
+        assert _apply_quality_glow(layer, "common") is layer
+
+    def test_glow_fades_with_distance(self):
+        img = np.zeros((11, 11, 4), dtype=np.uint8)
+        img[5, 5] = [200, 200, 200, 255]
+        result = _apply_quality_glow(Layer.from_array(img), "legendary").pixels
+        # radius 2, intensity 0.9: alpha = int(0.9 * (1 - d / 3) * 255)
+        assert result[5, 6, 3] == int(0.9 * (1 - 1 / 3) * 255)
+        assert result[5, 7, 3] == int(0.9 * (1 - 2 / 3) * 255)
+        assert result[5, 8, 3] == 0
+        assert tuple(result[5, 5]) == (200, 200, 200, 255)
+        assert tuple(result[5, 6, :3]) == (0xFF, 0x80, 0x00)
+
+    def test_overlapping_glows_take_strongest(self):
+        img = np.zeros((9, 12, 4), dtype=np.uint8)
+        img[4, 3] = [200, 200, 200, 255]
+        img[4, 6] = [200, 200, 200, 255]
+        result = _apply_quality_glow(Layer.from_array(img), "legendary").pixels
+        # Between the two pixels each glow reaches at distance 1 and 2
+        assert result[4, 4, 3] == result[4, 5, 3] == int(0.9 * (1 - 1 / 3) * 255)
@@ -38,6 +38,23 @@ class TestBackgroundRemover:
         assert result[0, 0, 3] == 0
         assert result[2, 2, 3] == 255
 
+    def test_connected_keeps_enclosed_background(self):
+        img = np.full((9, 9, 4), [0x1A, 0x1A, 0x1F, 255], dtype=np.uint8)
+        img[2:7, 2:7] = [180, 50, 30, 255]
+        img[4, 4] = [0x1A, 0x1A, 0x1F, 255]  # dark detail inside the subject
+        everywhere = remove_background(img, threshold=30)
+        connected = remove_background(img, threshold=30, connected=True)
+        assert everywhere[4, 4, 3] == 0
+        assert connected[4, 4, 3] == 255
+        assert connected[0, 0, 3] == 0 and connected[8, 8, 3] == 0
+        assert np.all(connected[2:7, 2:7, 3] == 255)
+
+    def test_connected_without_border_background(self):
+        img = np.full((5, 5, 4), [180, 50, 30, 255], dtype=np.uint8)
+        img[2, 2] = [0x1A, 0x1A, 0x1F, 255]
+        result = remove_background(img, threshold=30, connected=True)
+        assert np.all(result[:, :, 3] == 255)
+
 
 class TestRegionExtractor:
     def test_single_region(self):
@@ -93,3 +110,16 @@ class TestTemplateProcessor:
         result = process_template(input_path, output_dir, "crystal", "material", 1, 64)
         assert result["width"] == 32
         assert result["height"] == 64
+
+    def test_saves_paletted_png(self, tmp_path):
+        img = np.full((32, 32, 4), [0x1A, 0x1A, 0x1F, 255], dtype=np.uint8)
+        img[8:24, 8:24] = [200, 60, 40, 255]
+        input_path = tmp_path / "gem.png"
+        Image.fromarray(img).save(input_path)
+        output_dir = tmp_path / "out"
+        process_template(input_path, output_dir, "gem", "material", 1, 32)
+        saved = Image.open(output_dir / "gem.png")
+        assert saved.mode == "P"
+        rgba = np.array(saved.convert("RGBA"))
+        assert rgba[0, 0, 3] == 0
+        assert rgba[16, 16, 3] == 255
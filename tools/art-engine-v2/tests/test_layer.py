@@ -0,0 +1,51 @@
+"""Tests for bounding-box tracking layers."""
+import numpy as np
+from PIL import Image
+
+from src.core.layer import Layer, opaque_bbox
+
+
+def test_opaque_bbox_tight():
+    """Bounding box covers exactly the non-transparent pixels."""
+    img = np.zeros((20, 30, 4), dtype=np.uint8)
+    img[5:9, 10:22, 3] = 255
+    img[12, 3, 3] = 1
+    assert opaque_bbox(img) == (3, 5, 22, 13)
+
+
+def test_opaque_bbox_transparent():
+    """Fully transparent image has no bounding box."""
+    img = np.zeros((8, 8, 4), dtype=np.uint8)
+    img[:, :, :3] = 255  # Colour without alpha does not count
+    assert opaque_bbox(img) is None
+
+
+def test_layer_cropped_view():
+    """cropped() returns a view of the bounding box region."""
+    img = np.zeros((10, 10, 4), dtype=np.uint8)
+    img[2:4, 6:9] = [10, 20, 30, 255]
+    layer = Layer.from_array(img)
+
+    crop = layer.cropped()
+    assert crop.shape == (2, 3, 4)
+    assert np.all(crop[:, :, 3] == 255)
+    assert not layer.is_empty
+
+
+def test_layer_empty():
+    """Empty layers report is_empty and crop to nothing."""
+    layer = Layer.from_array(np.zeros((4, 4, 4), dtype=np.uint8))
+    assert layer.is_empty
+    assert layer.cropped().size == 0
+
+
+def test_layer_load_resizes(tmp_path):
+    """Layer.load converts to RGBA, resizes, and measures the box."""
+    img = np.zeros((8, 4, 4), dtype=np.uint8)
+    img[0:2, 0:2] = [255, 0, 0, 255]
+    Image.fromarray(img).save(tmp_path / "layer.png")
+
+    layer = Layer.load(tmp_path / "layer.png", size=(8, 16))
+
+    assert layer.pixels.shape == (16, 8, 4)
+    assert layer.bbox == (0, 0, 4, 4)
@@ -146,3 +146,27 @@ class TestComposeCLI:
         ])
         assert result.exit_code == 0, result.output
         assert (tmp_path / "bg.png").exists()
+
+    def test_compiled_layout_rerenders(self, tmp_path):
+        test_img = np.full((8, 8, 4), [0, 0, 255, 255], dtype=np.uint8)
+        img_path = tmp_path / "test.png"
+        Image.fromarray(test_img).save(img_path)
+        layout = {
+            "width": 120,
+            "height": 80,
+            "background": "#1A1A1F",
+            "elements": [
+                {"type": "panel", "x": 5, "y": 5, "width": 100, "height": 60, "elements": [
+                    {"type": "rect", "x": 10, "y": 10, "width": 20, "height": 5, "color": "#FF0000"},
+                    {"type": "image", "x": 40, "y": 10, "path": str(img_path)},
+                ]},
+                {"type": "separator", "x": 0, "y": 70, "width": 120},
+            ],
+        }
+        engine = LayoutEngine()
+        compiled = engine.compile(layout)
+        img_path.unlink()  # Files are read once, while compiling
+        first = compiled.render()
+        assert np.array_equal(compiled.render(), first)
+        assert tuple(first[15, 15, :3]) == (255, 0, 0)
+        assert tuple(first[15, 45, :3]) == (0, 0, 255)
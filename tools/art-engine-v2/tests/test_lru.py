@@ -0,0 +1,47 @@
+"""Tests for the byte-capped in-memory LRU cache."""
+import numpy as np
+import pytest
+
+from src.core.lru import ByteLRU
+
+
+def _array(n):
+    return lambda: np.zeros(n, dtype=np.uint8)
+
+
+def test_hit_returns_same_object():
+    cache = ByteLRU(100)
+    first = cache.get_or_create("a", _array(10))
+    assert cache.get_or_create("a", _array(10)) is first
+    assert cache.nbytes == 10
+
+
+def test_evicts_least_recently_used_to_stay_under_cap():
+    cache = ByteLRU(30)
+    cache.get_or_create("a", _array(10))
+    cache.get_or_create("b", _array(10))
+    cache.get_or_create("c", _array(10))
+    cache.get_or_create("a", _array(10))  # Touch a, so b is now the oldest
+    cache.get_or_create("d", _array(15))
+
+    assert "b" not in cache and "c" not in cache
+    assert "a" in cache and "d" in cache
+    assert cache.nbytes == 25
+
+
+def test_oversized_value_returned_but_not_kept():
+    cache = ByteLRU(30)
+    cache.get_or_create("a", _array(10))
+    big = cache.get_or_create("big", _array(31))
+    assert big.nbytes == 31
+    assert "big" not in cache
+    assert "a" in cache
+
+
+def test_clear_and_invalid_cap():
+    cache = ByteLRU(30)
+    cache.get_or_create("a", _array(10))
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+    with pytest.raises(ValueError):
+        ByteLRU(-1)
@@ -239,6 +239,45 @@ class TestManifestPipeline:
         pngs = list((tmp_path / "output").glob("*.png"))
         assert len(pngs) == 4  # 4 materials × 1 quality × 1 seed
 
+    def test_manifest_unknown_material_rejected_before_rendering(self, tmp_path):
+        """Unknown materials abort the run before any icon is written."""
+        tpl_dir = _make_manifest_setup(tmp_path)
+        manifest = {
+            "type": "icons",
+            "template": "dagger",
+            "materials": ["iron", "unobtainium", "steel", "plasteel"],
+            "qualities": ["common"],
+            "seeds": [100],
+            "output_dir": str(tmp_path / "output"),
+        }
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(json.dumps(manifest))
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "generate",
+                "manifest",
+                "--manifest",
+                str(manifest_path),
+                "--template-dir",
+                str(tpl_dir),
+            ],
+        )
+
+        assert result.exit_code != 0
+        assert "Unknown materials: unobtainium, plasteel" in result.output
+        assert not (tmp_path / "output").exists()
+
+    def test_sample_manifest_materials_known(self):
+        """Every material in the shipped sample manifest is registered."""
+        from src.core.materials import default_registry
+
+        sample = Path(__file__).parent.parent / "src" / "data" / "manifests" / "sample_weapons.json"
+        materials = json.loads(sample.read_text())["materials"]
+        assert default_registry().unknown(materials) == []
+
     def test_manifest_multiple_qualities(self, tmp_path):
         """Test manifest with all quality tiers."""
         tpl_dir = _make_manifest_setup(tmp_path)
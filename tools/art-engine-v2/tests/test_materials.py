@@ -0,0 +1,59 @@
+"""Tests for the material registry."""
+import json
+
+import numpy as np
+import pytest
+
+from src.core.materials import MaterialRegistry, default_registry
+from src.core.palette import MATERIAL_RAMPS, generate_ramp, hex_to_rgb
+from src.data import load_materials
+
+
+def test_bundled_materials_well_formed():
+    entries = load_materials()
+    ids = [entry["id"] for entry in entries]
+    assert len(ids) == len(set(ids))
+    for entry in entries:
+        assert len(hex_to_rgb(entry["base"])) == 3
+        assert isinstance(entry["tier"], int)
+
+
+def test_includes_manifest_and_tier_materials():
+    registry = default_registry()
+    for name in ["iron", "steel", "gold", "darksteel", "copper", "mithril", "thorium", "light_leather"]:
+        assert name in registry
+
+
+def test_template_source_ramps_match_registry():
+    """Detection ramps in MATERIAL_RAMPS are the registry's template sources."""
+    registry = default_registry()
+    for name, ramp in MATERIAL_RAMPS.items():
+        assert registry.ramp(name) == ramp
+
+
+def test_ramp_and_lut_cached():
+    registry = MaterialRegistry([{"id": "tin", "name": "Tin", "base": "#909098", "tier": 1}])
+    ramp = registry.ramp("tin")
+    assert ramp == generate_ramp((0x90, 0x90, 0x98), 7)
+    assert registry.ramp("tin") is ramp
+
+    lut = registry.lut("tin")
+    assert registry.lut("tin") is lut
+    assert lut.dtype == np.uint8 and lut.shape == (7, 3)
+    assert not lut.flags.writeable
+    np.testing.assert_array_equal(lut, ramp)
+
+
+def test_unknown_materials():
+    registry = MaterialRegistry([{"id": "tin", "name": "Tin", "base": "#909098", "tier": 1}])
+    assert registry.unknown(["tin", "lead", "zinc", "lead"]) == ["lead", "zinc"]
+    with pytest.raises(ValueError, match="lead"):
+        registry.validate(["tin", "lead"])
+    with pytest.raises(ValueError):
+        registry.ramp("lead")
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "materials.json"
+    path.write_text(json.dumps({"materials": [{"id": "tin", "name": "Tin", "base": "#909098", "tier": 1}]}))
+    assert MaterialRegistry.from_file(path).names == ["tin"]
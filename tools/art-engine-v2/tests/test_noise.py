@@ -1,7 +1,9 @@
 """Tests for noise generation."""
 import numpy as np
 import pytest
-from src.core.noise import generate_noise, generate_tileable_noise
+from opensimplex import OpenSimplex
+from src.core.noise import fbm_noise, generate_noise, generate_tileable_noise, simplex2, simplex4
+from src.core.noise import _permutation, _torus_tables
 
 
 def test_generate_noise_shape():
@@ -101,3 +103,90 @@ def test_generate_noise_scale_effect():
     noise1 = generate_noise(width=50, height=50, scale=0.01, seed=42)
     noise2 = generate_noise(width=50, height=50, scale=0.1, seed=42)
     assert not np.array_equal(noise1, noise2)
+
+
+def _reference_noise(width, height, scale, seed, octaves):
+    """Per-pixel opensimplex reference for generate_noise."""
+    gen = OpenSimplex(seed=seed)
+    result = np.zeros((height, width), dtype=np.float64)
+    for octave in range(octaves):
+        freq = scale * (2 ** octave)
+        amp = 0.5 ** octave
+        for y in range(height):
+            for x in range(width):
+                result[y, x] += gen.noise2(x * freq, y * freq) * amp
+    rmin, rmax = result.min(), result.max()
+    return (result - rmin) / (rmax - rmin)
+
+
+@pytest.mark.parametrize("seed", [0, 42, 1042, -7])
+def test_permutation_matches_opensimplex(seed):
+    """Seeded permutation tables equal the library's."""
+    np.testing.assert_array_equal(_permutation(seed), OpenSimplex(seed)._perm)
+
+
+def test_simplex2_matches_opensimplex_exactly():
+    """Vectorized simplex2 is bit-identical to scalar noise2, including lattice points."""
+    rng = np.random.default_rng(0)
+    points = np.concatenate([
+        rng.uniform(-40, 40, (2000, 2)),
+        rng.integers(-10, 10, (200, 2)).astype(np.float64),
+    ])
+    gen = OpenSimplex(seed=5)
+    expected = np.array([gen.noise2(x, y) for x, y in points])
+
+    result = simplex2(points[:, 0], points[:, 1], _permutation(5))
+
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("octaves", [1, 2])
+def test_generate_noise_matches_reference(octaves):
+    """Fields are identical to the per-pixel implementation for the same seed."""
+    expected = _reference_noise(37, 29, 0.08, 42, octaves)
+    np.testing.assert_array_equal(generate_noise(37, 29, scale=0.08, seed=42, octaves=octaves), expected)
+
+
+def test_fbm_noise_windows_tile_the_plane():
+    """An offset window equals the same slice of a larger field."""
+    full = fbm_noise(60, 40, scale=0.05, seed=3, octaves=2)
+    window = fbm_noise(25, 15, scale=0.05, seed=3, octaves=2, x0=20, y0=10)
+    np.testing.assert_array_equal(window, full[10:25, 20:45])
+
+
+def test_simplex4_matches_opensimplex():
+    """Vectorized simplex4 tracks scalar noise4 to within the documented 5e-4."""
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-5, 5, (3000, 4))
+    gen = OpenSimplex(seed=9)
+    expected = np.array([gen.noise4(*p) for p in points])
+
+    result = simplex4(points[:, 0], points[:, 1], points[:, 2], points[:, 3], _permutation(9))
+
+    np.testing.assert_allclose(result, expected, rtol=0, atol=5e-4)
+
+
+def test_tileable_noise_matches_reference():
+    """Tileable fields stay close to the per-pixel noise4 torus mapping."""
+    width, height, scale, seed = 24, 18, 0.1, 4
+    gen = OpenSimplex(seed=seed)
+    radius = 1.0 / (2.0 * np.pi * scale)
+    expected = np.zeros((height, width))
+    for y in range(height):
+        t = y / height * 2 * np.pi
+        for x in range(width):
+            s = x / width * 2 * np.pi
+            expected[y, x] = gen.noise4(
+                radius * np.cos(s), radius * np.sin(s), radius * np.cos(t), radius * np.sin(t)
+            )
+    expected = (expected - expected.min()) / (expected.max() - expected.min())
+
+    result = generate_tileable_noise(width, height, scale=scale, seed=seed)
+
+    np.testing.assert_allclose(result, expected, rtol=0, atol=5e-4)
+
+
+def test_torus_tables_cached():
+    """Torus coordinate tables are built once per (width, height, scale)."""
+    assert _torus_tables(32, 16, 0.05) is _torus_tables(32, 16, 0.05)
+    assert _torus_tables(32, 16, 0.05) is not _torus_tables(32, 16, 0.1)
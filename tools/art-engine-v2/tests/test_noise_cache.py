@@ -0,0 +1,100 @@
+"""Tests for the on-disk noise field cache."""
+import os
+
+import numpy as np
+
+import src.core.noise as noise_module
+from src.core.noise import generate_noise, generate_tileable_noise
+from src.core.noise_cache import NoiseCache
+from src.generators.backgrounds import generate_background
+
+
+def test_key_depends_on_every_parameter():
+    """Changing kind or any parameter gives a new key."""
+    base = NoiseCache.key("simplex2", width=10, height=10, scale=0.05, seed=1, octaves=2)
+    assert base == NoiseCache.key("simplex2", octaves=2, seed=1, scale=0.05, height=10, width=10)
+    assert base != NoiseCache.key("simplex2", width=10, height=10, scale=0.05, seed=2, octaves=2)
+    assert base != NoiseCache.key("simplex2", width=10, height=10, scale=0.06, seed=1, octaves=2)
+    assert base != NoiseCache.key("tileable4", width=10, height=10, scale=0.05, seed=1, octaves=2)
+
+
+def test_hit_is_memory_mapped_and_identical(tmp_path):
+    """A cached field is served as a read-only memmap equal to a fresh one."""
+    cache = NoiseCache(tmp_path)
+    cold = generate_noise(40, 30, scale=0.1, seed=5, octaves=2, cache=cache)
+    warm = generate_noise(40, 30, scale=0.1, seed=5, octaves=2, cache=cache)
+
+    assert isinstance(warm, np.memmap)
+    assert not warm.flags.writeable
+    np.testing.assert_array_equal(warm, cold)
+    np.testing.assert_array_equal(warm, generate_noise(40, 30, scale=0.1, seed=5, octaves=2))
+
+
+def test_tileable_noise_cached(tmp_path):
+    """Tileable fields go through the cache under their own key."""
+    cache = NoiseCache(tmp_path)
+    cold = generate_tileable_noise(16, 12, scale=0.1, seed=3, cache=cache)
+    warm = generate_tileable_noise(16, 12, scale=0.1, seed=3, cache=cache)
+    assert isinstance(warm, np.memmap)
+    np.testing.assert_array_equal(warm, cold)
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    """Entries over the size cap are evicted oldest-use first."""
+    field = np.zeros((16, 16))
+    entry_size = 16 * 16 * 8 + 128
+    cache = NoiseCache(tmp_path, max_bytes=2 * entry_size)
+    cache.put("a", field)
+    cache.put("b", field)
+    os.utime(tmp_path / "a.npy", ns=(1, 1))
+    os.utime(tmp_path / "b.npy", ns=(2, 2))
+    cache.get("a")  # refresh a; b is now the oldest
+
+    cache.put("c", field)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_warm_background_skips_noise_synthesis(tmp_path, monkeypatch):
+    """A warm rebuild renders identical output without generating noise."""
+    cache = NoiseCache(tmp_path)
+    cold = generate_background("mistmoors", 48, 32, seed=7, noise_cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("noise regenerated on a warm cache")
+
+    monkeypatch.setattr(noise_module, "fbm_noise", fail)
+    warm = generate_background("mistmoors", 48, 32, seed=7, noise_cache=cache)
+
+    np.testing.assert_array_equal(warm, cold)
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """An unreadable file is treated as a miss and rebuilt."""
+    cache = NoiseCache(tmp_path)
+    key = NoiseCache.key("simplex2", width=8, height=8, scale=0.05, seed=0, octaves=1)
+    (tmp_path / f"{key}.npy").write_bytes(b"not a numpy file")
+
+    result = generate_noise(8, 8, cache=cache)
+
+    np.testing.assert_array_equal(result, generate_noise(8, 8))
+    assert isinstance(cache.get(key), np.memmap)
+
+
+def test_hit_survives_failed_lru_touch(tmp_path, monkeypatch):
+    """A cache directory that refuses mtime updates still serves hits."""
+    cache = NoiseCache(tmp_path)
+    key = NoiseCache.key("simplex2", width=8, height=8, scale=0.05, seed=0, octaves=1)
+    cache.put(key, generate_noise(8, 8))
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", read_only)
+    field = cache.get(key)
+    assert isinstance(field, np.memmap)
+    np.testing.assert_array_equal(field, generate_noise(8, 8))
@@ -8,14 +8,29 @@ from src.core.palette import (
     QUALITY_COLORS,
     ZONE_PALETTES,
     UI_COLORS,
+    PaletteLUT,
     hex_to_rgb,
     rgb_to_hex,
     generate_ramp,
+    indices_to_rgba,
     nearest_color,
+    nearest_color_batch,
+    palette_lut,
     quantize_image,
+    quantize_indices,
 )
 
 
+def _reference_quantize(img, palette):
+    """Per-pixel nearest_color quantization (the original implementation)."""
+    result = img.copy()
+    for y in range(img.shape[0]):
+        for x in range(img.shape[1]):
+            if img[y, x, 3] > 0:
+                result[y, x, :3] = palette[nearest_color(tuple(img[y, x, :3]), palette)]
+    return result
+
+
 class TestColorConversion:
     """Test hex/RGB conversion functions."""
 
@@ -167,6 +182,47 @@ class TestNearestColor:
         assert nearest_color((0, 0, 0), palette) == 0
 
 
+class TestNearestColorBatch:
+    """Test vectorized nearest-color search."""
+
+    def test_matches_nearest_color(self):
+        """Every row matches the single-pixel search."""
+        rng = np.random.default_rng(11)
+        palette = [tuple(int(v) for v in c) for c in rng.integers(0, 256, (17, 3))]
+        pixels = rng.integers(0, 256, (500, 3), dtype=np.uint8)
+
+        result = nearest_color_batch(pixels, palette)
+
+        assert result.tolist() == [nearest_color(tuple(p), palette) for p in pixels]
+
+    def test_extreme_distances_do_not_overflow(self):
+        """Black versus white distances stay exact for uint8 input."""
+        palette = [(255, 255, 255), (0, 0, 0)]
+        pixels = np.array([[0, 0, 0], [255, 255, 255], [127, 127, 127], [128, 128, 128]], dtype=np.uint8)
+
+        assert nearest_color_batch(pixels, palette).tolist() == [1, 0, 1, 0]
+
+    def test_ties_pick_lowest_index(self):
+        palette = [(10, 0, 0), (12, 0, 0)]
+        assert nearest_color_batch([[11, 0, 0]], palette).tolist() == [0]
+
+    def test_chunking_is_transparent(self):
+        """Tiny chunks give the same result as one pass."""
+        rng = np.random.default_rng(5)
+        palette = rng.integers(0, 256, (9, 3))
+        pixels = rng.integers(0, 256, (1000, 3))
+
+        np.testing.assert_array_equal(
+            nearest_color_batch(pixels, palette, chunk_elements=20),
+            nearest_color_batch(pixels, palette),
+        )
+
+    def test_empty_pixels_and_palette(self):
+        assert nearest_color_batch(np.zeros((0, 3)), [(1, 2, 3)]).shape == (0,)
+        with pytest.raises(ValueError):
+            nearest_color_batch([[1, 2, 3]], [])
+
+
 class TestImageQuantization:
     """Test image quantization to palette."""
 
@@ -444,3 +500,93 @@ class TestUIColors:
         assert UI_COLORS["stat_positive"] == "#1EFF00"  # Green
         assert UI_COLORS["stat_negative"] == "#FF3333"  # Red
         assert UI_COLORS["text_gold"] == "#FFD700"  # Gold
+
+
+class TestIndexedImages:
+    """Test expanding palette-indexed images."""
+
+    def test_indices_to_rgba_expands_palette(self):
+        """Indices map to palette colors, the extra index to transparent."""
+        palette = [(10, 20, 30), (200, 100, 0)]
+        indices = np.array([[0, 1], [2, 1]])
+
+        result = indices_to_rgba(indices, palette)
+
+        assert tuple(result[0, 0]) == (10, 20, 30, 255)
+        assert tuple(result[0, 1]) == (200, 100, 0, 255)
+        assert tuple(result[1, 0]) == (0, 0, 0, 0)
+
+    def test_indices_to_rgba_restores_alpha(self):
+        """An explicit alpha channel overrides the default coverage."""
+        indices = np.zeros((2, 2), dtype=np.uint8)
+        alpha = np.array([[255, 128], [64, 0]], dtype=np.uint8)
+
+        result = indices_to_rgba(indices, [(1, 2, 3)], alpha)
+
+        np.testing.assert_array_equal(result[:, :, 3], alpha)
+
+
+class TestPaletteLUT:
+    """Test the bucketed nearest-palette lookup table."""
+
+    @pytest.mark.parametrize("size", [1, 3, 16, 128, 255])
+    def test_lut_matches_nearest_color(self, size):
+        """Table lookups equal nearest_color across a dense sample of RGB space."""
+        rng = np.random.default_rng(size)
+        palette = [tuple(int(v) for v in c) for c in rng.integers(0, 256, (size, 3))]
+        axis = np.arange(0, 256, 5)
+        grid = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1).reshape(-1, 3)
+        samples = np.concatenate([grid, rng.integers(0, 256, (2000, 3))])
+
+        result = PaletteLUT(palette).lookup(samples)
+
+        expected = [nearest_color(tuple(c), palette) for c in samples[::97]]
+        np.testing.assert_array_equal(result[::97], expected)
+
+    def test_lut_ties_and_duplicates_pick_lowest_index(self):
+        """Equidistant and repeated entries resolve like nearest_color."""
+        palette = [(10, 10, 10), (12, 10, 10), (10, 10, 10), (200, 0, 0)]
+        colors = np.array([[11, 10, 10], [10, 10, 10], [11, 90, 40], [106, 5, 5]])
+
+        result = PaletteLUT(palette).lookup(colors)
+
+        assert list(result) == [nearest_color(tuple(c), palette) for c in colors]
+
+    def test_palette_lut_cached(self):
+        """Tables are built once per palette."""
+        palette = [(1, 2, 3), (200, 100, 50)]
+        assert palette_lut(palette) is palette_lut(list(palette))
+
+    def test_palette_lut_cache_bounded_by_bytes(self, monkeypatch):
+        from src.core import palette as palette_module
+        from src.core.lru import ByteLRU
+        lut = PaletteLUT([(1, 2, 3), (200, 100, 50)])
+        monkeypatch.setattr(palette_module, "_PALETTE_LUTS", ByteLRU(2 * lut.nbytes))
+        for i in range(5):
+            newest = palette_lut([(i, 2, 3), (200, 100, 50)])
+        assert 1 <= len(palette_module._PALETTE_LUTS) < 5
+        assert palette_module._PALETTE_LUTS.nbytes <= 2 * lut.nbytes
+        assert palette_lut([(4, 2, 3), (200, 100, 50)]) is newest
+
+    def test_empty_palette_rejected(self):
+        with pytest.raises(ValueError):
+            PaletteLUT([])
+
+    def test_quantize_indices_small_and_large_batches(self):
+        """Direct search and table lookup give the same indices."""
+        rng = np.random.default_rng(7)
+        palette = [tuple(int(v) for v in c) for c in rng.integers(0, 256, (40, 3))]
+        colors = rng.integers(0, 256, (5000, 3))
+
+        small = np.concatenate([quantize_indices(colors[i:i + 100], palette) for i in range(0, 5000, 100)])
+
+        np.testing.assert_array_equal(quantize_indices(colors, palette), small)
+
+    def test_quantize_image_matches_reference(self):
+        """Vectorized quantize_image equals the per-pixel loop, alpha untouched."""
+        rng = np.random.default_rng(3)
+        img = rng.integers(0, 256, (40, 50, 4), dtype=np.uint8)
+        img[::3, :, 3] = 0
+        palette = [tuple(int(v) for v in c) for c in rng.integers(0, 256, (24, 3))]
+
+        np.testing.assert_array_equal(quantize_image(img, palette), _reference_quantize(img, palette))
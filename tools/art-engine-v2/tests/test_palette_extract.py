@@ -0,0 +1,86 @@
+"""Tests for histogram-based palette extraction."""
+import numpy as np
+import pytest
+
+from src.core.palette import quantize_indices
+from src.core.palette_extract import _Box, color_histogram, extract_palette
+
+
+def _gradient_pixels(seed=0, size=128):
+    """Noisy multi-channel gradient with many distinct colors."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size]
+    img = np.stack([xx * 2, yy * 2, (xx + yy)], axis=-1)
+    img = img + rng.integers(-12, 12, img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8).reshape(-1, 3)
+
+
+def _quantization_error(pixels, palette):
+    indices = quantize_indices(pixels, palette)
+    diff = np.asarray(palette, dtype=np.int64)[indices] - pixels.astype(np.int64)
+    return (diff * diff).sum(axis=1).mean()
+
+
+def test_color_histogram_counts():
+    pixels = np.array([[1, 2, 3], [0, 0, 9], [1, 2, 3], [255, 0, 0]], dtype=np.uint8)
+    colors, counts = color_histogram(pixels)
+    assert colors.tolist() == [[0, 0, 9], [1, 2, 3], [255, 0, 0]]
+    assert counts.tolist() == [1, 2, 1]
+
+
+def test_few_colors_returned_exactly():
+    """Images within the limit keep their exact colors in lexicographic order."""
+    pixels = np.array([[9, 9, 9], [1, 2, 3], [9, 9, 9], [1, 2, 4]], dtype=np.uint8)
+    assert extract_palette(pixels, 8) == [(1, 2, 3), (1, 2, 4), (9, 9, 9)]
+
+
+@pytest.mark.parametrize("max_colors", [1, 7, 64, 200])
+def test_palette_size_limit(max_colors):
+    palette = extract_palette(_gradient_pixels(), max_colors)
+    assert 1 <= len(palette) <= max_colors
+    assert len(set(palette)) == len(palette)
+    assert all(0 <= v <= 255 for color in palette for v in color)
+
+
+def test_deterministic():
+    pixels = _gradient_pixels(seed=4)
+    assert extract_palette(pixels, 32) == extract_palette(pixels.copy(), 32)
+
+
+@pytest.mark.parametrize("size", [64, 256])
+def test_lower_error_than_stride_subsampling(size):
+    """Median cut beats taking every n-th sorted unique color."""
+    pixels = _gradient_pixels(size=size)
+    unique = np.unique(pixels, axis=0)
+    step = len(unique) // 32
+    stride = [tuple(c) for c in unique[::step][:32]]
+
+    error = _quantization_error(pixels, extract_palette(pixels, 32))
+
+    assert error < 0.75 * _quantization_error(pixels, stride)
+
+
+def test_dominant_color_kept():
+    """A color covering most of the image appears (almost) exactly."""
+    rng = np.random.default_rng(2)
+    pixels = np.concatenate([
+        np.tile([[200, 40, 40]], (5000, 1)),
+        rng.integers(0, 256, (500, 3)),
+    ]).astype(np.uint8)
+    palette = np.array(extract_palette(pixels, 16))
+    assert np.abs(palette - [200, 40, 40]).sum(axis=1).min() <= 3
+
+
+def test_empty_and_invalid():
+    assert extract_palette(np.zeros((0, 3), dtype=np.uint8), 4) == []
+    with pytest.raises(ValueError):
+        extract_palette(np.zeros((1, 3), dtype=np.uint8), 0)
+
+
+def test_split_fractional_colors():
+    """Coarse-histogram bin means that share an integer part still split in two."""
+    box = _Box(np.array([[10.2, 7.9, 0.0], [10.8, 8.0, 0.0]]), np.ones(2))
+    left, right = box.split()
+    np.testing.assert_array_equal(left.colors, [[10.2, 7.9, 0.0]])
+    np.testing.assert_array_equal(right.colors, [[10.8, 8.0, 0.0]])
+
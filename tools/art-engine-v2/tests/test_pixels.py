@@ -0,0 +1,77 @@
+"""Tests for packed pixel views."""
+import numpy as np
+import pytest
+
+from src.core.pixels import (
+    pack_color,
+    pack_rgb,
+    packed_view,
+    unique_rgb,
+    unpack_rgb,
+    unpacked_view,
+)
+
+
+def test_packed_view_shares_memory():
+    canvas = np.zeros((4, 5, 4), dtype=np.uint8)
+    words = packed_view(canvas)
+    assert words.shape == (4, 5)
+    assert np.shares_memory(words, canvas)
+
+    words[1, 2] = pack_color((10, 20, 30, 40))
+
+    assert tuple(canvas[1, 2]) == (10, 20, 30, 40)
+
+
+def test_pack_color_matches_view():
+    canvas = np.zeros((2, 2, 4), dtype=np.uint8)
+    canvas[0, 1] = (255, 0, 128, 7)
+    words = packed_view(canvas)
+    assert words[0, 1] == pack_color((255, 0, 128, 7))
+    assert words[0, 0] != pack_color((255, 0, 128, 7))
+
+
+def test_packed_view_of_window():
+    """Row and column slices of a canvas can still be viewed."""
+    canvas = np.arange(6 * 6 * 4, dtype=np.uint8).reshape(6, 6, 4)
+    window = packed_view(canvas[1:4, 2:5])
+    np.testing.assert_array_equal(unpacked_view(window), canvas[1:4, 2:5])
+
+
+def test_unpacked_view_shares_memory():
+    """Writes through an unpacked window reach the original words."""
+    words = np.zeros((4, 5), dtype=np.uint32)
+    view = unpacked_view(words[1:3, ::2])
+    view[0, 1] = (1, 2, 3, 4)
+    assert words[1, 2] == pack_color((1, 2, 3, 4))
+    with pytest.raises(ValueError):
+        unpacked_view(words.astype(np.int64))
+    with pytest.raises(ValueError):
+        unpacked_view([1, 2, 3])
+
+
+def test_packed_view_rejects_bad_layout():
+    with pytest.raises(ValueError):
+        packed_view(np.zeros((2, 2, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        packed_view(np.zeros((2, 2, 4), dtype=np.float32))
+    with pytest.raises(ValueError):
+        packed_view(np.zeros((2, 2, 8), dtype=np.uint8)[:, :, ::2])
+
+
+def test_pack_rgb_roundtrip_and_order():
+    rgb = np.array([[1, 2, 3], [0, 255, 255], [255, 0, 0]])
+    keys = pack_rgb(rgb)
+    assert keys.tolist() == [0x010203, 0x00FFFF, 0xFF0000]
+    np.testing.assert_array_equal(unpack_rgb(keys), rgb)
+
+
+def test_unique_rgb_matches_row_unique():
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 4, (300, 3)).astype(np.uint8)
+
+    colors, first = unique_rgb(rgb, return_index=True)
+    expected, expected_first = np.unique(rgb, axis=0, return_index=True)
+
+    np.testing.assert_array_equal(colors, expected)
+    np.testing.assert_array_equal(first, expected_first)
@@ -8,6 +8,8 @@ from src.core.primitives import (
     draw_filled_rect,
     draw_ellipse,
     flood_fill,
+    flood_region,
+    connected_region,
 )
 
 
@@ -266,3 +268,141 @@ def test_flood_fill_single_pixel():
     assert tuple(canvas[0, 0]) == red
     # White pixel should remain white
     assert tuple(canvas[8, 8]) == white
+
+
+def _reference_line(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, color) -> None:
+    """Per-pixel Bresenham, the pre-slicing draw_line."""
+    h, w = canvas.shape[:2]
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    while True:
+        if 0 <= x0 < w and 0 <= y0 < h:
+            canvas[y0, x0] = color
+        if x0 == x1 and y0 == y1:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+
+
+class TestSliceFastPaths:
+    """Axis-aligned lines and filled rects match the per-pixel versions."""
+
+    COORDS = [-40, -3, -1, 0, 1, 7, 15, 16, 19, 40]
+
+    def test_axis_aligned_lines_match_bresenham(self):
+        color = (10, 200, 30, 255)
+        for a in self.COORDS:
+            for b in self.COORDS:
+                for fixed in (-1, 0, 9, 15, 16):
+                    for args in ((a, fixed, b, fixed), (fixed, a, fixed, b)):
+                        got, expected = make_canvas(16, 16), make_canvas(16, 16)
+                        draw_line(got, *args, color)
+                        _reference_line(expected, *args, color)
+                        assert np.array_equal(got, expected), args
+
+    def test_filled_rect_matches_per_pixel_fill(self):
+        color = (1, 2, 3, 4)
+        rng = np.random.default_rng(0)
+        for x0, y0, x1, y1 in rng.choice(self.COORDS, size=(200, 4)).tolist():
+            got, expected = make_canvas(16, 12), make_canvas(16, 12)
+            draw_filled_rect(got, x0, y0, x1, y1, color)
+            for y in range(max(0, min(y0, y1)), min(12, max(y0, y1) + 1)):
+                for x in range(max(0, min(x0, x1)), min(16, max(x0, x1) + 1)):
+                    expected[y, x] = color
+            assert np.array_equal(got, expected), (x0, y0, x1, y1)
+
+    def test_rect_fully_off_canvas_draws_nothing(self):
+        canvas = make_canvas(16, 16)
+        draw_rect(canvas, -10, -10, -2, -2, (255, 255, 255, 255))
+        draw_filled_rect(canvas, 20, 20, 30, 30, (255, 255, 255, 255))
+        assert not canvas.any()
+
+
+def _reference_flood_fill(canvas: np.ndarray, x: int, y: int, color) -> None:
+    """Pixel-by-pixel BFS fill, the pre-scanline flood_fill."""
+    h, w = canvas.shape[:2]
+    if not (0 <= x < w and 0 <= y < h):
+        return
+    target = tuple(canvas[y, x])
+    stack, seen = [(x, y)], set()
+    while stack:
+        cx, cy = stack.pop()
+        if (cx, cy) in seen or not (0 <= cx < w and 0 <= cy < h) or tuple(canvas[cy, cx]) != target:
+            continue
+        seen.add((cx, cy))
+        canvas[cy, cx] = color
+        stack.extend([(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)])
+
+
+class TestScanlineFloodFill:
+    def test_matches_pixel_fill_on_random_mazes(self):
+        rng = np.random.default_rng(7)
+        for _ in range(100):
+            h, w = rng.integers(1, 24, size=2)
+            canvas = np.zeros((h, w, 4), dtype=np.uint8)
+            canvas[..., 0] = rng.integers(0, 3, size=(h, w))
+            x, y = (int(v) for v in rng.integers(0, 24, size=2))
+            got, expected = canvas.copy(), canvas.copy()
+            flood_fill(got, x, y, (200, 100, 50, 255))
+            _reference_flood_fill(expected, x, y, (200, 100, 50, 255))
+            assert np.array_equal(got, expected)
+
+    def test_spiral_region(self):
+        """Fill follows a region that doubles back on itself row by row."""
+        canvas = make_canvas(9, 9)
+        wall = (255, 255, 255, 255)
+        draw_rect(canvas, 0, 0, 8, 8, wall)
+        draw_line(canvas, 2, 2, 8, 2, wall)
+        draw_line(canvas, 2, 2, 2, 6, wall)
+        draw_line(canvas, 2, 6, 6, 6, wall)
+        draw_line(canvas, 6, 4, 6, 6, wall)
+        expected = canvas.copy()
+        _reference_flood_fill(expected, 4, 4, (1, 2, 3, 255))
+        flood_fill(canvas, 4, 4, (1, 2, 3, 255))
+        assert np.array_equal(canvas, expected)
+        assert tuple(canvas[1, 1]) == (1, 2, 3, 255)
+
+    def test_tolerance_spans_similar_colors(self):
+        canvas = make_canvas(8, 1)
+        canvas[0, :, 3] = 255
+        canvas[0, :, 0] = [10, 12, 14, 9, 40, 10, 10, 10]
+        red = (255, 0, 0, 255)
+
+        exact = canvas.copy()
+        flood_fill(exact, 0, 0, red)
+        assert exact[0, :, 0].tolist() == [255, 12, 14, 9, 40, 10, 10, 10]
+
+        flood_fill(canvas, 0, 0, red, tolerance=4)
+        # 40 breaks the run, so the pixels past it keep their color
+        assert canvas[0, :, 0].tolist() == [255, 255, 255, 255, 40, 10, 10, 10]
+
+    def test_tolerance_compares_alpha(self):
+        canvas = make_canvas(4, 1)
+        canvas[0, 2, 3] = 50
+        region = flood_region(canvas, 0, 0, tolerance=10)
+        assert region.tolist() == [[True, True, False, False]]
+
+    def test_region_off_canvas_is_empty(self):
+        assert not flood_region(make_canvas(4, 4), -1, 0).any()
+
+    def test_connected_region_multiple_seeds(self):
+        matches = np.array([
+            [1, 0, 0, 1],
+            [1, 0, 1, 1],
+            [0, 0, 0, 0],
+            [1, 1, 0, 1],
+        ], dtype=bool)
+        region = connected_region(matches, [0, 3, 1], [0, 0, 2])
+        assert region.astype(int).tolist() == [
+            [1, 0, 0, 1],
+            [1, 0, 1, 1],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+        ]
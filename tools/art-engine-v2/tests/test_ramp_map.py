@@ -0,0 +1,103 @@
+"""Tests for per-template ramp-index maps."""
+import numpy as np
+from PIL import Image
+
+from src.core.palette import MATERIAL_RAMPS, nearest_color
+from src.core.ramp_map import (
+    NO_RAMP,
+    build_ramp_map,
+    load_ramp_map,
+    pixels_digest,
+    ramp_map_path,
+    swap_with_ramp_map,
+)
+from src.generators.icons import generate_icon
+from src.ingest.template_processor import process_template
+
+
+def _draft(tmp_path):
+    rng = np.random.default_rng(4)
+    img = np.full((40, 40, 4), [0x1A, 0x1A, 0x1F, 255], dtype=np.uint8)
+    img[6:34, 6:20, :3] = rng.integers(110, 170, (28, 14, 3))
+    img[6:34, 20:34, :3] = [200, 170, 60] + rng.integers(-20, 20, (28, 14, 3))
+    path = tmp_path / "draft.png"
+    Image.fromarray(img).save(path)
+    return path
+
+
+def test_build_ramp_map_indices():
+    img = np.zeros((6, 6, 4), dtype=np.uint8)
+    img[1:3, 1:3] = [140, 140, 150, 255]
+    img[4, 4] = [220, 210, 190, 255]
+    regions = [
+        {"pixels": [[1, 1], [2, 1], [1, 2], [2, 2], [0, 0]], "dominant_color": [140, 140, 150]},
+        {"pixels": [[4, 4]], "dominant_color": [220, 210, 190]},
+    ]
+
+    ramp_map = build_ramp_map(img, regions)
+
+    assert ramp_map[1, 1].tolist() == [0, nearest_color((140, 140, 150), MATERIAL_RAMPS["iron"])]
+    assert ramp_map[4, 4].tolist() == [1, nearest_color((220, 210, 190), MATERIAL_RAMPS["bone"])]
+    # Transparent and unlisted pixels stay unassigned
+    assert ramp_map[0, 0].tolist() == [NO_RAMP, NO_RAMP]
+    assert ramp_map[5, 5].tolist() == [NO_RAMP, NO_RAMP]
+
+
+def test_swap_with_ramp_map_gathers_region_pixels():
+    img = np.full((3, 4, 4), [9, 9, 9, 255], dtype=np.uint8)
+    ramp_map = np.full((3, 4, 2), NO_RAMP, dtype=np.uint8)
+    ramp_map[0, :2] = [[0, 1], [0, 40]]  # Past the target ramp's end: clamped
+    ramp_map[2, 3] = [1, 2]
+    target = MATERIAL_RAMPS["gold"]
+
+    result = swap_with_ramp_map(img, ramp_map, target)
+
+    assert result[0, 0].tolist() == [*target[1], 255]
+    assert result[0, 1].tolist() == [*target[-1], 255]
+    assert result[2, 3].tolist() == [*target[2], 255]
+    assert np.all(result[1] == [9, 9, 9, 255])
+    assert np.all(img == [9, 9, 9, 255])
+
+
+def test_overlapping_regions_have_no_map():
+    img = np.full((4, 4, 4), 255, dtype=np.uint8)
+    regions = [{"pixels": [[1, 1]], "dominant_color": [255, 255, 255]}] * 2
+    assert build_ramp_map(img, regions) is None
+
+
+def test_ingest_writes_ramp_map(tmp_path):
+    out = tmp_path / "templates"
+    meta = process_template(_draft(tmp_path), out, "blade", "weapon", num_regions=2, max_colors=32)
+
+    img = np.array(Image.open(out / "blade.png").convert("RGBA"))
+    assert meta["ramp_map_digest"] == pixels_digest(img)
+    ramp_map = load_ramp_map(out, "blade", meta, img)
+    assert ramp_map.shape == (40, 40, 2)
+    assert np.all((ramp_map[:, :, 0] == NO_RAMP) == (img[:, :, 3] == 0))
+
+
+def test_stale_ramp_map_ignored(tmp_path):
+    out = tmp_path / "templates"
+    meta = process_template(_draft(tmp_path), out, "blade", "weapon", num_regions=2, max_colors=32)
+    img = np.array(Image.open(out / "blade.png").convert("RGBA"))
+    img[10, 10, :3] += 1
+    assert load_ramp_map(out, "blade", meta, img) is None
+
+
+def test_icons_identical_with_and_without_map(tmp_path):
+    """The gather path renders exactly what the per-pixel search does."""
+    out = tmp_path / "templates"
+    process_template(_draft(tmp_path), out, "blade", "weapon", num_regions=2, max_colors=32)
+    with_map = [
+        np.array(Image.open(generate_icon(out, "blade", m, "epic", s, tmp_path / "a")))
+        for m in ("gold", "leather") for s in (1, 2)
+    ]
+
+    ramp_map_path(out, "blade").unlink()
+    without_map = [
+        np.array(Image.open(generate_icon(out, "blade", m, "epic", s, tmp_path / "b")))
+        for m in ("gold", "leather") for s in (1, 2)
+    ]
+
+    for a, b in zip(with_map, without_map):
+        np.testing.assert_array_equal(a, b)
@@ -1,7 +1,8 @@
 """Tests for SeededRNG deterministic random number generation."""
 from __future__ import annotations
+import numpy as np
 import pytest
-from src.core.seed import SeededRNG
+from src.core.seed import SeededRNG, stream_rng, stream_seed
 
 
 def test_deterministic():
@@ -86,3 +87,109 @@ def test_jitter_deterministic():
     vals2 = [rng2.jitter(100, 0.1) for _ in range(10)]
 
     assert vals1 == vals2
+
+
+def test_bulk_draws_deterministic():
+    """Bulk draws repeat with the same seed and differ across seeds."""
+    assert np.array_equal(SeededRNG(42).random_array(50), SeededRNG(42).random_array(50))
+    assert np.array_equal(SeededRNG(42).integers(50, 0, 9), SeededRNG(42).integers(50, 0, 9))
+    assert not np.array_equal(SeededRNG(42).random_array(50), SeededRNG(99).random_array(50))
+
+
+def test_bulk_stream_is_pinned():
+    """Bulk values are fixed functions of PCG64 raw output, the same on every platform and NumPy version."""
+    assert SeededRNG(42).random_array(3).tolist() == [
+        0.7739560485559633, 0.4388784397520523, 0.8585979199113825,
+    ]
+    assert SeededRNG(2024).integers(5, 0, 999).tolist() == [976, 241, 905, 412, 698]
+    assert SeededRNG(7).integers(6, -3, 2).tolist() == [0, 2, -1, -3, -2, -3]
+
+
+def test_bulk_draws_split_like_one_call():
+    """Drawing in pieces gives the same values as one large draw."""
+    whole = SeededRNG(7).random_array(30)
+    rng = SeededRNG(7)
+    pieces = np.concatenate([rng.random_array(10), rng.random_array(0), rng.random_array(20)])
+    np.testing.assert_array_equal(pieces, whole)
+
+
+def test_bulk_stream_independent_of_scalar():
+    """Bulk draws do not shift the scalar sequence."""
+    rng = SeededRNG(42)
+    rng.random_array(100)
+    rng.integers(100, 1, 6)
+    assert rng.random() == SeededRNG(42).random()
+
+
+def test_jitter_array_range():
+    """jitter_array stays within base ± pct."""
+    vals = SeededRNG(42).jitter_array(1000, 0.1, base=100.0)
+    assert vals.shape == (1000,)
+    assert np.all((vals >= 90.0) & (vals <= 110.0))
+    factors = SeededRNG(42).jitter_array(1000, 0.25)
+    assert np.all((factors >= 0.75) & (factors <= 1.25))
+
+
+def test_integers_range_and_uniformity():
+    """integers covers [lo, hi] inclusive evenly."""
+    vals = SeededRNG(42).integers(60000, -3, 2)
+    assert vals.dtype == np.int64
+    counts = np.bincount(vals + 3)
+    assert len(counts) == 6
+    assert counts.min() > 9500 and counts.max() < 10500
+
+
+def test_integers_single_value_and_power_of_two():
+    """Degenerate and power-of-two ranges need no rejection."""
+    assert SeededRNG(1).integers(5, 4, 4).tolist() == [4] * 5
+    assert set(SeededRNG(1).integers(1000, 0, 7).tolist()) == set(range(8))
+
+
+def test_integers_invalid_range():
+    """Empty or oversized ranges are rejected."""
+    with pytest.raises(ValueError):
+        SeededRNG(1).integers(3, 5, 4)
+    with pytest.raises(ValueError):
+        SeededRNG(1).integers(3, -(1 << 63), (1 << 63) - 1)
+
+
+def test_stream_seed_stable():
+    """Stream seeds are a fixed function of the key."""
+    key = ("sword", "iron", "rare", 42, "dither")
+    assert stream_seed(*key) == stream_seed(*key)
+    assert 0 <= stream_seed(*key) < 2 ** 64
+    # Pinned so a change to the derivation is caught: it would change every icon
+    assert stream_seed("sword", "iron", "rare", 42, "dither") == 12553469082198003432
+
+
+def test_stream_seed_distinguishes_keys():
+    """Every part of the key, and its position, selects a different stream."""
+    seeds = {
+        stream_seed("sword", "iron", "rare", 42, "dither"),
+        stream_seed("sword", "iron", "rare", 43, "dither"),
+        stream_seed("sword", "iron", "epic", 42, "dither"),
+        stream_seed("sword", "gold", "rare", 42, "dither"),
+        stream_seed("axe", "iron", "rare", 42, "dither"),
+        stream_seed("sword", "iron", "rare", 42, "swap"),
+        stream_seed("sword", "iron", "rare", "42", "dither"),
+        stream_seed("iron", "sword", "rare", 42, "dither"),
+        stream_seed("swordiron", "", "rare", 42, "dither"),
+    }
+    assert len(seeds) == 9
+
+
+def test_stream_seed_rejects_other_types():
+    with pytest.raises(ValueError):
+        stream_seed("sword", 1.5)
+    with pytest.raises(ValueError):
+        stream_seed("sword", True)
+
+
+def test_stream_rng_independent_of_order():
+    """A substream's values do not depend on other streams being used first."""
+    alone = stream_rng("t", "iron", "rare", 1, "dither").random_array(8)
+    other = stream_rng("t", "iron", "rare", 1, "outline").random_array(100)
+    after = stream_rng("t", "iron", "rare", 1, "dither").random_array(8)
+    np.testing.assert_array_equal(after, alone)
+    # The other stage drew its own, unrelated values
+    assert not np.array_equal(other[:8], alone)
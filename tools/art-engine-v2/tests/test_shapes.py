@@ -0,0 +1,129 @@
+"""Tests for filled shape masks."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.core.shapes import circle_mask, ellipse_mask, paint_mask, polygon_mask, rounded_rect_mask
+
+
+def _rows(mask: np.ndarray) -> list[str]:
+    return ["".join("#" if v else "." for v in row) for row in mask]
+
+
+class TestEllipseMask:
+    def test_shape_and_symmetry(self):
+        mask = ellipse_mask(7.5, 3.5)
+        assert mask.shape == (7, 15)
+        assert np.array_equal(mask, mask[::-1])
+        assert np.array_equal(mask, mask[:, ::-1])
+        # Half-pixel radii reach the middle of every edge
+        assert mask[3].all() and mask[:, 7].all()
+
+    def test_matches_implicit_equation(self):
+        mask = ellipse_mask(5, 3)
+        for y in range(-3, 4):
+            for x in range(-5, 6):
+                assert mask[y + 3, x + 5] == ((x / 5) ** 2 + (y / 3) ** 2 <= 1)
+
+    def test_circle(self):
+        assert _rows(circle_mask(2)) == [
+            "..#..",
+            ".###.",
+            "#####",
+            ".###.",
+            "..#..",
+        ]
+
+    def test_zero_radius(self):
+        assert _rows(ellipse_mask(0, 0)) == ["#"]
+        assert _rows(ellipse_mask(2, 0)) == ["#####"]
+
+    def test_negative_radius_rejected(self):
+        with pytest.raises(ValueError):
+            ellipse_mask(-1, 2)
+
+    def test_cached_and_read_only(self):
+        mask = ellipse_mask(6, 2)
+        assert ellipse_mask(6, 2) is mask
+        assert not mask.flags.writeable
+
+    def test_cache_bounded_by_bytes(self, monkeypatch):
+        from src.core import shapes
+        from src.core.lru import ByteLRU
+        monkeypatch.setattr(shapes, "_MASKS", ByteLRU(1000))
+        small = ellipse_mask(3, 3)
+        # A canvas-sized mask is built read-only but not kept
+        big = rounded_rect_mask(100, 100, 8)
+        assert not big.flags.writeable
+        assert rounded_rect_mask(100, 100, 8) is not big
+        assert ellipse_mask(3, 3) is small
+        assert shapes._MASKS.nbytes <= 1000
+
+
+class TestRoundedRectMask:
+    def test_corners_cut(self):
+        assert _rows(rounded_rect_mask(6, 4, 2)) == [
+            ".####.",
+            "######",
+            "######",
+            ".####.",
+        ]
+
+    def test_zero_radius_is_full_rect(self):
+        assert rounded_rect_mask(5, 3, 0).all()
+
+    def test_radius_limited_to_half_side(self):
+        assert np.array_equal(rounded_rect_mask(8, 4, 100), rounded_rect_mask(8, 4, 2))
+
+
+class TestPolygonMask:
+    def test_axis_aligned_square(self):
+        mask = polygon_mask([(1, 1), (4, 1), (4, 3), (1, 3)], 5, 4)
+        expected = np.zeros((4, 5), dtype=bool)
+        expected[1:3, 1:4] = True
+        assert np.array_equal(mask, expected)
+
+    def test_triangle(self):
+        assert _rows(polygon_mask([(0, 0), (4, 4), (0, 4)], 4, 4)) == [
+            "....",
+            "#...",
+            "##..",
+            "###.",
+        ]
+
+    def test_even_odd_hole(self):
+        # A pentagram's center is crossed twice, so it stays empty
+        star = [(5, 0), (8, 10), (0, 4), (10, 4), (2, 10)]
+        mask = polygon_mask(star, 10, 10)
+        assert not mask[5, 5]
+        assert mask[2, 5]
+
+    def test_too_few_points(self):
+        with pytest.raises(ValueError):
+            polygon_mask([(0, 0), (1, 1)], 4, 4)
+
+
+class TestPaintMask:
+    def test_sets_color_clipped(self):
+        canvas = np.zeros((4, 4, 4), dtype=np.uint8)
+        paint_mask(canvas, circle_mask(1), -1, 2, (9, 8, 7, 255))
+        painted = canvas[:, :, 3] > 0
+        assert _rows(painted) == [
+            "....",
+            "....",
+            "#...",
+            "##..",
+        ]
+        assert tuple(canvas[3, 1]) == (9, 8, 7, 255)
+
+    def test_off_canvas_is_noop(self):
+        canvas = np.zeros((4, 4, 4), dtype=np.uint8)
+        paint_mask(canvas, circle_mask(1), 10, 10, (9, 8, 7, 255))
+        assert not canvas.any()
+
+    def test_blend_composites(self):
+        canvas = np.full((3, 3, 4), [200, 200, 200, 255], dtype=np.uint8)
+        paint_mask(canvas, circle_mask(1), 0, 0, (0, 0, 0, 128), blend=True)
+        assert tuple(canvas[1, 1]) == (99, 99, 99, 255)
+        assert tuple(canvas[0, 0]) == (200, 200, 200, 255)
@@ -1,7 +1,7 @@
 import numpy as np
 from pathlib import Path
 from PIL import Image
-from src.generators.sprites import compose_sprite, LAYER_ORDER, SPRITE_WIDTH, SPRITE_HEIGHT
+from src.generators.sprites import compose_sprite, _shadow_layer, LAYER_ORDER, SPRITE_WIDTH, SPRITE_HEIGHT
 
 
 class TestLayerOrder:
@@ -83,6 +83,15 @@ class TestComposeSprite:
         # Shadow version should have more non-transparent pixels (shadow area)
         assert np.sum(with_shadow[:, :, 3] > 0) >= np.sum(without_shadow[:, :, 3] > 0)
 
+    def test_shadow_ellipse_shape(self):
+        alpha = _shadow_layer().pixels[:, :, 3]
+        ys, xs = np.nonzero(alpha)
+        # 81x17 ellipse centered at the bottom middle, 30% opacity
+        assert (xs.min(), xs.max(), ys.min(), ys.max()) == (88, 168, 484, 500)
+        assert set(alpha[ys, xs].tolist()) == {76}
+        # Symmetric about the center column
+        assert np.array_equal(alpha[:, 88:169], alpha[:, 88:169][:, ::-1])
+
     def test_layer_order_respected(self, tmp_path):
         """Later layers should composite on top of earlier ones."""
         d = tmp_path / "layers"
@@ -42,6 +42,14 @@ class TestPanelFrame:
         assert center[2] == 0x1F
 
 
+    def test_repeated_renders_are_independent(self):
+        first = render_panel_frame(40, 30)
+        first[:] = 0
+        second = render_panel_frame(40, 30)
+        assert second[15, 20, 3] == 255
+        assert not np.shares_memory(first, second)
+
+
 class TestButton:
     def test_renders(self):
         btn = render_button(120, 40)
@@ -56,6 +64,16 @@ class TestButton:
         btn = render_button(30, 20)
         assert btn.shape == (20, 30, 4)
 
+    def test_rounded_corners(self):
+        square = render_button(30, 20)
+        rounded = render_button(30, 20, radius=4)
+        assert rounded[0, 0, 3] == 0 and rounded[19, 29, 3] == 0
+        # Corner pixels on the curve take the border color
+        assert tuple(rounded[0, 3]) == tuple(square[0, 10])
+        assert tuple(rounded[3, 0]) == tuple(square[10, 0])
+        # The middle is untouched
+        assert np.array_equal(rounded[5:15, 5:25], square[5:15, 5:25])
+
 
 class TestProgressBar:
     def test_full_bar(self):